@@ -9,11 +9,14 @@ import plotly.graph_objects as go
 from datetime import datetime
 import time
 
+from benchmarks import BENCHMARK_LABELS, BENCHMARK_METRICS, BenchmarkIndex
+from matchup_index import LANE_MINUTE, MATCHUP_ROLES, MatchupIndex, format_matchup_line
 from riot_api import RiotAPI
 from data_analyzer import DataAnalyzer
 from live_game_coach import LiveGameCoach
 from llm_coach import LLMCoach
 from champion_names import get_champion_name
+from trends import TREND_LABELS, TREND_METRICS
 
 # Configuration de la page
 st.set_page_config(
@@ -72,6 +75,10 @@ if 'llm_coach' not in st.session_state:
     st.session_state.llm_coach = None
 if 'analyzer' not in st.session_state:
     st.session_state.analyzer = DataAnalyzer()
+if 'benchmarks' not in st.session_state:
+    st.session_state.benchmarks = None
+if 'matchups' not in st.session_state:
+    st.session_state.matchups = None
 if 'current_player' not in st.session_state:
     st.session_state.current_player = None
 if 'connected' not in st.session_state:
@@ -85,6 +92,12 @@ def init_apis():
         region = st.secrets.get('DEFAULT_REGION', 'EUW')
         st.session_state.api = RiotAPI(api_key=riot_key, region=region)
 
+    if st.session_state.benchmarks is None:
+        st.session_state.benchmarks = BenchmarkIndex()
+
+    if st.session_state.matchups is None:
+        st.session_state.matchups = MatchupIndex()
+
     if st.session_state.llm_coach is None:
         # Récupérer depuis les secrets Streamlit
         openai_key = st.secrets.get('OPENAI_API_KEY', None)
@@ -154,6 +167,15 @@ def sidebar_config():
                 st.session_state.current_player = None
                 st.rerun()
 
+        # Métriques des requêtes Riot (budget de rate limit, latence, caches)
+        if st.session_state.api is not None:
+            with st.expander("📈 Métriques API Riot"):
+                metrics = st.session_state.api.get_metrics()
+                for window in metrics['rate_limit_headroom']:
+                    if window['scope'] == 'application':
+                        st.caption(f"{window['host']} : {window['remaining']}/{window['limit']} requêtes dispo ({window['seconds']}s)")
+                st.json(metrics, expanded=False)
+
         st.markdown("---")
         st.markdown("### 📚 Liens utiles")
         st.markdown("[API Riot](https://developer.riotgames.com/)")
@@ -229,6 +251,19 @@ def main_page():
     with tab4:
         show_llm_tips()
 
+def fetch_matches(match_ids: list) -> list:
+    """Télécharge les matchs en parallèle avec une barre de progression, dans l'ordre de match_ids"""
+    progress_bar = st.progress(0)
+    ordered = [None] * len(match_ids)
+
+    for index, _, match_detail in st.session_state.api.get_match_details_many(
+        match_ids, on_progress=lambda done, total: progress_bar.progress(done / total), compact=True
+    ):
+        ordered[index] = match_detail
+
+    progress_bar.empty()
+    return [match for match in ordered if match]
+
 def show_match_history():
     """Onglet d'analyse d'historique"""
     st.header("📊 Analyse de votre historique")
@@ -254,19 +289,14 @@ def show_match_history():
                 return
 
             # Récupérer les détails
-            progress_bar = st.progress(0)
-            matches = []
-
-            for i, match_id in enumerate(match_ids):
-                match_detail = st.session_state.api.get_match_details(match_id)
-                if match_detail:
-                    matches.append(match_detail)
-                progress_bar.progress((i + 1) / len(match_ids))
-
-            progress_bar.empty()
+            matches = fetch_matches(match_ids)
 
             # Analyser
             stats = st.session_state.analyzer.analyze_match_history(matches, puuid)
+            stats['trends'] = st.session_state.analyzer.analyze_trends(matches, puuid)
+            st.session_state.benchmarks.add_matches(matches, exclude_puuids=[puuid])
+            st.session_state.matchups.add_matches(matches)
+            stats['benchmark'] = st.session_state.benchmarks.benchmark_player(matches, puuid)
             st.session_state.stats = stats
 
             # Afficher les métriques
@@ -302,6 +332,47 @@ def show_match_history():
                 st.metric("Kills", f"{stats.get('avg_kills', 0):.1f}")
                 st.metric("Deaths", f"{stats.get('avg_deaths', 0):.1f}")
 
+            # Tendances : fenêtre la plus courte, écart avec la fenêtre la plus longue
+            trends = stats.get('trends')
+            if trends and trends['windows']:
+                st.markdown("### 📉 Tendances")
+                short = min(trends['windows'])
+                st.caption(f"Moyennes des {short} dernières parties, écart avec les "
+                           f"{max(trends['windows'])} dernières")
+                cols = st.columns(len(TREND_METRICS))
+                for col, metric in zip(cols, TREND_METRICS):
+                    label, fmt = TREND_LABELS[metric]
+                    value = trends['windows'][short].get(metric)
+                    delta = trends['form'].get(metric)
+                    with col:
+                        st.metric(label, fmt.format(value) if value is not None else "-",
+                                  delta=(f"{'+' if delta >= 0 else '-'}{fmt.format(abs(delta))}"
+                                         if delta is not None else None))
+                streak = trends.get('streak', 0)
+                if streak >= 3:
+                    st.success(f"🔥 Série en cours : {streak} victoires d'affilée")
+                elif streak <= -3:
+                    st.warning(f"⚠️ Série en cours : {-streak} défaites d'affilée")
+
+            # Centiles face aux joueurs du même rôle (et du même tier si connu)
+            benchmark = stats.get('benchmark')
+            if benchmark:
+                st.markdown("### 📊 Comparaison à la population")
+                st.caption(f"Centiles parmi les joueurs {benchmark['role']} (tier {benchmark['tier']})")
+                cols = st.columns(len(BENCHMARK_METRICS))
+                for col, metric in zip(cols, BENCHMARK_METRICS):
+                    label, fmt = BENCHMARK_LABELS[metric]
+                    percentile = benchmark['percentiles'].get(metric)
+                    with col:
+                        if percentile is None:
+                            st.metric(label, "-")
+                        else:
+                            tier = benchmark.get('tiers', {}).get(metric, benchmark['tier'])
+                            if tier != benchmark['tier']:
+                                label = f"{label} (tier {tier})"
+                            st.metric(label, f"{percentile:.0f}e centile",
+                                      help=f"Votre partie médiane : {fmt.format(benchmark['values'][metric])}")
+
             # Graphiques
             st.markdown("---")
             col1, col2 = st.columns(2)
@@ -386,7 +457,8 @@ def show_pregame_analysis():
             with st.spinner("Recherche d'une partie active..."):
                 init_apis()
                 puuid = st.session_state.current_player['puuid']
-                live_coach = LiveGameCoach(st.session_state.api)
+                live_coach = LiveGameCoach(st.session_state.api, st.session_state.benchmarks,
+                                           st.session_state.matchups)
 
                 game = live_coach.check_for_active_game(puuid)
 
@@ -448,6 +520,13 @@ def show_pregame_analysis():
                                 else:
                                     st.markdown(f"**Mains:** Aucune donnée")
 
+                    # Historique local de votre champion contre chaque adversaire
+                    if analysis.get('matchups'):
+                        st.markdown("### ⚔️ Matchups (historique local)")
+                        your_champion = get_champion_name(analysis.get('your_champion'))
+                        for enemy_champion, matchup in analysis['matchups'].items():
+                            st.markdown(f"- {format_matchup_line(your_champion, enemy_champion, matchup)}")
+
                     # Analyse LLM
                     if st.session_state.llm_coach and st.session_state.llm_coach.is_available():
                         st.markdown("---")
@@ -484,16 +563,7 @@ def show_champion_stats():
 
             # Récupérer les matchs
             match_ids = st.session_state.api.get_match_history(puuid, count=nb_matches)
-            matches = []
-
-            progress_bar = st.progress(0)
-            for i, match_id in enumerate(match_ids):
-                match_detail = st.session_state.api.get_match_details(match_id)
-                if match_detail:
-                    matches.append(match_detail)
-                progress_bar.progress((i + 1) / len(match_ids))
-
-            progress_bar.empty()
+            matches = fetch_matches(match_ids or [])
 
             # Analyser
             stats = st.session_state.analyzer.analyze_match_history(matches, puuid)
@@ -585,11 +655,30 @@ def show_llm_tips():
             enemy_champ = st.text_input("Champion adverse", placeholder="Zed")
 
         your_rank = st.text_input("Votre rang", placeholder="Gold II")
+        role = st.selectbox("Rôle", ["Tous"] + list(MATCHUP_ROLES))
+
+        # Historique local du matchup (aucune requête à l'API)
+        init_apis()
+        matchup = None
+        if your_champ and enemy_champ:
+            matchup = st.session_state.matchups.get(your_champ, enemy_champ, None if role == "Tous" else role)
+            if matchup:
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Parties", matchup['games'])
+                col2.metric("Winrate", f"{matchup['winrate']:.0f}%")
+                col3.metric("Écart d'or (fin)", f"{matchup['gold_diff']:+.0f}")
+                if matchup.get('lane_games'):
+                    col4.metric(f"Écart d'or à {LANE_MINUTE} min", f"{matchup['lane_gold_diff']:+.0f}",
+                                help=f"{matchup['lane_games']} parties avec timeline")
+                else:
+                    col4.metric("Écart de CS (fin)", f"{matchup['cs_diff']:+.0f}")
+            else:
+                st.info("Aucune partie de ce matchup dans l'historique local")
 
         if st.button("🧠 Analyser le matchup"):
             with st.spinner("Analyse du matchup..."):
                 st.session_state.matchup_analysis = st.session_state.llm_coach.analyze_champion_matchup(
-                    your_champ, enemy_champ, your_rank
+                    your_champ, enemy_champ, your_rank, matchup
                 )
 
         # Afficher l'analyse si elle existe
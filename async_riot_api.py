@@ -0,0 +1,98 @@
+"""
+Version asyncio du client API Riot Games
+Les appels sont exécutés sur un pool de threads dédié et partagent le limiteur de débit,
+le cache de matchs et les connexions keep-alive du client synchrone
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from riot_api import RiotAPI, DEFAULT_POOL_SIZE
+from timeline import TimelineFrames
+
+# Nombre de requêtes simultanées par défaut
+DEFAULT_CONCURRENCY = 10
+
+
+class AsyncRiotAPI:
+    def __init__(self, api_key: str = None, region: str = 'EUW',
+                 max_concurrency: int = DEFAULT_CONCURRENCY, api: RiotAPI = None,
+                 priority: int = None, **kwargs):
+        """
+        api: client synchrone existant à réutiliser (sinon créé avec les kwargs)
+        max_concurrency: nombre maximum de requêtes en vol
+        priority: classe de priorité de toutes les requêtes de ce client (défaut : celle de api)
+        """
+        if api is None:
+            kwargs.setdefault('pool_size', max(max_concurrency, DEFAULT_POOL_SIZE))
+            api = RiotAPI(api_key=api_key, region=region, **kwargs)
+        self.api = api
+        self.max_concurrency = max_concurrency
+        self.priority = priority if priority is not None else api.default_priority
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='riot-api')
+
+    async def _run(self, func, *args, **kwargs):
+        """Exécute un appel bloquant du client synchrone sans bloquer la boucle"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call, func, *args, **kwargs))
+
+    def _call(self, func, *args, **kwargs):
+        # Exécuté dans un thread du pool : la priorité est propre à chaque thread
+        with self.api.priority(self.priority):
+            return func(*args, **kwargs)
+
+    async def get_account_by_riot_id(self, game_name: str, tag_line: str) -> Optional[Dict]:
+        """Récupère le compte Riot par Riot ID (nom#tag)"""
+        return await self._run(self.api.get_account_by_riot_id, game_name, tag_line)
+
+    async def get_summoner_by_name(self, summoner_name: str, tag: str = None) -> Optional[Dict]:
+        """Récupère les informations d'un invocateur par son Riot ID"""
+        return await self._run(self.api.get_summoner_by_name, summoner_name, tag)
+
+    async def get_summoner_by_puuid(self, puuid: str) -> Optional[Dict]:
+        """Récupère les informations d'un invocateur par son PUUID"""
+        return await self._run(self.api.get_summoner_by_puuid, puuid)
+
+    async def get_match_history(self, puuid: str, count: int = 20, queue: int = None, start: int = 0,
+                                start_time: int = None, end_time: int = None) -> Optional[List[str]]:
+        """Récupère l'historique des matchs d'un joueur"""
+        return await self._run(self.api.get_match_history, puuid, count, queue, start, start_time, end_time)
+
+    async def get_match_details(self, match_id: str, compact: bool = False) -> Optional[Dict]:
+        """Récupère les détails d'un match spécifique (compact: MatchRecord allégé)"""
+        return await self._run(self.api.get_match_details, match_id, compact)
+
+    async def get_match_timeline(self, match_id: str) -> Optional[TimelineFrames]:
+        """Récupère la timeline d'un match (TimelineFrames)"""
+        return await self._run(self.api.get_match_timeline, match_id)
+
+    async def get_league_entries(self, summoner_id: str) -> Optional[List[Dict]]:
+        """Récupère les entrées de classement d'un joueur"""
+        return await self._run(self.api.get_league_entries, summoner_id)
+
+    async def get_current_game(self, puuid: str) -> Optional[Dict]:
+        """Récupère les informations de la partie en cours"""
+        return await self._run(self.api.get_current_game, puuid)
+
+    async def get_champion_masteries(self, puuid: str, count: int = None) -> Optional[List[Dict]]:
+        """Récupère les maîtrises de champion d'un joueur"""
+        return await self._run(self.api.get_champion_masteries, puuid, count)
+
+    async def gather_match_details(self, match_ids: List[str], compact: bool = False) -> List[Optional[Dict]]:
+        """
+        Récupère plusieurs matchs en parallèle
+        Les résultats sont dans le même ordre que match_ids (None pour un échec)
+        """
+        return await asyncio.gather(*(self.get_match_details(match_id, compact) for match_id in match_ids))
+
+    def close(self):
+        """Arrête le pool de threads et ferme les connexions"""
+        self._executor.shutdown(wait=True)
+        self.api.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
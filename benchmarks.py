@@ -0,0 +1,490 @@
+"""
+Module de benchmarks de population : centiles par rôle et par tier
+Les seuils fixes (rang, KDA) ne disent pas si 7 CS/min est bon pour un mid Gold. Ici,
+chaque match ingéré alimente des sketches de quantiles KLL (rôle × tier × métrique) pour
+les CS/min, la vision, la kill participation et la part des dégâts des 10 participants.
+Les sketches sont fusionnables, tiennent en un peu plus d'un Ko et sont sauvegardés en SQLite ;
+la stat d'un joueur se convertit ensuite en centile par une recherche dichotomique
+Le tier n'est pas dans match-v5 : il est fourni à l'ingestion (tier du joueur dont on lit
+l'historique, le matchmaking réunissant des niveaux proches). Chaque partie alimente aussi
+le tier ALL du rôle, utilisé quand le tier demandé n'a pas assez d'échantillons
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import struct
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from match_decoder import _participant_row
+from parsed_match import parse_match
+
+DEFAULT_BENCHMARK_PATH = os.path.join('cache', 'benchmarks.sqlite')
+
+# Taille des sketches : erreur de rang inférieure à 1 % pour ~1,2 Ko par sketch
+SKETCH_K = 200
+
+# Échantillons minimum pour qu'un centile soit affiché
+MIN_BENCHMARK_SAMPLES = 50
+
+# Parties plus courtes ignorées (remakes)
+MIN_GAME_DURATION = 300
+
+# Sauvegarde automatique après ce nombre de nouveaux matchs
+AUTOSAVE_AFTER = 200
+
+ALL_TIERS = 'ALL'
+BENCHMARK_ROLES = ('TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY')
+BENCHMARK_METRICS = ('cs_per_min', 'vision_score', 'kill_participation', 'damage_share')
+
+# Libellé et format d'affichage de chaque métrique
+BENCHMARK_LABELS = {
+    'cs_per_min': ('CS/min', '{:.1f}'),
+    'vision_score': ('Vision', '{:.1f}'),
+    'kill_participation': ('KP', '{:.0f}%'),
+    'damage_share': ('Part des dégâts', '{:.0f}%'),
+}
+
+_HEADER = struct.Struct('<HIB')
+_rng = random.Random()
+
+
+class KllSketch:
+    """
+    Sketch de quantiles KLL : niveaux de compacteurs, un élément du niveau h pèse 2^h.
+    Un niveau plein est trié et n'en garde qu'un élément sur deux (décalage aléatoire),
+    promus au niveau suivant. Deux sketches se fusionnent niveau par niveau
+    """
+    __slots__ = ('k', 'n', 'compactors', '_cdf')
+
+    def __init__(self, k: int = SKETCH_K):
+        self.k = k
+        self.n = 0
+        self.compactors: List[List[float]] = [[]]
+        # (valeurs triées, poids cumulés), reconstruit après une modification
+        self._cdf: Optional[Tuple[List[float], List[int]]] = None
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(self.k * (2 / 3) ** depth) + 1)
+
+    def add(self, value: float):
+        level0 = self.compactors[0]
+        level0.append(value)
+        self.n += 1
+        self._cdf = None
+        if len(level0) >= self._capacity(0):
+            self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                items.sort()
+                keep = [items.pop()] if len(items) % 2 else []
+                self.compactors[level + 1].extend(items[_rng.getrandbits(1)::2])
+                self.compactors[level] = keep
+            level += 1
+
+    def merge(self, other: 'KllSketch') -> 'KllSketch':
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.n += other.n
+        self._cdf = None
+        self._compress()
+        return self
+
+    def _get_cdf(self) -> Tuple[List[float], List[int]]:
+        cdf = self._cdf
+        if cdf is None:
+            weighted = sorted((value, 1 << level) for level, items in enumerate(self.compactors)
+                              for value in items)
+            values = [value for value, _ in weighted]
+            cumulative = [0]
+            for _, weight in weighted:
+                cumulative.append(cumulative[-1] + weight)
+            cdf = self._cdf = (values, cumulative)
+        return cdf
+
+    def percentile(self, value: float) -> Optional[float]:
+        """Part (en %) de la population sous value ; les ex æquo comptent pour moitié"""
+        values, cumulative = self._get_cdf()
+        if not values:
+            return None
+        below = cumulative[bisect_left(values, value)]
+        at_or_below = cumulative[bisect_right(values, value)]
+        return (below + at_or_below) / 2 / cumulative[-1] * 100
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Valeur au quantile q (0 à 1)"""
+        values, cumulative = self._get_cdf()
+        if not values:
+            return None
+        index = bisect_left(cumulative, q * cumulative[-1], 1) - 1
+        return values[min(max(index, 0), len(values) - 1)]
+
+    def to_bytes(self) -> bytes:
+        """Format compact : en-tête, taille de chaque niveau puis valeurs en float32"""
+        sizes = [len(items) for items in self.compactors]
+        values = [value for items in self.compactors for value in items]
+        return (_HEADER.pack(self.k, self.n, len(sizes)) + struct.pack(f'<{len(sizes)}I', *sizes)
+                + struct.pack(f'<{len(values)}f', *values))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'KllSketch':
+        k, n, levels = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        sizes = struct.unpack_from(f'<{levels}I', data, offset)
+        offset += 4 * levels
+        values = struct.unpack_from(f'<{sum(sizes)}f', data, offset)
+
+        sketch = cls(k)
+        sketch.n = n
+        sketch.compactors = []
+        start = 0
+        for size in sizes:
+            sketch.compactors.append(list(values[start:start + size]))
+            start += size
+        return sketch
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __repr__(self):
+        return f"KllSketch(k={self.k}, n={self.n}, levels={len(self.compactors)})"
+
+
+def game_metrics(parsed, participant, game_duration: float) -> Dict[str, float]:
+    """Valeurs des BENCHMARK_METRICS d'un participant sur une partie"""
+    (_, team_id, _, _, _, kills, _, assists, cs, vision, damage, _) = _participant_row(participant)
+    team = parsed.teams[team_id]
+    metrics = {
+        'cs_per_min': cs / (game_duration / 60),
+        'vision_score': vision,
+    }
+    if team.kills > 0:
+        metrics['kill_participation'] = (kills + assists) / team.kills * 100
+    if team.damage > 0:
+        metrics['damage_share'] = damage / team.damage * 100
+    return metrics
+
+
+def _tier_key(tier: Optional[str]) -> Optional[str]:
+    """'GOLD', 'gold' ou 'GOLD II - 45 LP' -> 'GOLD'"""
+    return tier.split()[0].upper() if tier and tier.strip() else None
+
+
+class BenchmarkIndex:
+    def __init__(self, path: str = None, k: int = SKETCH_K, min_samples: int = MIN_BENCHMARK_SAMPLES):
+        """
+        path: fichier SQLite des sketches (défaut : COACH_LOL_BENCHMARKS)
+        k: taille des nouveaux sketches
+        min_samples: échantillons minimum d'un sketch pour calculer un centile
+        """
+        self.path = path or os.getenv('COACH_LOL_BENCHMARKS', DEFAULT_BENCHMARK_PATH)
+        self.k = k
+        self.min_samples = min_samples
+        self.sketches: Dict[Tuple[str, str, str], KllSketch] = {}
+        self._ingested = set()
+        # Apports non sauvegardés : valeurs ajoutées par match ID, sketches fusionnés (merge)
+        self._pending: Dict[str, List[Tuple[Tuple[str, str, str], float]]] = {}
+        self._pending_sketches: Dict[Tuple[str, str, str], KllSketch] = {}
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sketches ("
+            "role TEXT NOT NULL, tier TEXT NOT NULL, metric TEXT NOT NULL, data BLOB NOT NULL, "
+            "PRIMARY KEY (role, tier, metric))"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS ingested (match_id TEXT PRIMARY KEY)")
+        self._conn.commit()
+
+        for role, tier, metric, data in self._conn.execute("SELECT role, tier, metric, data FROM sketches"):
+            self.sketches[(role, tier, metric)] = KllSketch.from_bytes(bytes(data))
+        self._ingested.update(row[0] for row in self._conn.execute("SELECT match_id FROM ingested"))
+
+    def _sketch(self, key: Tuple[str, str, str]) -> KllSketch:
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = KllSketch(self.k)
+        return sketch
+
+    def add_match(self, match, tier: str = None, exclude_puuids: Iterable[str] = ()) -> bool:
+        """
+        Ajoute les participants d'un match (dict match-v5 ou MatchRecord)
+        tier: tier de la partie ('GOLD', ...), None pour n'alimenter que le tier ALL
+        exclude_puuids: joueurs à ne pas ajouter à la population (ceux que l'on compare
+        ensuite à ces benchmarks : leurs propres parties biaiseraient leurs centiles)
+        Retourne False si le match a déjà été ingéré ou n'est pas exploitable (remake)
+        """
+        if match is None:
+            return False
+        info = match.get('info', {})
+        game_duration = info.get('gameDuration', 0)
+        match_id = match.get('metadata', {}).get('matchId')
+        if not match_id or game_duration < MIN_GAME_DURATION:
+            return False
+
+        tiers = [ALL_TIERS]
+        tier = _tier_key(tier)
+        if tier and tier != ALL_TIERS:
+            tiers.append(tier)
+
+        exclude_puuids = set(exclude_puuids)
+        parsed = parse_match(match)
+        with self._lock:
+            if match_id in self._ingested:
+                return False
+            self._ingested.add(match_id)
+            added = self._pending[match_id] = []
+
+            for participant in parsed.participants:
+                role = participant.get('teamPosition')
+                if role not in BENCHMARK_ROLES or participant.get('puuid') in exclude_puuids:
+                    continue
+                for metric, value in game_metrics(parsed, participant, game_duration).items():
+                    for tier_key in tiers:
+                        self._sketch((role, tier_key, metric)).add(value)
+                        added.append(((role, tier_key, metric), value))
+
+            autosave = len(self._pending) >= AUTOSAVE_AFTER
+        if autosave:
+            self.save()
+        return True
+
+    def add_matches(self, matches: Iterable, tier: str = None, exclude_puuids: Iterable[str] = ()) -> int:
+        """Ingère plusieurs matchs puis sauvegarde ; retourne le nombre de nouveaux matchs"""
+        exclude_puuids = set(exclude_puuids)
+        added = sum(1 for match in matches if self.add_match(match, tier, exclude_puuids))
+        self.save()
+        return added
+
+    def save(self):
+        """
+        Ajoute au fichier les apports depuis la dernière sauvegarde
+        Plusieurs index (sessions Streamlit, CLI) peuvent partager le fichier : dans une même
+        transaction, chaque sketch est relu, complété puis réécrit, et les matchs qu'un autre
+        index a ingérés entre-temps ne sont pas ajoutés une seconde fois
+        """
+        with self._lock:
+            if not self._pending and not self._pending_sketches:
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                match_ids = list(self._pending)
+                already = set()
+                for start in range(0, len(match_ids), 500):
+                    chunk = match_ids[start:start + 500]
+                    already.update(row[0] for row in self._conn.execute(
+                        f"SELECT match_id FROM ingested WHERE match_id IN ({','.join('?' * len(chunk))})", chunk
+                    ))
+
+                added: Dict[Tuple[str, str, str], List[float]] = {}
+                for match_id, values in self._pending.items():
+                    for key, value in values:
+                        values_for_key = added.setdefault(key, [])
+                        if match_id not in already:
+                            values_for_key.append(value)
+
+                rows = []
+                for key in set(added) | set(self._pending_sketches):
+                    row = self._conn.execute(
+                        "SELECT data FROM sketches WHERE role = ? AND tier = ? AND metric = ?", key
+                    ).fetchone()
+                    sketch = KllSketch.from_bytes(bytes(row[0])) if row else KllSketch(self.k)
+                    for value in added.get(key, ()):
+                        sketch.add(value)
+                    if key in self._pending_sketches:
+                        sketch.merge(self._pending_sketches[key])
+                    # La version fusionnée inclut aussi les apports des autres index
+                    self.sketches[key] = sketch
+                    rows.append((*key, sqlite3.Binary(sketch.to_bytes())))
+
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO sketches (role, tier, metric, data) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.executemany("INSERT OR IGNORE INTO ingested (match_id) VALUES (?)",
+                                       [(match_id,) for match_id in match_ids])
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._pending.clear()
+            self._pending_sketches.clear()
+
+    def merge(self, other: 'BenchmarkIndex') -> 'BenchmarkIndex':
+        """
+        Ajoute les sketches d'un autre index (ex : construit sur une autre machine)
+        Les matchs ingérés par les deux index sont alors comptés deux fois
+        """
+        with self._lock:
+            for key, sketch in other.sketches.items():
+                self._sketch(key).merge(sketch)
+                pending = self._pending_sketches.get(key)
+                if pending is None:
+                    pending = self._pending_sketches[key] = KllSketch(self.k)
+                pending.merge(sketch)
+            new_ids = other._ingested - self._ingested
+            self._ingested.update(new_ids)
+            for match_id in new_ids:
+                self._pending[match_id] = []
+        return self
+
+    def sketch(self, metric: str, role: str, tier: str = None) -> Tuple[Optional[str], Optional[KllSketch]]:
+        """(tier utilisé, sketch) : le tier demandé s'il a assez d'échantillons, sinon ALL"""
+        tier = _tier_key(tier)
+        for tier_key in ((tier, ALL_TIERS) if tier and tier != ALL_TIERS else (ALL_TIERS,)):
+            sketch = self.sketches.get((role, tier_key, metric))
+            if sketch is not None and sketch.n >= self.min_samples:
+                return tier_key, sketch
+        return None, None
+
+    def percentile(self, metric: str, value: float, role: str, tier: str = None) -> Optional[float]:
+        """Centile de value pour le rôle et le tier, None sans population suffisante"""
+        _, sketch = self.sketch(metric, role, tier)
+        return sketch.percentile(value) if sketch is not None else None
+
+    def quantile(self, metric: str, q: float, role: str, tier: str = None) -> Optional[float]:
+        _, sketch = self.sketch(metric, role, tier)
+        return sketch.quantile(q) if sketch is not None else None
+
+    def benchmark_player(self, matches: Iterable, player_puuid: str, role: str = None,
+                         tier: str = None) -> Dict:
+        """
+        Centiles du joueur dans la population de son rôle, partie par partie
+        Seules les parties jouées dans ce rôle comptent. La population étant faite de parties
+        isolées, chaque partie du joueur y est placée, et le centile retenu est la médiane de
+        ces centiles (celui de sa partie médiane) : une moyenne sur N parties, plus resserrée
+        qu'une partie isolée, ramènerait tous les centiles vers 50
+        role: rôle de référence (défaut : rôle le plus joué sur ces parties)
+        Retourne {'role', 'tier', 'tiers', 'games', 'values', 'percentiles', 'score'} (values :
+        valeurs médianes, score : centile moyen), ou {} si aucune population n'est disponible.
+        'tiers' donne le tier de chaque métrique ; 'tier' est le tier demandé si au moins une
+        métrique l'a utilisé (les autres, repliées sur ALL, sont signalées par
+        format_benchmark_lines), ALL sinon
+        """
+        games = []
+        for match in matches:
+            if match is None:
+                continue
+            info = match.get('info', {})
+            if info.get('gameDuration', 0) < MIN_GAME_DURATION:
+                continue
+            parsed = parse_match(match)
+            player = parsed.participant(player_puuid)
+            if player:
+                games.append((player.get('teamPosition'), game_metrics(parsed, player, info['gameDuration'])))
+
+        if role not in BENCHMARK_ROLES:
+            roles = Counter(game_role for game_role, _ in games if game_role in BENCHMARK_ROLES)
+            if not roles:
+                return {}
+            role = roles.most_common(1)[0][0]
+        games = [metrics for game_role, metrics in games if game_role == role]
+        if not games:
+            return {}
+
+        values = {}
+        percentiles = {}
+        metric_tiers = {}
+        for metric in BENCHMARK_METRICS:
+            samples = [metrics[metric] for metrics in games if metric in metrics]
+            tier_key, sketch = self.sketch(metric, role, tier)
+            if not samples or sketch is None:
+                continue
+            values[metric] = statistics.median(samples)
+            percentiles[metric] = statistics.median(sketch.percentile(sample) for sample in samples)
+            metric_tiers[metric] = tier_key
+        if not percentiles:
+            return {}
+
+        return {
+            'role': role,
+            'tier': next((key for key in metric_tiers.values() if key != ALL_TIERS), ALL_TIERS),
+            'tiers': metric_tiers,
+            'games': len(games),
+            'values': values,
+            'percentiles': percentiles,
+            'score': sum(percentiles.values()) / len(percentiles)
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'matches': len(self._ingested),
+                'sketches': len(self.sketches),
+                'bytes': sum(len(sketch.to_bytes()) for sketch in self.sketches.values())
+            }
+
+    def close(self):
+        self.save()
+        with self._lock:
+            self._conn.close()
+
+
+def format_benchmark_lines(benchmark: Dict) -> List[str]:
+    """
+    Une ligne par métrique (rapports, prompts LLM), ex : 'CS/min : 7.1 (68e centile)'
+    Une métrique comparée à un autre tier que benchmark['tier'] (repli sur ALL) l'indique
+    """
+    lines = []
+    for metric in BENCHMARK_METRICS:
+        percentile = benchmark.get('percentiles', {}).get(metric)
+        if percentile is None:
+            continue
+        label, fmt = BENCHMARK_LABELS[metric]
+        tier = benchmark.get('tiers', {}).get(metric, benchmark.get('tier'))
+        scope = f", tier {tier}" if tier != benchmark.get('tier') else ''
+        lines.append(f"{label} : {fmt.format(benchmark['values'][metric])} ({percentile:.0f}e centile{scope})")
+    return lines
+
+
+def main():
+    from match_archive import MatchArchive
+    from match_decoder import decode_match
+
+    parser = argparse.ArgumentParser(description="Construit les benchmarks de population depuis l'archive de matchs")
+    parser.add_argument('--archive', default=None, help='fichier de l\'archive (défaut : COACH_LOL_MATCH_ARCHIVE)')
+    parser.add_argument('--benchmarks', default=None, help='fichier des benchmarks (défaut : COACH_LOL_BENCHMARKS)')
+    parser.add_argument('--tier', default=None, help='tier des parties archivées (ex : GOLD), sinon ALL uniquement')
+    args = parser.parse_args()
+
+    archive = MatchArchive(args.archive, auto_train_after=0)
+    index = BenchmarkIndex(args.benchmarks)
+    try:
+        match_ids = archive.iter_ids()
+        added = 0
+        for start in range(0, len(match_ids), 500):
+            payloads = archive.read_many(match_ids[start:start + 500])
+            added += index.add_matches((decode_match(payload) for payload in payloads.values()), args.tier)
+        print(f"✓ {added} nouveaux matchs ingérés ({index.stats()['matches']} au total)")
+
+        print(f"\n{'Rôle':<10}" + ''.join(f"{BENCHMARK_LABELS[m][0]:>18}" for m in BENCHMARK_METRICS))
+        for role in BENCHMARK_ROLES:
+            medians = []
+            for metric in BENCHMARK_METRICS:
+                median = index.quantile(metric, 0.5, role, args.tier)
+                medians.append(BENCHMARK_LABELS[metric][1].format(median) if median is not None else '-')
+            print(f"{role:<10}" + ''.join(f"{median:>18}" for median in medians))
+    finally:
+        index.close()
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Module d'enregistrement / rejeu des réponses des APIs externes (Riot, OpenAI, Anthropic)
+Mode 'record' : chaque réponse réelle est ajoutée à un fichier cassette (JSON lines)
+Mode 'replay' : les réponses sont relues depuis la cassette, sans réseau, de façon déterministe
+(avec latence et 429 injectables pour les benchmarks)
+"""
+import os
+import json
+import hashlib
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+MODES = ('record', 'replay')
+
+_env_cassettes: Dict[str, 'Cassette'] = {}
+_env_lock = threading.Lock()
+
+
+class CassetteResponse:
+    """Réponse HTTP rejouée, compatible avec l'usage fait de requests.Response dans RiotAPI"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict = None, content: bytes = b''):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error (cassette) for url: {self.url}", response=self
+            )
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = 'replay', latency: float = 0.0,
+                 latency_jitter: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: int = 1, seed: int = None):
+        """
+        path: fichier cassette (JSON lines)
+        mode: 'record' ou 'replay'
+        latency / latency_jitter: latence injectée en rejeu (secondes, jitter uniforme)
+        rate_limit_rate: probabilité d'injecter un 429 en rejeu (0 à 1)
+        retry_after: valeur de Retry-After des 429 injectés
+        seed: graine du générateur aléatoire (rejeu reproductible)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode de cassette inconnu : {mode} (attendu : {', '.join(MODES)})")
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict]] = {}
+        self._positions: Dict[str, int] = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.missing = 0
+
+        if os.path.exists(path):
+            self._load()
+        elif mode == 'replay':
+            print(f"⚠️  Cassette introuvable : {path}. Toutes les requêtes seront en échec.")
+
+    @classmethod
+    def from_env(cls) -> Optional['Cassette']:
+        """
+        Cassette configurée par les variables COACH_LOL_CASSETTE (fichier)
+        et COACH_LOL_CASSETTE_MODE ('record' ou 'replay', défaut : 'replay')
+        Une même cassette est partagée par tous les clients du processus
+        """
+        path = os.getenv('COACH_LOL_CASSETTE')
+        if not path:
+            return None
+
+        with _env_lock:
+            cassette = _env_cassettes.get(path)
+            if cassette is None:
+                mode = os.getenv('COACH_LOL_CASSETTE_MODE', 'replay')
+                cassette = _env_cassettes[path] = cls(path, mode=mode)
+            return cassette
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Clé stable d'une interaction (hash des éléments qui l'identifient)"""
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                self._entries.setdefault(entry['key'], []).append(entry)
+
+    def _append(self, entry: Dict):
+        with self._lock:
+            self._entries.setdefault(entry['key'], []).append(entry)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.recorded += 1
+
+    def _next_entry(self, key: str) -> Optional[Dict]:
+        """Entrée suivante pour cette clé (la dernière est répétée une fois la séquence épuisée)"""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.missing += 1
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            self.replayed += 1
+            return entries[min(position, len(entries) - 1)]
+
+    def _inject_latency(self):
+        delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record_http(self, key: str, response):
+        """Enregistre une réponse HTTP réelle"""
+        self._append({
+            'key': key,
+            'kind': 'http',
+            'url': response.url,
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'body': response.content.decode('utf-8', errors='replace')
+        })
+
+    def replay_http(self, key: str, url: str) -> CassetteResponse:
+        """Rejoue une réponse HTTP (404 si absente de la cassette)"""
+        self._inject_latency()
+
+        with self._lock:
+            inject_429 = self.rate_limit_rate > 0 and self._random.random() < self.rate_limit_rate
+        if inject_429:
+            return CassetteResponse(url, 429, {
+                'Retry-After': str(self.retry_after),
+                'X-Rate-Limit-Type': 'application'
+            })
+
+        entry = self._next_entry(key)
+        if entry is None:
+            return CassetteResponse(url, 404, {}, b'{"status": {"message": "absent de la cassette"}}')
+
+        # Les en-têtes de compression ne s'appliquent plus au corps déjà décodé
+        headers = {k: v for k, v in entry['headers'].items()
+                   if k.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')}
+        return CassetteResponse(url, entry['status'], headers, entry['body'].encode('utf-8'))
+
+    def record_text(self, key: str, text: str):
+        """Enregistre une réponse texte (LLM)"""
+        self._append({'key': key, 'kind': 'text', 'text': text})
+
+    def replay_text(self, key: str) -> Optional[str]:
+        """Rejoue une réponse texte (LLM), ou None si absente"""
+        self._inject_latency()
+        entry = self._next_entry(key)
+        return entry['text'] if entry else None
+
+    def stats(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'interactions': sum(len(entries) for entries in self._entries.values()),
+            'recorded': self.recorded,
+            'replayed': self.replayed,
+            'missing': self.missing
+        }
@@ -3,6 +3,8 @@ Coach LoL - Application principale
 Interface en ligne de commande pour analyser vos performances et obtenir des conseils
 """
 import sys
+from benchmarks import BenchmarkIndex
+from matchup_index import MatchupIndex
 from riot_api import RiotAPI
 from data_analyzer import DataAnalyzer
 from live_game_coach import LiveGameCoach
@@ -12,6 +14,8 @@ class CoachLoL:
         self.api = None
         self.analyzer = DataAnalyzer()
         self.live_coach = None
+        self.benchmarks = None
+        self.matchups = None
         self.current_player = None
 
     def display_menu(self):
@@ -43,7 +47,9 @@ class CoachLoL:
         region = input("Entrez votre région (EUW/NA/KR/etc.) [défaut: EUW] : ").strip().upper() or "EUW"
 
         self.api = RiotAPI(api_key=api_key, region=region)
-        self.live_coach = LiveGameCoach(self.api)
+        self.benchmarks = BenchmarkIndex()
+        self.matchups = MatchupIndex()
+        self.live_coach = LiveGameCoach(self.api, self.benchmarks, self.matchups)
 
         print("\n🎮 Connexion à votre compte...")
         print("-" * 60)
@@ -85,17 +91,28 @@ class CoachLoL:
         print(f"✓ {len(match_ids)} parties trouvées")
         print("📥 Téléchargement des détails des matchs...")
 
-        matches = []
-        for i, match_id in enumerate(match_ids, 1):
-            print(f"  Partie {i}/{len(match_ids)}...", end='\r')
-            match_detail = self.api.get_match_details(match_id)
-            if match_detail:
-                matches.append(match_detail)
+        matches = self._fetch_matches(match_ids)
 
         print(f"\n✓ {len(matches)} parties analysées")
         print("\n🔬 Analyse des statistiques en cours...")
 
         stats = self.analyzer.analyze_match_history(matches, self.current_player['puuid'])
+        stats['trends'] = self.analyzer.analyze_trends(matches, self.current_player['puuid'])
+        self.benchmarks.add_matches(matches, exclude_puuids=[self.current_player['puuid']])
+        stats['benchmark'] = self.benchmarks.benchmark_player(matches, self.current_player['puuid'])
+
+        lanes = input(f"Analyser la phase de lane (timelines, {len(matches)} requêtes en plus) ? (o/n) : ").strip().lower()
+        timelines = {}
+        if lanes == 'o':
+            for i, match in enumerate(matches, 1):
+                print(f"  Timeline {i}/{len(matches)}...", end='\r')
+                match_id = match['metadata']['matchId']
+                frames = self.api.get_match_timeline(match_id)
+                if frames is not None:
+                    timelines[match_id] = frames
+            stats['lane_diffs'] = self.analyzer.analyze_lane_diffs(matches, timelines, self.current_player['puuid'])
+        self.matchups.add_matches(matches, timelines)
+
         report = self.analyzer.format_performance_report(stats)
 
         print(report)
@@ -127,16 +144,20 @@ class CoachLoL:
             print("✗ Aucune partie trouvée")
             return
 
-        matches = []
-        for i, match_id in enumerate(match_ids, 1):
-            print(f"  Partie {i}/{len(match_ids)}...", end='\r')
-            match_detail = self.api.get_match_details(match_id)
-            if match_detail:
-                matches.append(match_detail)
+        # Statistiques mises à jour à chaque match reçu, sans garder la liste des matchs
+        def show_progress(accumulator):
+            print(f"  Partie {accumulator.total_games}/{len(match_ids)} - winrate "
+                  f"{accumulator.wins / accumulator.total_games * 100:.0f}%...", end='\r')
+
+        matches = (match_detail for _, _, match_detail in
+                   self.api.get_match_details_many(match_ids, compact=True))
+        stats = self.analyzer.analyze_match_stream(matches, self.current_player['puuid'], on_update=show_progress)
+        if not stats:
+            print("✗ Aucune partie n'a pu être téléchargée")
+            return
 
         print(f"\n✓ Analyse des champions...")
 
-        stats = self.analyzer.analyze_match_history(matches, self.current_player['puuid'])
         champion_analysis = self.analyzer.analyze_champion_performance(stats['champions'])
 
         print("\n" + "=" * 60)
@@ -152,6 +173,18 @@ class CoachLoL:
 
         print("\n" + "=" * 60)
 
+    def _fetch_matches(self, match_ids: list) -> list:
+        """Télécharge les matchs en parallèle et les renvoie dans l'ordre de match_ids"""
+        def show_progress(done, total):
+            print(f"  Partie {done}/{total}...", end='\r')
+
+        ordered = [None] * len(match_ids)
+        for index, _, match_detail in self.api.get_match_details_many(match_ids, on_progress=show_progress,
+                                                                         compact=True):
+            ordered[index] = match_detail
+
+        return [match for match in ordered if match]
+
     def monitor_game(self):
         """Surveille le démarrage d'une partie"""
         if not self.current_player:
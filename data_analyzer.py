@@ -1,19 +1,43 @@
 """
 Module d'analyse des données de match et de joueur
 """
-from typing import Dict, List, Optional
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional
 from collections import defaultdict, Counter
+from operator import itemgetter
 import statistics
 
+import numpy as np
+
+from benchmarks import format_benchmark_lines
+from match_frame import MatchFrame
+from matchup_index import LANE_MINUTE, MATCHUP_MIN_GAMES
+from parsed_match import parse_match
+from performance_records import ChampionAggregate, GamePerformance
+from stats_accumulator import StatsAccumulator
+from timeline import TimelineFrames
+from trends import TrendTracker, format_trend_lines
+
+# Minutes auxquelles on compare le joueur à son adversaire direct
+LANE_DIFF_MINUTES = (10, 15)
+LANE_DIFF_METRICS = ('gold', 'xp', 'cs')
+
 class DataAnalyzer:
     def __init__(self):
         self.champion_data = {}
+        # Tendances par joueur, mises à jour avec les seules nouvelles parties
+        self.trend_trackers: Dict[str, TrendTracker] = {}
 
-    def analyze_match_history(self, matches: List[Dict], player_puuid: str) -> Dict:
+    def analyze_match_history(self, matches: List[Dict], player_puuid: str, frame: MatchFrame = None) -> Dict:
         """
         Analyse l'historique de matchs d'un joueur
         Retourne des statistiques détaillées
+        frame: MatchFrame déjà construit sur ces matchs (calcul vectorisé, même résultat) ;
+        rentable dès qu'un même lot de matchs sert à plusieurs joueurs ou analyses
         """
+        if frame is not None:
+            return frame.player_stats(player_puuid)
+
         if not matches:
             return {}
 
@@ -21,11 +45,11 @@ class DataAnalyzer:
             'total_games': len(matches),
             'wins': 0,
             'losses': 0,
-            'kills': [],
-            'deaths': [],
-            'assists': [],
+            'kills': array('i'),
+            'deaths': array('i'),
+            'assists': array('i'),
             'kill_participation_list': [],  # Temporaire pour calcul
-            'champions': defaultdict(lambda: {'games': 0, 'wins': 0, 'kills': 0, 'deaths': 0, 'assists': 0}),
+            'champions': defaultdict(ChampionAggregate),
             'roles': defaultdict(int),
             'recent_performance': [],
             'kda_avg': 0.0,
@@ -36,10 +60,11 @@ class DataAnalyzer:
 
         for match in matches:
             info = match.get('info', {})
-            participants = info.get('participants', [])
+            # Index PUUID -> participant et totaux d'équipe, construits une fois par match
+            parsed = parse_match(match)
 
             # Trouver le joueur dans les participants
-            player = next((p for p in participants if p['puuid'] == player_puuid), None)
+            player = parsed.participant(player_puuid)
 
             if not player:
                 continue
@@ -52,8 +77,7 @@ class DataAnalyzer:
             stats['assists'].append(player['assists'])
 
             # Calcul de la kill participation (% des kills de l'équipe)
-            team_id = player['teamId']
-            team_kills = sum(p['kills'] for p in participants if p['teamId'] == team_id)
+            team_kills = parsed.team(player['teamId']).kills
             if team_kills > 0:
                 kp = ((player['kills'] + player['assists']) / team_kills) * 100
                 stats['kill_participation_list'].append(kp)
@@ -62,36 +86,24 @@ class DataAnalyzer:
             champ_name = player['championName']
             role = player.get('teamPosition', 'UNKNOWN')
 
-            stats['champions'][champ_name]['games'] += 1
-            stats['champions'][champ_name]['wins'] += 1 if win else 0
-            stats['champions'][champ_name]['kills'] += player['kills']
-            stats['champions'][champ_name]['deaths'] += player['deaths']
-            stats['champions'][champ_name]['assists'] += player['assists']
-
-            # Tracker le rôle le plus joué pour ce champion
-            if 'roles' not in stats['champions'][champ_name]:
-                stats['champions'][champ_name]['roles'] = defaultdict(int)
-            stats['champions'][champ_name]['roles'][role] += 1
+            # Cumul par champion, avec le rôle joué (pour le rôle le plus joué sur ce champion)
+            stats['champions'][champ_name].add_game(win, player['kills'], player['deaths'], player['assists'], role)
 
             # Rôle global
             stats['roles'][role] += 1
 
             # Performance récente
             game_duration_min = info['gameDuration'] / 60
-            stats['recent_performance'].append({
-                'champion': champ_name,
-                'win': win,
-                'kda': f"{player['kills']}/{player['deaths']}/{player['assists']}",
-                'cs': player['totalMinionsKilled'] + player.get('neutralMinionsKilled', 0),
-                'cs_per_min': (player['totalMinionsKilled'] + player.get('neutralMinionsKilled', 0)) / game_duration_min,
-                'vision_score': player.get('visionScore', 0),
-                'damage': player['totalDamageDealtToChampions'],
-                'gold': player['goldEarned']
-            })
+            cs = player['totalMinionsKilled'] + player.get('neutralMinionsKilled', 0)
+            stats['recent_performance'].append(GamePerformance(
+                champ_name, win, player['kills'], player['deaths'], player['assists'], cs,
+                cs / game_duration_min, player.get('visionScore', 0),
+                player['totalDamageDealtToChampions'], player['goldEarned']
+            ))
 
             # Moyennes
             stats['vision_score_avg'] += player.get('visionScore', 0)
-            stats['cs_per_min_avg'] += (player['totalMinionsKilled'] + player.get('neutralMinionsKilled', 0)) / game_duration_min
+            stats['cs_per_min_avg'] += cs / game_duration_min
 
         # Calcul des moyennes
         if stats['total_games'] > 0:
@@ -114,6 +126,120 @@ class DataAnalyzer:
 
         return stats
 
+    def analyze_match_stream(self, matches: Iterable[Dict], player_puuid: str,
+                             on_update: Callable[[StatsAccumulator], None] = None) -> Dict:
+        """
+        Même analyse qu'analyze_match_history, en un seul passage et en mémoire constante
+        matches: n'importe quel itérable (générateur de téléchargement, lecture du cache, ...)
+        on_update: appelé avec l'accumulateur après chaque match (affichage en direct)
+        Les listes par partie (kills, recent_performance, ...) ne gardent que les 20 plus récentes
+        """
+        return StatsAccumulator(player_puuid).add_many(matches, on_update).result()
+
+    def analyze_many(self, matches: Iterable[Dict], puuids: Iterable[str],
+                     scopes: Dict[str, Iterable[str]] = None) -> Dict[str, Dict]:
+        """
+        Analyse plusieurs joueurs en un seul passage sur un corpus de matchs partagé
+        (lobby, premades, rapports par lot) : chaque match est indexé une fois et met à jour
+        les statistiques de tous les joueurs suivis qui y figurent
+        scopes: match IDs à compter pour chaque joueur (défaut : tous les matchs où il apparaît)
+        Retourne {puuid: stats} au format d'analyze_match_stream ({} si aucun match trouvé) ;
+        total_games compte les matchs du joueur présents dans le corpus
+        """
+        tracked = {puuid: StatsAccumulator(puuid) for puuid in puuids}
+        scopes = {puuid: set(ids) for puuid, ids in scopes.items()} if scopes else {}
+
+        for match in matches:
+            if match is None:
+                continue
+            parsed = parse_match(match)
+            for puuid in parsed.by_puuid:
+                accumulator = tracked.get(puuid)
+                if accumulator is None:
+                    continue
+                scope = scopes.get(puuid)
+                if scope is not None and parsed.match_id not in scope:
+                    continue
+                accumulator.add(match, parsed)
+
+        return {puuid: accumulator.result() for puuid, accumulator in tracked.items()}
+
+    def analyze_trends(self, matches: List[Dict], player_puuid: str) -> Dict:
+        """
+        Moyennes glissantes (5 / 10 / 20 parties), EWMA et série en cours (voir trends.TrendTracker)
+        Le suivi est conservé par joueur : à l'appel suivant, seules les parties plus récentes
+        que la dernière reçue sont triées et ajoutées, en O(1) chacune (les autres ne coûtent
+        qu'une comparaison). Il est reconstruit si la liste contient des parties plus anciennes
+        que celles déjà suivies (historique élargi)
+        """
+        keyed = [((m.get('info', {}).get('gameCreation', 0), m.get('metadata', {}).get('matchId', '')), m)
+                 for m in matches if m]
+        tracker = self.trend_trackers.get(player_puuid)
+        if tracker is not None and tracker.first_key is not None:
+            if keyed and min(key for key, _ in keyed) < tracker.first_key:
+                tracker = None
+            else:
+                keyed = [(key, m) for key, m in keyed if key > tracker.last_key]
+        if tracker is None:
+            tracker = self.trend_trackers[player_puuid] = TrendTracker()
+
+        keyed.sort(key=itemgetter(0))
+        for _, match in keyed:
+            tracker.add(match, player_puuid)
+        return tracker.result()
+
+    def analyze_lane_diffs(self, matches: List[Dict], timelines: Dict[str, TimelineFrames],
+                           player_puuid: str, minutes=LANE_DIFF_MINUTES) -> Dict:
+        """
+        Écarts d'or, d'XP et de CS avec l'adversaire direct (même teamPosition) à 10 et 15 min
+        timelines: TimelineFrames par match ID (RiotAPI.get_match_timeline)
+        """
+        minutes = np.asarray(minutes)
+        samples = []
+        for match in matches:
+            frames = timelines.get(match.get('metadata', {}).get('matchId'))
+            if frames is None:
+                continue
+
+            parsed = parse_match(match)
+            player = parsed.participant(player_puuid)
+            opponent = parsed.lane_opponent(player_puuid)
+            if not opponent:
+                continue
+
+            rows = [frames.row(player['participantId']), frames.row(opponent['participantId'])]
+            if None in rows or frames.minutes == 0:
+                continue
+
+            # (métriques x [joueur, adversaire] x minutes), NaN si la partie s'est finie avant
+            columns = np.minimum(minutes, frames.minutes - 1)
+            values = np.stack([getattr(frames, metric)[rows][:, columns] for metric in LANE_DIFF_METRICS])
+            values = values.astype(np.float64)
+            values[:, :, minutes >= frames.minutes] = np.nan
+            samples.append(values)
+
+        result = {'games': len(samples), 'by_minute': {}}
+        if not samples:
+            return result
+
+        stacked = np.stack(samples)                       # parties x métriques x 2 x minutes
+        diffs = stacked[:, :, 0, :] - stacked[:, :, 1, :]  # parties x métriques x minutes
+        valid = ~np.isnan(diffs[:, 0, :])
+        counts = valid.sum(axis=0)
+        sums = np.nansum(diffs, axis=0)
+        ahead = ((diffs[:, 0, :] > 0) & valid).sum(axis=0)
+
+        for j, minute in enumerate(minutes.tolist()):
+            if counts[j] == 0:
+                continue
+            entry = {'games': int(counts[j])}
+            for i, metric in enumerate(LANE_DIFF_METRICS):
+                entry[f'{metric}_diff'] = float(sums[i, j] / counts[j])
+            entry['gold_ahead_rate'] = float(ahead[j] / counts[j] * 100)
+            result['by_minute'][minute] = entry
+
+        return result
+
     def analyze_champion_performance(self, champion_stats: Dict) -> Dict:
         """Analyse la performance sur un champion spécifique"""
         analysis = {}
@@ -189,47 +315,81 @@ class DataAnalyzer:
 
         return analysis
 
-    def get_matchup_advice(self, your_champion: str, enemy_champion: str, your_rank: str) -> List[str]:
+    def get_matchup_advice(self, your_champion: str, enemy_champion: str, your_rank: str,
+                           matchup: Dict = None) -> List[str]:
         """
         Génère des conseils pour un matchup spécifique
-        (À enrichir avec une base de données de matchups)
+        matchup: statistiques du matchup (MatchupIndex.get) ; conseils génériques sans historique
         """
         advice = [
             f"Matchup : {your_champion} vs {enemy_champion}",
             f"Votre niveau : {your_rank}",
         ]
 
-        # Conseils génériques (à personnaliser avec une vraie DB)
-        generic_advice = [
-            "Surveillez les cooldowns clés de votre adversaire",
-            "Placez des wards pour éviter les ganks",
-            "Adaptez votre build en fonction de la composition ennemie",
-            "Communiquez avec votre équipe pour les objectifs",
-            "Gardez un œil sur la minimap"
-        ]
-
-        advice.extend(generic_advice)
+        if not matchup or not matchup.get('games'):
+            advice.extend([
+                "Aucune partie de ce matchup dans l'historique local",
+                "Surveillez les cooldowns clés de votre adversaire",
+                "Placez des wards pour éviter les ganks",
+                "Adaptez votre build en fonction de la composition ennemie",
+                "Gardez un œil sur la minimap"
+            ])
+            return advice
+
+        games = matchup['games']
+        winrate = matchup['winrate']
+        advice.append(f"Historique : {games} parties, {winrate:.0f}% WR, "
+                      f"{matchup['gold_diff']:+.0f} or / {matchup['cs_diff']:+.0f} CS en fin de partie")
+        if games < MATCHUP_MIN_GAMES:
+            advice.append(f"Échantillon faible ({games} parties) : pas encore de tendance fiable")
+            return advice
+
+        if winrate >= 55:
+            advice.append("Matchup favorable : prenez l'initiative en lane et forcez les échanges")
+        elif winrate <= 45:
+            advice.append("Matchup défavorable : jouez la sécurité, farmez sous tour et appelez votre jungler")
+
+        if matchup.get('lane_games'):
+            gold = matchup['lane_gold_diff']
+            if gold <= -300:
+                advice.append(f"{gold:+.0f} or à {LANE_MINUTE} min en moyenne : évitez les échanges longs avant vos power spikes")
+            elif gold >= 300:
+                advice.append(f"{gold:+.0f} or à {LANE_MINUTE} min en moyenne : convertissez l'avance (plates, dragons, Héraut)")
+
+        if matchup['cs_diff'] <= -15:
+            advice.append(f"{matchup['cs_diff']:+.0f} CS en moyenne : priorisez le farm plutôt que les trades")
 
         return advice
 
     def calculate_threat_level(self, player_stats: Dict) -> str:
         """
         Calcule le niveau de menace d'un joueur adverse
+        Le niveau du rang est relevé (ou abaissé) d'un cran si player_stats['benchmark']
+        (BenchmarkIndex.benchmark_player) le place au-dessus du 80e (sous le 30e) centile
         """
         # Logique de calcul basée sur le rang, winrate, etc.
         rank = player_stats.get('rank', 'Unranked')
+        levels = ["FAIBLE", "MOYEN", "ÉLEVÉ", "TRÈS ÉLEVÉ"]
 
         if 'CHALLENGER' in rank or 'GRANDMASTER' in rank or 'MASTER' in rank:
-            return "TRÈS ÉLEVÉ"
+            level = 3
         elif 'DIAMOND' in rank or 'EMERALD' in rank:
-            return "ÉLEVÉ"
+            level = 2
         elif 'PLATINUM' in rank or 'GOLD' in rank:
-            return "MOYEN"
+            level = 1
         elif 'SILVER' in rank or 'BRONZE' in rank:
-            return "FAIBLE"
+            level = 0
         else:
             return "INCONNU"
 
+        benchmark = player_stats.get('benchmark')
+        if benchmark:
+            if benchmark['score'] >= 80:
+                level = min(level + 1, 3)
+            elif benchmark['score'] < 30:
+                level = max(level - 1, 0)
+        return levels[level]
+
     def format_performance_report(self, stats: Dict) -> str:
         """Formate un rapport de performance lisible"""
         if not stats:
@@ -259,6 +419,28 @@ class DataAnalyzer:
                 kda = (champ_stats['kills'] + champ_stats['assists']) / max(champ_stats['deaths'], 1)
                 report.append(f"  • {champ}: {games} games - {winrate:.1f}% WR - {kda:.2f} KDA")
 
+        # Tendances récentes (si analyze_trends a été appelé)
+        trends = stats.get('trends')
+        if trends and trends['windows']:
+            report.append("\nTendances (parties récentes vs fenêtre la plus longue) :")
+            for line in format_trend_lines(trends):
+                report.append(f"  • {line}")
+
+        # Comparaison à la population (si des benchmarks sont disponibles)
+        benchmark = stats.get('benchmark')
+        if benchmark:
+            report.append(f"\nComparaison aux joueurs {benchmark['role']} (tier {benchmark['tier']}) :")
+            for line in format_benchmark_lines(benchmark):
+                report.append(f"  • {line}")
+
+        # Phase de lane (si les timelines ont été analysées)
+        lane_diffs = stats.get('lane_diffs')
+        if lane_diffs and lane_diffs['by_minute']:
+            report.append(f"\nPhase de lane vs adversaire direct ({lane_diffs['games']} parties) :")
+            for minute, diff in lane_diffs['by_minute'].items():
+                report.append(f"  • @{minute} min : {diff['gold_diff']:+.0f} or, {diff['xp_diff']:+.0f} XP, "
+                              f"{diff['cs_diff']:+.1f} CS - devant en or dans {diff['gold_ahead_rate']:.0f}% des parties")
+
         # Rôles préférés
         if stats['roles']:
             report.append("\nRôles joués :")
@@ -4,16 +4,29 @@ Module pour le coaching en temps réel pendant la sélection de champions
 import time
 from typing import Dict, Optional
 from riot_api import RiotAPI
+from rate_limiter import PRIORITY_INTERACTIVE
+from benchmarks import BenchmarkIndex, format_benchmark_lines
+from champion_names import get_champion_name
 from data_analyzer import DataAnalyzer
+from matchup_index import MATCHUP_MIN_GAMES, MATCHUP_ROLES, MatchupIndex, format_matchup_line
+from parsed_match import ParsedMatch
 
 class LiveGameCoach:
-    def __init__(self, api: RiotAPI):
+    def __init__(self, api: RiotAPI, benchmarks: BenchmarkIndex = None, matchups: MatchupIndex = None):
+        """
+        benchmarks: centiles de population par rôle et tier (créés par défaut)
+        matchups: index des matchups de lane (créé par défaut)
+        Les matchs récents des adversaires sont ingérés dans les deux à chaque analyse
+        """
         self.api = api
         self.analyzer = DataAnalyzer()
+        self.benchmarks = benchmarks if benchmarks is not None else BenchmarkIndex()
+        self.matchups = matchups if matchups is not None else MatchupIndex()
 
     def check_for_active_game(self, puuid: str) -> Optional[Dict]:
         """Vérifie si le joueur est en partie"""
-        return self.api.get_current_game(puuid)
+        with self.api.priority(PRIORITY_INTERACTIVE):
+            return self.api.get_current_game(puuid)
 
     def analyze_pregame(self, game_data: Dict, player_puuid: str) -> Dict:
         """
@@ -34,22 +47,20 @@ class LiveGameCoach:
             'threats': []
         }
 
-        participants = game_data.get('participants', [])
+        # Index PUUID -> participant et équipes, construit une seule fois
+        parsed = ParsedMatch.from_active_game(game_data)
 
         # Séparer les équipes
-        player_team_id = None
-        for participant in participants:
-            if participant['puuid'] == player_puuid:
-                player_team_id = participant['teamId']
-                # Stocker le rôle et champion du joueur
-                analysis['your_role'] = participant.get('teamPosition', 'UNKNOWN')
-                analysis['your_champion'] = participant.get('championId', 'Unknown')
-                break
-
-        if player_team_id is None:
+        player = parsed.participant(player_puuid)
+        if player is None:
             return analysis
 
-        for participant in participants:
+        player_team_id = player['teamId']
+        # Stocker le rôle et champion du joueur
+        analysis['your_role'] = player.get('teamPosition', 'UNKNOWN')
+        analysis['your_champion'] = player.get('championId', 'Unknown')
+
+        for participant in parsed.participants:
             # Utiliser riotId si disponible, sinon summonerName
             summoner_name = 'Unknown'
             if participant.get('riotId'):
@@ -70,16 +81,19 @@ class LiveGameCoach:
             else:
                 analysis['enemy_team'].append(player_info)
 
-        # Analyser l'équipe adverse
+        # Analyser l'équipe adverse (prioritaire sur les synchronisations en cours)
         print("\n🔍 Analyse de l'équipe adverse en cours...")
-        enemy_analysis = self._analyze_enemy_players(analysis['enemy_team'])
+        with self.api.priority(PRIORITY_INTERACTIVE):
+            enemy_analysis = self._analyze_enemy_players(analysis['enemy_team'])
         analysis['enemy_analysis'] = enemy_analysis
+        analysis['matchups'] = self._lookup_matchups(analysis)
 
         # Générer des recommandations
         analysis['recommendations'] = self._generate_recommendations(
             analysis['your_team'],
             analysis['enemy_team'],
-            enemy_analysis
+            enemy_analysis,
+            analysis['matchups']
         )
 
         return analysis
@@ -87,6 +101,9 @@ class LiveGameCoach:
     def _analyze_enemy_players(self, enemy_team: list) -> Dict:
         """Analyse détaillée de chaque joueur adverse"""
         enemy_analysis = {}
+        players = []
+        recent_ids = {}
+        tiers = {}
 
         for i, enemy in enumerate(enemy_team, 1):
             print(f"  Analyse joueur {i}/{len(enemy_team)}...", end='\r')
@@ -119,20 +136,43 @@ class LiveGameCoach:
                         player_data['winrate'] = (ranked_solo['wins'] / (ranked_solo['wins'] + ranked_solo['losses'])) * 100 if (ranked_solo['wins'] + ranked_solo['losses']) > 0 else 0
                         player_data['wins'] = ranked_solo['wins']
                         player_data['losses'] = ranked_solo['losses']
+                        tiers[puuid] = ranked_solo['tier']
 
-            # Analyser les matchs récents
+            # Limiter à 10 matchs pour la vitesse
             if match_ids:
-                matches_data = []
-                for match_id in match_ids[:10]:  # Limiter à 10 matchs pour la vitesse
-                    match_detail = self.api.get_match_details(match_id)
-                    if match_detail:
-                        matches_data.append(match_detail)
-                    time.sleep(0.1)  # Petit délai pour éviter le rate limit
-
-                if matches_data:
-                    stats = self.analyzer.analyze_match_history(matches_data, puuid)
-                    player_data['stats'] = stats
-                    player_data['threat_level'] = self._calculate_threat_level(player_data)
+                recent_ids[puuid] = match_ids[:10]
+            players.append((enemy, puuid, player_data))
+
+        # Matchs récents de tous les adversaires : les parties communes (premades) ne sont
+        # téléchargées qu'une fois, en parallèle (le limiteur de débit espace les requêtes),
+        # puis analysées en un seul passage pour tous les joueurs
+        all_ids = list(dict.fromkeys(match_id for ids in recent_ids.values() for match_id in ids))
+        matches = {match_id: match_detail for _, match_id, match_detail
+                   in self.api.get_match_details_many(all_ids, compact=True) if match_detail is not None}
+        all_stats = self.analyzer.analyze_many(matches.values(), list(recent_ids), scopes=recent_ids)
+
+        # Ces parties alimentent les benchmarks, au tier du premier adversaire classé qui les a jouées.
+        # Les adversaires eux-mêmes en sont exclus : on les compare ensuite à cette population
+        match_tiers = {}
+        for puuid, ids in recent_ids.items():
+            for match_id in ids:
+                if tiers.get(puuid):
+                    match_tiers.setdefault(match_id, tiers[puuid])
+        for match_id, match_detail in matches.items():
+            self.benchmarks.add_match(match_detail, match_tiers.get(match_id), exclude_puuids=recent_ids)
+            self.matchups.add_match(match_detail)
+        self.benchmarks.save()
+        self.matchups.save()
+
+        for enemy, puuid, player_data in players:
+            stats = all_stats.get(puuid)
+            if stats:
+                player_data['stats'] = stats
+                player_data['benchmark'] = self.benchmarks.benchmark_player(
+                    [matches[match_id] for match_id in recent_ids.get(puuid, ()) if match_id in matches],
+                    puuid, role=enemy.get('role'), tier=tiers.get(puuid)
+                )
+                player_data['threat_level'] = self._calculate_threat_level(player_data)
 
             # Récupérer les champions principaux depuis les stats analysées
             if player_data.get('stats') and player_data['stats'].get('champions'):
@@ -154,6 +194,23 @@ class LiveGameCoach:
         print("\n✓ Analyse terminée")
         return enemy_analysis
 
+    def _lookup_matchups(self, analysis: Dict) -> Dict:
+        """
+        Historique local de votre champion contre chaque champion adverse
+        Dans votre rôle pour l'adversaire direct s'il est connu, tous rôles confondus sinon
+        Retourne {nom du champion adverse: statistiques (MatchupIndex.get)}
+        """
+        your_champion = analysis.get('your_champion')
+        your_role = analysis.get('your_role')
+        matchups = {}
+        for enemy in analysis['enemy_team']:
+            role = your_role if your_role in MATCHUP_ROLES and enemy.get('role') == your_role else None
+            matchup = self.matchups.get(your_champion, enemy.get('champion_id'), role)
+            if matchup:
+                matchup['role'] = role
+                matchups[get_champion_name(enemy.get('champion_id'))] = matchup
+        return matchups
+
     def _calculate_threat_level(self, player_data: Dict) -> str:
         """Calcule le niveau de menace d'un joueur"""
         rank = player_data.get('rank', 'Unknown')
@@ -190,6 +247,16 @@ class LiveGameCoach:
         elif kda >= 3:
             threat_score += 1
 
+        # Facteur de performance : centile moyen face aux joueurs du même rôle et tier
+        benchmark = player_data.get('benchmark')
+        if benchmark:
+            if benchmark['score'] >= 80:
+                threat_score += 2
+            elif benchmark['score'] >= 65:
+                threat_score += 1
+            elif benchmark['score'] < 30:
+                threat_score -= 1
+
         # Déterminer le niveau de menace
         if threat_score >= 7:
             return "🔴 TRÈS ÉLEVÉ"
@@ -200,7 +267,8 @@ class LiveGameCoach:
         else:
             return "🟢 FAIBLE"
 
-    def _generate_recommendations(self, your_team: list, enemy_team: list, enemy_analysis: Dict) -> list:
+    def _generate_recommendations(self, your_team: list, enemy_team: list, enemy_analysis: Dict,
+                                  matchups: Dict = None) -> list:
         """Génère des recommandations basées sur l'analyse"""
         recommendations = []
 
@@ -220,6 +288,15 @@ class LiveGameCoach:
             for threat in threats:
                 recommendations.append(f"   • {threat['name']} ({threat['rank']}) - {threat['threat_level']} - WR: {threat['winrate']:.1f}%")
 
+        # Matchups difficiles d'après l'historique local
+        hard = [(champion, m) for champion, m in (matchups or {}).items()
+                if m['games'] >= MATCHUP_MIN_GAMES and m['winrate'] <= 45]
+        if hard:
+            recommendations.append("\n⚔️  MATCHUPS DIFFICILES :")
+            for champion, matchup in hard:
+                recommendations.append(f"   • {champion} : {matchup['winrate']:.0f}% WR sur {matchup['games']} parties, "
+                                       f"{matchup['gold_diff']:+.0f} or en fin de partie")
+
         # Conseils généraux
         recommendations.append("\n💡 CONSEILS STRATÉGIQUES :")
         recommendations.append("   • Communiquez avec votre équipe dès la phase de picks")
@@ -263,11 +340,23 @@ class LiveGameCoach:
                     report.append(f"   KDA moyen : {stats.get('kda_avg', 0):.2f}")
                     report.append(f"   Performance récente : {stats.get('wins', 0)}W - {stats.get('losses', 0)}L sur les {stats.get('total_games', 0)} dernières parties")
 
+                benchmark = data.get('benchmark')
+                if benchmark:
+                    report.append(f"   Centiles ({benchmark['role']}, {benchmark['tier']}) : "
+                                  + ' | '.join(format_benchmark_lines(benchmark)))
+
                 # Champions principaux
                 if data.get('main_champions'):
-                    report.append(f"   Champions mains : ", end='')
-                    champ_info = [f"Level {m['level']} ({m['points']:,} pts)" for m in data['main_champions'][:3]]
-                    report.append(", ".join(champ_info))
+                    report.append(f"   Champions mains : {', '.join(data['main_champions'][:3])}")
+
+        # Matchups (historique local)
+        if analysis.get('matchups'):
+            your_champion = get_champion_name(analysis.get('your_champion'))
+            report.append("\n" + "-" * 80)
+            report.append("⚔️  MATCHUPS (historique local) :")
+            report.append("-" * 80)
+            for enemy_champion, matchup in analysis['matchups'].items():
+                report.append(f"   • {format_matchup_line(your_champion, enemy_champion, matchup)}")
 
         # Recommandations
         if analysis.get('recommendations'):
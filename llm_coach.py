@@ -6,13 +6,21 @@ import os
 import json
 from typing import Dict, List, Optional
 
+from benchmarks import format_benchmark_lines
+from cassette import Cassette
+from matchup_index import MATCHUP_MIN_GAMES, format_matchup_line
+from trends import format_trend_lines
+
 class LLMCoach:
-    def __init__(self, api_key: str = None, provider: str = "openai"):
+    def __init__(self, api_key: str = None, provider: str = "openai", cassette: Cassette = None):
         """
         Initialize le coach LLM
         provider: "openai" pour GPT (défaut), "anthropic" pour Claude
+        cassette: enregistrement / rejeu des réponses (défaut : variables COACH_LOL_CASSETTE*)
         """
         self.provider = provider
+        self.client = None
+        self.cassette = cassette or Cassette.from_env()
 
         if provider == "openai":
             # Pour OpenAI (par défaut)
@@ -43,8 +51,22 @@ class LLMCoach:
                 self.client = None
 
     def is_available(self) -> bool:
-        """Vérifie si le LLM est disponible"""
-        return self.client is not None
+        """Vérifie si le LLM est disponible (client configuré ou cassette en rejeu)"""
+        return self.client is not None or (self.cassette is not None and self.cassette.mode == 'replay')
+
+    def _cassette_key(self, model: str, prompt: str) -> str:
+        return Cassette.make_key(self.provider, model, prompt)
+
+    def _replay(self, model: str, prompt: str) -> Optional[str]:
+        """Réponse rejouée depuis la cassette, ou None si aucune cassette n'est en rejeu"""
+        if self.cassette is None or self.cassette.mode != 'replay':
+            return None
+        text = self.cassette.replay_text(self._cassette_key(model, prompt))
+        return text if text is not None else "❌ Réponse absente de la cassette"
+
+    def _record(self, model: str, prompt: str, text: str):
+        if self.cassette is not None and self.cassette.mode == 'record':
+            self.cassette.record_text(self._cassette_key(model, prompt), text)
 
     def analyze_player_performance(self, stats: Dict, player_name: str) -> str:
         """
@@ -147,6 +169,20 @@ Top champions:"""
 
                 prompt += f"\n{champ} ({champ_role}): {cs['games']}g, {wr:.0f}%WR, {kda:.1f}KDA"
 
+        # Centiles face à la population du même rôle / tier
+        benchmark = stats.get('benchmark')
+        if benchmark:
+            prompt += f"\n\nCentiles vs joueurs {benchmark['role']} (tier {benchmark['tier']}):"
+            for line in format_benchmark_lines(benchmark):
+                prompt += f"\n- {line}"
+
+        # Tendances récentes (forme du moment, séries)
+        trends = stats.get('trends')
+        if trends and trends.get('windows'):
+            prompt += "\n\nTendances récentes:"
+            for line in format_trend_lines(trends):
+                prompt += f"\n- {line}"
+
         prompt += f"""
 
 Analyse ce joueur {main_role} en 5 sections:
@@ -193,10 +229,22 @@ Adapte tes conseils au rôle {main_role}. Sois direct, technique, avec chiffres.
             if stats:
                 prompt += f" - {stats.get('kda_avg', 0):.1f}KDA"
 
+            benchmark = data.get('benchmark')
+            if benchmark:
+                prompt += f" - centile moyen {benchmark['score']:.0f} ({benchmark['role']})"
+
             prompt += f" - Menace: {threat}"
 
             prompt += "\n"
 
+        # Historique local de votre champion contre ces picks
+        matchups = analysis.get('matchups')
+        if matchups:
+            your_champion = get_champion_name(analysis.get('your_champion'))
+            prompt += "\nHistorique matchups (base locale):\n"
+            for enemy_champion, matchup in matchups.items():
+                prompt += f"- {format_matchup_line(your_champion, enemy_champion, matchup)}\n"
+
         prompt += f"""
 IMPORTANT: Analyse UNIQUEMENT les champions joués ACTUELLEMENT dans cette partie (listés ci-dessus).
 NE PAS parler des champions habituels qui ne sont PAS dans cette game.
@@ -224,7 +272,9 @@ Ton rang : {your_rank}
 """
 
         if matchup_history:
-            prompt += f"\nHistorique sur ce matchup : {matchup_history.get('games', 0)} parties, {matchup_history.get('winrate', 0):.1f}% WR\n"
+            prompt += f"\nHistorique sur ce matchup : {format_matchup_line(your_champ, enemy_champ, matchup_history)}\n"
+            if matchup_history.get('games', 0) < MATCHUP_MIN_GAMES:
+                prompt += "(échantillon faible : chiffres indicatifs)\n"
 
         prompt += """
 
@@ -244,9 +294,14 @@ Sois très spécifique et actionnable. Utilise des emojis.
 
     def _call_gpt(self, prompt: str) -> str:
         """Appelle l'API OpenAI GPT"""
+        model = "gpt-4o"  # Retour à GPT-4o - GPT-5 a des limites de tokens trop strictes
+        replayed = self._replay(model, prompt)
+        if replayed is not None:
+            return replayed
+
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4o",  # Retour à GPT-4o - GPT-5 a des limites de tokens trop strictes
+                model=model,
                 messages=[
                     {"role": "system", "content": "Coach LoL pro (Challenger/Master). Analyse technique, directe, avec vocabulaire LoL (macro, micro, wave management). Sois précis et actionnable."},
                     {"role": "user", "content": prompt}
@@ -263,23 +318,31 @@ Sois très spécifique et actionnable. Utilise des emojis.
             if content is None or len(content) == 0:
                 return f"❌ GPT-5 a retourné une réponse vide (finish_reason={finish_reason}, content={'None' if content is None else 'empty string'})"
 
+            self._record(model, prompt, content)
             return content
         except Exception as e:
             return f"❌ Erreur OpenAI API : {str(e)}"
 
     def _call_claude(self, prompt: str) -> str:
         """Appelle l'API Claude d'Anthropic"""
+        model = "claude-3-5-sonnet-20241022"
+        replayed = self._replay(model, prompt)
+        if replayed is not None:
+            return replayed
+
         try:
             import anthropic
             message = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
+                model=model,
                 max_tokens=2000,
                 temperature=0.7,
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
             )
-            return message.content[0].text
+            text = message.content[0].text
+            self._record(model, prompt, text)
+            return text
         except Exception as e:
             return f"❌ Erreur Claude API : {str(e)}"
 
@@ -0,0 +1,411 @@
+"""
+Module d'archivage compressé des matchs (match-v5)
+Les payloads de match se répètent énormément d'une partie à l'autre (mêmes clés, mêmes blocs
+perks / challenges) : un dictionnaire de compression entraîné sur nos propres matchs
+divise fortement leur taille, tout en gardant un accès direct par match ID
+
+zstandard est utilisé s'il est installé (dictionnaire zstd entraîné), sinon zlib avec un
+dictionnaire prédéfini (zdict, 32 Ko maximum)
+
+Utilisation :
+    python match_archive.py --import-cache cache/matches.sqlite
+    python match_archive.py --train --stats
+"""
+import argparse
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from match_decoder import loads
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+DEFAULT_ARCHIVE_PATH = os.path.join('cache', 'match_archive.sqlite')
+# Taille des dictionnaires (zlib ne peut pas utiliser plus de 32 Ko de dictionnaire)
+ZSTD_DICT_SIZE = 112 * 1024
+ZLIB_DICT_SIZE = 32 * 1024
+# Nombre de matchs échantillonnés pour l'entraînement, et seuil d'entraînement automatique
+TRAIN_SAMPLES = 500
+AUTO_TRAIN_AFTER = 200
+
+# En-tête d'un blob compressé : octet magique, codec, identifiant du dictionnaire (0 = aucun)
+_MAGIC = 0xC1
+_HEADER = struct.Struct('>BcI')
+CODEC_ZSTD = b'S'
+CODEC_ZLIB = b'Z'
+# Nombre maximum de paramètres par requête SQLite (read_many)
+_SQL_BATCH = 500
+
+
+def default_codec() -> bytes:
+    return CODEC_ZSTD if zstd is not None else CODEC_ZLIB
+
+
+def train_dictionary(samples: List[bytes], codec: bytes = None, size: int = None) -> bytes:
+    """
+    Entraîne un dictionnaire de compression sur des payloads de match
+    codec: CODEC_ZSTD ou CODEC_ZLIB (défaut : zstd si disponible)
+    """
+    codec = codec or default_codec()
+    if not samples:
+        raise ValueError("Aucun match pour entraîner le dictionnaire")
+
+    if codec == CODEC_ZSTD:
+        if zstd is None:
+            raise RuntimeError("zstandard n'est pas installé (pip install zstandard)")
+        return zstd.train_dictionary(size or ZSTD_DICT_SIZE, samples).as_bytes()
+
+    # zlib : le dictionnaire est une suite de fragments typiques, les plus utiles en fin
+    # (deflate ne remonte que 32 Ko en arrière). On prend un extrait de chaque match,
+    # pris dans le bloc des participants, qui concentre l'essentiel des clés répétées
+    size = min(size or ZLIB_DICT_SIZE, ZLIB_DICT_SIZE)
+    chunk = max(size // len(samples), 512)
+    fragments = []
+    for sample in samples:
+        start = sample.find(b'"participants":[{')
+        start = start if start >= 0 else 0
+        fragments.append(sample[start:start + chunk])
+    return b''.join(fragments)[-size:]
+
+
+class MatchCodec:
+    def __init__(self, dictionary: bytes = None, codec: bytes = None, level: int = None):
+        """
+        Compresse / décompresse des payloads de match avec un dictionnaire optionnel
+        dictionary: dictionnaire entraîné (train_dictionary), None pour compresser sans
+        codec: CODEC_ZSTD ou CODEC_ZLIB (défaut : zstd si disponible)
+        level: niveau de compression (défaut : 9 pour zstd, 6 pour zlib)
+        """
+        self.codec = codec or default_codec()
+        if self.codec == CODEC_ZSTD and zstd is None:
+            raise RuntimeError("zstandard n'est pas installé (pip install zstandard)")
+
+        self.dictionary = dictionary or b''
+        self.dict_id = zlib.crc32(self.dictionary) if self.dictionary else 0
+        self.level = level if level is not None else (9 if self.codec == CODEC_ZSTD else 6)
+        # Les objets zstd ne sont pas utilisables par plusieurs threads à la fois
+        self._lock = threading.Lock()
+
+        if self.codec == CODEC_ZSTD:
+            dict_data = zstd.ZstdCompressionDict(self.dictionary) if self.dictionary else None
+            self._compressor = zstd.ZstdCompressor(level=self.level, dict_data=dict_data)
+            self._decompressor = zstd.ZstdDecompressor(dict_data=dict_data)
+
+    @classmethod
+    def from_file(cls, path: str, codec: bytes = None) -> 'MatchCodec':
+        """Charge un dictionnaire enregistré avec save()"""
+        with open(path, 'rb') as f:
+            return cls(f.read(), codec=codec)
+
+    def save(self, path: str):
+        """Enregistre le dictionnaire (pour MatchStore(codec=...) ou un autre poste)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.dictionary)
+
+    def compress(self, payload: bytes) -> bytes:
+        header = _HEADER.pack(_MAGIC, self.codec, self.dict_id)
+        if self.codec == CODEC_ZSTD:
+            with self._lock:
+                return header + self._compressor.compress(payload)
+
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 15, 9, zlib.Z_DEFAULT_STRATEGY, self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level)
+        return header + compressor.compress(payload) + compressor.flush()
+
+    def decompress(self, blob: bytes) -> bytes:
+        magic, codec, dict_id = _HEADER.unpack_from(blob)
+        if magic != _MAGIC:
+            raise ValueError("Blob non compressé par MatchCodec")
+        if codec != self.codec or dict_id != self.dict_id:
+            raise ValueError(f"Blob compressé avec un autre codec / dictionnaire ({codec!r}, {dict_id})")
+
+        body = blob[_HEADER.size:]
+        if self.codec == CODEC_ZSTD:
+            with self._lock:
+                return self._decompressor.decompress(body)
+
+        decompressor = zlib.decompressobj(15, zdict=self.dictionary) if self.dictionary else zlib.decompressobj()
+        return decompressor.decompress(body) + decompressor.flush()
+
+
+def is_compressed(blob: bytes) -> bool:
+    """Vrai si le blob a été produit par MatchCodec (un payload JSON brut commence par '{')"""
+    return len(blob) >= _HEADER.size and blob[0] == _MAGIC
+
+
+def blob_dict_id(blob: bytes) -> Tuple[bytes, int]:
+    """Codec et identifiant du dictionnaire d'un blob compressé"""
+    _, codec, dict_id = _HEADER.unpack_from(blob)
+    return codec, dict_id
+
+
+class MatchArchive:
+    def __init__(self, path: str = None, codec: bytes = None, level: int = None,
+                 auto_train_after: int = AUTO_TRAIN_AFTER):
+        """
+        Archive SQLite de matchs compressés, indexée par match ID
+        Pas d'éviction : destinée à conserver des mois d'historique des joueurs suivis
+        auto_train_after: entraîne un dictionnaire dès que l'archive atteint ce nombre
+        de matchs (0 pour désactiver ; voir aussi train())
+        """
+        self.path = path or os.getenv('COACH_LOL_MATCH_ARCHIVE', DEFAULT_ARCHIVE_PATH)
+        self.codec_name = codec or default_codec()
+        self.level = level
+        self.auto_train_after = auto_train_after
+        self.decoded_bytes = 0
+        self.decode_seconds = 0.0
+        self._lock = threading.Lock()
+        self._codecs: Dict[int, MatchCodec] = {}
+
+        if self.path != ':memory:':
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dictionaries ("
+            "dict_id INTEGER PRIMARY KEY, codec TEXT NOT NULL, data BLOB NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS archive ("
+            "match_id TEXT PRIMARY KEY, raw_size INTEGER NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM archive").fetchone()[0]
+
+        # Dictionnaire courant : le plus récent pour ce codec
+        row = self._conn.execute(
+            "SELECT dict_id FROM dictionaries WHERE codec = ? ORDER BY created DESC LIMIT 1",
+            (self.codec_name.decode(),)
+        ).fetchone()
+        self.codec = self._get_codec(self.codec_name, row[0] if row else 0)
+
+    def _get_codec(self, codec: bytes, dict_id: int) -> MatchCodec:
+        """Codec correspondant à un dictionnaire (les anciens restent lisibles après ré-entraînement)"""
+        key = (codec, dict_id)
+        match_codec = self._codecs.get(key)
+        if match_codec is None:
+            dictionary = None
+            if dict_id:
+                row = self._conn.execute(
+                    "SELECT data FROM dictionaries WHERE dict_id = ?", (dict_id,)
+                ).fetchone()
+                if row is None:
+                    raise ValueError(f"Dictionnaire {dict_id} absent de l'archive")
+                dictionary = bytes(row[0])
+            match_codec = self._codecs[key] = MatchCodec(dictionary, codec=codec, level=self.level)
+        return match_codec
+
+    def _decode(self, blob: bytes) -> bytes:
+        start = time.perf_counter()
+        payload = self._get_codec(*blob_dict_id(blob)).decompress(blob)
+        self.decode_seconds += time.perf_counter() - start
+        self.decoded_bytes += len(payload)
+        return payload
+
+    def put(self, match_id: str, payload: bytes):
+        """Archive le payload JSON brut d'un match"""
+        self.append_many([(match_id, payload)])
+
+    def append_many(self, items: Iterable[Tuple[str, bytes]]) -> int:
+        """
+        Archive plusieurs matchs en une seule transaction
+        items: couples (match_id, payload JSON brut)
+        Retourne le nombre de matchs ajoutés (les matchs déjà archivés sont remplacés)
+        """
+        with self._lock:
+            added = 0
+            for match_id, payload in items:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM archive WHERE match_id = ?", (match_id,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO archive (match_id, raw_size, payload) VALUES (?, ?, ?)",
+                    (match_id, len(payload), sqlite3.Binary(self.codec.compress(payload)))
+                )
+                if not exists:
+                    added += 1
+            self._count += added
+            self._conn.commit()
+            should_train = (self.auto_train_after and not self.codec.dict_id
+                            and self._count >= self.auto_train_after)
+
+        if should_train:
+            self.train()
+        return added
+
+    def get_raw(self, match_id: str) -> Optional[bytes]:
+        """Retourne le payload JSON brut d'un match, ou None s'il n'est pas archivé"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM archive WHERE match_id = ?", (match_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            return self._decode(bytes(row[0]))
+
+    def get(self, match_id: str) -> Optional[Dict]:
+        """Retourne les détails d'un match décodés, ou None s'il n'est pas archivé"""
+        payload = self.get_raw(match_id)
+        if payload is None:
+            return None
+        return loads(payload)
+
+    def read_many(self, match_ids: Iterable[str]) -> Dict[str, bytes]:
+        """Payloads JSON bruts des matchs archivés parmi match_ids (les absents sont ignorés)"""
+        match_ids = list(match_ids)
+        result = {}
+        with self._lock:
+            for i in range(0, len(match_ids), _SQL_BATCH):
+                batch = match_ids[i:i + _SQL_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT match_id, payload FROM archive WHERE match_id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for match_id, blob in rows:
+                    result[match_id] = self._decode(bytes(blob))
+        return result
+
+    def iter_ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT match_id FROM archive ORDER BY match_id")]
+
+    def train(self, samples: List[bytes] = None, size: int = None, recompress: bool = True) -> int:
+        """
+        Entraîne un nouveau dictionnaire et en fait le dictionnaire courant
+        samples: payloads d'entraînement (défaut : jusqu'à TRAIN_SAMPLES matchs de l'archive)
+        recompress: recompresse les matchs existants avec le nouveau dictionnaire
+        Retourne l'identifiant du dictionnaire
+        """
+        if samples is None:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT payload FROM archive ORDER BY RANDOM() LIMIT ?", (TRAIN_SAMPLES,)
+                ).fetchall()
+                samples = [self._decode(bytes(row[0])) for row in rows]
+
+        dictionary = train_dictionary(samples, codec=self.codec_name, size=size)
+        codec = MatchCodec(dictionary, codec=self.codec_name, level=self.level)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dictionaries (dict_id, codec, data, created) VALUES (?, ?, ?, ?)",
+                (codec.dict_id, self.codec_name.decode(), sqlite3.Binary(dictionary), time.time())
+            )
+            self._conn.commit()
+            self._codecs[(self.codec_name, codec.dict_id)] = codec
+            self.codec = codec
+
+        if recompress:
+            self.recompress()
+        return codec.dict_id
+
+    def recompress(self) -> int:
+        """Recompresse avec le dictionnaire courant les matchs archivés avec un autre"""
+        with self._lock:
+            current = (self.codec.codec, self.codec.dict_id)
+            updated = 0
+            rows = self._conn.execute("SELECT match_id, payload FROM archive").fetchall()
+            for match_id, blob in rows:
+                blob = bytes(blob)
+                if blob_dict_id(blob) == current:
+                    continue
+                payload = self._decode(blob)
+                self._conn.execute(
+                    "UPDATE archive SET payload = ? WHERE match_id = ?",
+                    (sqlite3.Binary(self.codec.compress(payload)), match_id)
+                )
+                updated += 1
+            self._conn.commit()
+            return updated
+
+    def __contains__(self, match_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM archive WHERE match_id = ?", (match_id,)
+            ).fetchone()
+            return row is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def stats(self) -> Dict:
+        """Taille brute / compressée, taux de compression et débit de décompression mesuré"""
+        with self._lock:
+            raw_bytes, stored_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(payload)), 0) FROM archive"
+            ).fetchone()
+        return {
+            'entries': self._count,
+            'codec': 'zstd' if self.codec.codec == CODEC_ZSTD else 'zlib',
+            'dict_id': self.codec.dict_id,
+            'dict_size': len(self.codec.dictionary),
+            'raw_bytes': raw_bytes,
+            'stored_bytes': stored_bytes,
+            'compression_ratio': (raw_bytes / stored_bytes) if stored_bytes else 0.0,
+            'decoded_bytes': self.decoded_bytes,
+            'decode_mb_per_s': (self.decoded_bytes / self.decode_seconds / 1e6) if self.decode_seconds else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive compressée des matchs")
+    parser.add_argument('--archive', default=None, help=f"fichier de l'archive (défaut : {DEFAULT_ARCHIVE_PATH})")
+    parser.add_argument('--import-cache', metavar='PATH', help="importe les matchs d'un cache MatchStore")
+    parser.add_argument('--train', action='store_true', help="entraîne un nouveau dictionnaire")
+    parser.add_argument('--export-dict', metavar='PATH', help="enregistre le dictionnaire courant (MatchStore)")
+    parser.add_argument('--stats', action='store_true', help="affiche les statistiques et mesure le décodage")
+    args = parser.parse_args()
+
+    archive = MatchArchive(args.archive)
+
+    if args.import_cache:
+        from match_store import MatchStore
+        store = MatchStore(args.import_cache)
+        skipped = []
+        added = archive.append_many(store.iter_raw(skipped))
+        store.close()
+        print(f"✅ {added} matchs importés depuis {args.import_cache}")
+        if skipped:
+            print(f"⚠️  {len(skipped)} matchs illisibles ignorés (codec manquant ou payload corrompu)")
+
+    if args.train:
+        dict_id = archive.train()
+        print(f"✅ Dictionnaire {dict_id} entraîné ({len(archive.codec.dictionary)} octets)")
+
+    if args.export_dict:
+        archive.codec.save(args.export_dict)
+        print(f"✅ Dictionnaire enregistré dans {args.export_dict}")
+
+    if args.stats:
+        archive.read_many(archive.iter_ids())
+        stats = archive.stats()
+        print(f"📦 {stats['entries']} matchs ({stats['codec']}, dictionnaire {stats['dict_size']} octets)")
+        print(f"   {stats['raw_bytes'] / 1e6:.1f} Mo -> {stats['stored_bytes'] / 1e6:.1f} Mo "
+              f"(ratio {stats['compression_ratio']:.1f}x)")
+        print(f"   Décompression : {stats['decode_mb_per_s']:.0f} Mo/s")
+
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
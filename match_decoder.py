@@ -0,0 +1,145 @@
+"""
+Module de décodage compact des matchs (match-v5)
+Un payload de match contient ~150 champs par participant ; l'analyse n'en utilise qu'une vingtaine.
+Ce module ne conserve que ces champs dans des objets à __slots__, accessibles comme des dicts
+(match['info']['participants'][0]['kills']) pour rester compatibles avec DataAnalyzer
+orjson est utilisé s'il est installé (décodage JSON plus rapide), sinon json
+"""
+import json
+from operator import attrgetter, itemgetter
+from typing import Dict, Iterable
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    orjson = None
+    loads = json.loads
+
+# Champs conservés pour chaque participant (analyse, prompts LLM, matchups)
+PARTICIPANT_FIELDS = (
+    'puuid', 'participantId', 'teamId', 'teamPosition', 'individualPosition',
+    'championId', 'championName', 'champLevel', 'win',
+    'kills', 'deaths', 'assists',
+    'totalMinionsKilled', 'neutralMinionsKilled', 'visionScore',
+    'totalDamageDealtToChampions', 'goldEarned',
+    'riotIdGameName', 'riotIdTagline', 'summonerName',
+)
+
+# Champs conservés pour les informations générales du match
+INFO_FIELDS = (
+    'gameId', 'platformId', 'queueId', 'gameMode', 'gameVersion',
+    'gameCreation', 'gameStartTimestamp', 'gameEndTimestamp', 'gameDuration',
+)
+
+
+class _Record:
+    """Base des enregistrements compacts : accès par attribut ou comme un dict (lecture seule)"""
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def keys(self):
+        return [field for field in self.__slots__ if not field.startswith('_') and hasattr(self, field)]
+
+    def to_dict(self) -> Dict:
+        result = {}
+        for field in self.keys():
+            value = getattr(self, field)
+            if isinstance(value, _Record):
+                value = value.to_dict()
+            elif isinstance(value, tuple) and value and isinstance(value[0], _Record):
+                value = [item.to_dict() for item in value]
+            result[field] = value
+        return result
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+
+def _copy_fields(record: _Record, data: Dict, fields: Iterable[str]):
+    # Un champ absent du payload reste absent (get() renvoie alors la valeur par défaut, comme un dict)
+    for field in fields:
+        if field in data:
+            setattr(record, field, data[field])
+
+
+class ParticipantRecord(_Record):
+    __slots__ = PARTICIPANT_FIELDS
+
+    def __init__(self, data: Dict):
+        _copy_fields(self, data, PARTICIPANT_FIELDS)
+
+
+class InfoRecord(_Record):
+    __slots__ = INFO_FIELDS + ('participants',)
+
+    def __init__(self, data: Dict):
+        _copy_fields(self, data, INFO_FIELDS)
+        self.participants = tuple(ParticipantRecord(p) for p in data.get('participants', ()))
+
+
+class MetadataRecord(_Record):
+    __slots__ = ('matchId', 'participants')
+
+    def __init__(self, data: Dict):
+        self.matchId = data.get('matchId', '')
+        self.participants = tuple(data.get('participants', ()))
+
+
+class MatchRecord(_Record):
+    # _parsed : index des participants (parsed_match.parse_match), construit à la demande
+    __slots__ = ('metadata', 'info', '_parsed')
+
+    def __init__(self, data: Dict):
+        self.metadata = MetadataRecord(data.get('metadata', {}))
+        self.info = InfoRecord(data.get('info', {}))
+        self._parsed = None
+
+    @property
+    def match_id(self) -> str:
+        return self.metadata.matchId
+
+
+def compact_match(match: Dict) -> MatchRecord:
+    """Réduit un match déjà décodé aux seuls champs utilisés"""
+    return MatchRecord(match)
+
+
+def decode_match(payload: bytes) -> MatchRecord:
+    """Décode un payload JSON brut de match en enregistrement compact"""
+    return MatchRecord(loads(payload))
+
+
+# Champs lus par les analyses (MatchFrame, StatsAccumulator) sur chaque participant
+_ROW_FIELDS = ('puuid', 'teamId', 'championName', 'teamPosition', 'win', 'kills', 'deaths', 'assists',
+               'totalMinionsKilled', 'neutralMinionsKilled', 'visionScore', 'totalDamageDealtToChampions', 'goldEarned')
+_get_item_fields = itemgetter(*_ROW_FIELDS)
+_get_attr_fields = attrgetter(*_ROW_FIELDS)
+
+
+def _participant_row(p) -> tuple:
+    """
+    (puuid, teamId, champion, rôle, victoire, kills, deaths, assists, CS, vision, dégâts, or)
+    d'un participant (dict match-v5 ou ParticipantRecord)
+    """
+    try:
+        # Chemin rapide : un seul appel C pour tous les champs (dict ou MatchRecord complet)
+        values = _get_attr_fields(p) if isinstance(p, _Record) else _get_item_fields(p)
+    except (KeyError, AttributeError):
+        values = (p['puuid'], p['teamId'], p['championName'], p.get('teamPosition', 'UNKNOWN'), p['win'],
+                  p['kills'], p['deaths'], p['assists'], p['totalMinionsKilled'], p.get('neutralMinionsKilled', 0),
+                  p.get('visionScore', 0), p['totalDamageDealtToChampions'], p['goldEarned'])
+    (puuid, team_id, champion, role, win, kills, deaths, assists,
+     minions, neutral, vision, damage, gold) = values
+    return (puuid, team_id, champion, role, win, kills, deaths, assists, minions + neutral, vision, damage, gold)
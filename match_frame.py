@@ -0,0 +1,185 @@
+"""
+Module de statistiques en colonnes (pandas / NumPy)
+Les matchs sont lus une seule fois et rangés dans un DataFrame (une ligne par participant) ;
+winrate, KDA, kill participation, CS/min et agrégats par champion / rôle sont ensuite
+calculés par opérations vectorisées et group-by, y compris sur des milliers de parties
+"""
+from array import array
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from match_decoder import _participant_row
+from performance_records import ChampionAggregate, GamePerformance
+
+# Colonnes lues sur chaque participant (voir match_decoder._participant_row) ; les valeurs
+# numériques tiennent en int32
+PARTICIPANT_COLUMNS = ('puuid', 'team_id', 'champion', 'role', 'win', 'kills', 'deaths', 'assists',
+                       'cs', 'vision', 'damage', 'gold')
+_ROW_DTYPE = np.dtype([
+    ('puuid', object), ('team_id', np.int32), ('champion', object), ('role', object), ('win', bool),
+    ('kills', np.int32), ('deaths', np.int32), ('assists', np.int32), ('cs', np.int32),
+    ('vision', np.int32), ('damage', np.int32), ('gold', np.int32)
+])
+
+
+class MatchFrame:
+    def __init__(self, frame: pd.DataFrame, match_count: int):
+        """
+        frame: une ligne par participant (voir from_matches)
+        match_count: nombre de matchs ingérés (y compris ceux sans participants)
+        """
+        self.frame = frame
+        self.match_count = match_count
+        # Copie NumPy des PUUID : la sélection d'un joueur évite la comparaison de chaînes pandas
+        self._puuids = frame['puuid'].to_numpy(dtype=object)
+
+    @classmethod
+    def from_matches(cls, matches: List[Dict]) -> 'MatchFrame':
+        """Construit le DataFrame à partir de matchs (dicts match-v5 ou MatchRecord)"""
+        rows = []
+        counts = []
+        match_ids = []
+        durations = []
+        for match in matches:
+            info = match.get('info', {})
+            participants = info.get('participants', [])
+            match_ids.append(match.get('metadata', {}).get('matchId', ''))
+            durations.append(info.get('gameDuration', 0))
+            counts.append(len(participants))
+            rows.extend(_participant_row(p) for p in participants)
+
+        # Conversion en colonnes en une passe C (tableau structuré), sans transposer en Python
+        records = np.array(rows, dtype=_ROW_DTYPE)
+        data = {name: records[name] for name in PARTICIPANT_COLUMNS}
+
+        counts = np.array(counts, dtype=np.int64)
+        data['match_index'] = np.repeat(np.arange(len(matches), dtype=np.int32), counts)
+        data['match_id'] = np.repeat(np.array(match_ids, dtype=object), counts)
+        data['duration'] = np.repeat(np.array(durations, dtype=np.int32), counts)
+        frame = pd.DataFrame(data)
+
+        # Kills de chaque équipe, sans reparcourir les participants match par match
+        team_key = data['match_index'].astype(np.int64) * 2 + (data['team_id'] != 100)
+        team_kills = np.bincount(team_key, weights=data['kills'], minlength=2 * len(matches))
+        frame['team_kills'] = team_kills[team_key].astype(np.int32)
+        return cls(frame, len(matches))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def player(self, puuid: str) -> pd.DataFrame:
+        """Lignes d'un joueur, dans l'ordre des matchs"""
+        return self.frame.take(np.flatnonzero(self._puuids == puuid))
+
+    def champion_aggregates(self, puuid: str) -> pd.DataFrame:
+        """Parties, winrate, KDA et CS/min par champion (trié par nombre de parties)"""
+        return self._aggregates(self.player(puuid), 'champion')
+
+    def role_aggregates(self, puuid: str) -> pd.DataFrame:
+        """Parties, winrate, KDA et CS/min par rôle (trié par nombre de parties)"""
+        return self._aggregates(self.player(puuid), 'role')
+
+    @staticmethod
+    def _aggregates(rows: pd.DataFrame, key: str) -> pd.DataFrame:
+        rows = rows.assign(cs_per_min=rows['cs'] / (rows['duration'] / 60))
+        grouped = rows.groupby(key, sort=False, observed=True).agg(
+            games=('win', 'size'), wins=('win', 'sum'), kills=('kills', 'sum'),
+            deaths=('deaths', 'sum'), assists=('assists', 'sum'), cs_per_min=('cs_per_min', 'mean')
+        )
+        grouped['winrate'] = grouped['wins'] / grouped['games'] * 100
+        grouped['kda'] = (grouped['kills'] + grouped['assists']) / grouped['deaths'].clip(lower=1)
+        return grouped.sort_values('games', ascending=False, kind='stable')
+
+    def player_stats(self, puuid: str) -> Dict:
+        """
+        Statistiques d'un joueur, au même format que DataAnalyzer.analyze_match_history
+        (moyennes de vision et de CS/min sur le nombre total de matchs, comme l'original)
+        """
+        if not self.match_count:
+            return {}
+
+        rows = self.player(puuid)
+        total_games = self.match_count
+
+        kills = rows['kills'].to_numpy()
+        deaths = rows['deaths'].to_numpy()
+        assists = rows['assists'].to_numpy()
+        wins = rows['win'].to_numpy()
+        cs = rows['cs'].to_numpy()
+        duration_min = rows['duration'].to_numpy() / 60
+        cs_per_min = cs / duration_min
+        vision = rows['vision'].to_numpy()
+
+        stats = {
+            'total_games': total_games,
+            'wins': int(wins.sum()),
+            'losses': int(len(wins) - wins.sum()),
+            'kills': array('i', kills.tolist()),
+            'deaths': array('i', deaths.tolist()),
+            'assists': array('i', assists.tolist()),
+            'champions': defaultdict(ChampionAggregate),
+            'roles': defaultdict(int),
+            'recent_performance': [],
+            'kda_avg': 0.0,
+            'vision_score_avg': 0.0,
+            'cs_per_min_avg': 0.0,
+            'kill_participation': 0.0
+        }
+
+        # Agrégats par champion et par rôle : factorize garde l'ordre de première apparition
+        # (celui des dicts de l'original), bincount somme chaque colonne par groupe
+        champion_codes, champion_names = pd.factorize(rows['champion'].to_numpy())
+        role_codes, role_names = pd.factorize(rows['role'].to_numpy())
+        n_champions = len(champion_names)
+        sums = {
+            name: np.bincount(champion_codes, weights=values, minlength=n_champions).astype(np.int64)
+            for name, values in (('games', None), ('wins', wins), ('kills', kills),
+                                 ('deaths', deaths), ('assists', assists))
+        }
+        for i, champion in enumerate(champion_names.tolist()):
+            stats['champions'][champion] = ChampionAggregate(
+                int(sums['games'][i]), int(sums['wins'][i]), int(sums['kills'][i]),
+                int(sums['deaths'][i]), int(sums['assists'][i])
+            )
+
+        pair_codes, pairs = pd.factorize(champion_codes * max(len(role_names), 1) + role_codes)
+        pair_counts = np.bincount(pair_codes, minlength=len(pairs))
+        role_names = role_names.tolist()
+        champion_names = champion_names.tolist()
+        for pair, count in zip(pairs.tolist(), pair_counts.tolist()):
+            champion, role = divmod(pair, max(len(role_names), 1))
+            stats['champions'][champion_names[champion]].roles.add(role_names[role], count)
+        for role, count in zip(role_names, np.bincount(role_codes, minlength=len(role_names)).tolist()):
+            stats['roles'][role] += count
+
+        stats['recent_performance'] = [
+            GamePerformance(*values)
+            for values in zip(
+                rows['champion'].tolist(), wins.tolist(), kills.tolist(), deaths.tolist(), assists.tolist(),
+                cs.tolist(), cs_per_min.tolist(), vision.tolist(),
+                rows['damage'].tolist(), rows['gold'].tolist()
+            )
+        ]
+
+        played = len(rows)
+        stats['winrate'] = (stats['wins'] / total_games) * 100
+        stats['avg_kills'] = float(kills.mean()) if played else 0.0
+        stats['avg_deaths'] = float(deaths.mean()) if played else 0.0
+        stats['avg_assists'] = float(assists.mean()) if played else 0.0
+        stats['kda_avg'] = (stats['avg_kills'] + stats['avg_assists']) / max(stats['avg_deaths'], 1)
+        stats['vision_score_avg'] = float(vision.sum()) / total_games
+        stats['cs_per_min_avg'] = float(cs_per_min.sum()) / total_games
+
+        # Kill participation : seulement les parties où l'équipe a fait au moins un kill
+        team_kills = rows['team_kills'].to_numpy()
+        has_kills = team_kills > 0
+        if has_kills.any():
+            stats['kill_participation'] = float(
+                ((kills[has_kills] + assists[has_kills]) / team_kills[has_kills] * 100).mean()
+            )
+
+        return stats
+
@@ -0,0 +1,224 @@
+"""
+Module de cache persistant pour les détails de matchs (match-v5)
+Un match terminé ne change jamais : on le télécharge une seule fois et on le garde sur disque
+Les timelines sont gardées dans une table à part, avec leur propre limite : elles ne
+comptent pas dans la capacité des matchs et n'apparaissent pas dans leur liste
+"""
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from match_archive import MatchCodec, is_compressed
+
+DEFAULT_CACHE_PATH = os.path.join('cache', 'matches.sqlite')
+DEFAULT_MAX_ENTRIES = 5000
+# Une timeline pèse plusieurs dizaines de fois un match : limite séparée, plus basse
+DEFAULT_MAX_TIMELINES = 500
+
+MATCHES_TABLE = 'matches'
+TIMELINES_TABLE = 'timelines'
+
+# Suffixe des clés de timeline des versions précédentes (stockées dans la table des matchs)
+_LEGACY_TIMELINE_SUFFIX = '/timeline'
+
+
+class MatchStore:
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES, codec: MatchCodec = None,
+                 max_timelines: int = DEFAULT_MAX_TIMELINES):
+        """
+        Stockage SQLite des payloads de match, indexé par match ID
+        max_entries: nombre maximum de matchs conservés (éviction LRU au-delà)
+        codec: compression des payloads (dictionnaire exporté par match_archive.py) ;
+        par défaut celui de COACH_LOL_MATCH_DICT s'il est défini
+        max_timelines: nombre maximum de timelines conservées (éviction LRU séparée)
+        """
+        self.path = path or os.getenv('COACH_LOL_MATCH_CACHE', DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries
+        self.max_timelines = max_timelines
+        if codec is None and os.getenv('COACH_LOL_MATCH_DICT'):
+            codec = MatchCodec.from_file(os.getenv('COACH_LOL_MATCH_DICT'))
+        self.codec = codec
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        for table in (MATCHES_TABLE, TIMELINES_TABLE):
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "match_id TEXT PRIMARY KEY, payload BLOB NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_access ON {table} (last_access)")
+        self._migrate_timelines()
+        self._conn.commit()
+        self._counts = {
+            table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in (MATCHES_TABLE, TIMELINES_TABLE)
+        }
+
+    def _migrate_timelines(self):
+        """Déplace les timelines rangées parmi les matchs ("<match_id>/timeline") dans leur table"""
+        pattern = f"%{_LEGACY_TIMELINE_SUFFIX}"
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {TIMELINES_TABLE} (match_id, payload, last_access) "
+            f"SELECT substr(match_id, 1, length(match_id) - {len(_LEGACY_TIMELINE_SUFFIX)}), payload, last_access "
+            f"FROM {MATCHES_TABLE} WHERE match_id LIKE ?", (pattern,)
+        )
+        self._conn.execute(f"DELETE FROM {MATCHES_TABLE} WHERE match_id LIKE ?", (pattern,))
+
+    def _get_raw(self, table: str, match_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT payload FROM {table} WHERE match_id = ?", (match_id,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                f"UPDATE {table} SET last_access = ? WHERE match_id = ?", (time.time(), match_id)
+            )
+            self._conn.commit()
+            payload = bytes(row[0])
+
+        return self._decode(match_id, payload)
+
+    def _decode(self, match_id: str, payload: bytes) -> Optional[bytes]:
+        # Les entrées écrites sans codec restent lisibles (JSON brut)
+        if is_compressed(payload):
+            if self.codec is None:
+                print(f"⚠️  Match {match_id} compressé mais aucun codec configuré (COACH_LOL_MATCH_DICT)")
+                return None
+            try:
+                return self.codec.decompress(payload)
+            except ValueError as e:
+                print(f"⚠️  Match {match_id} illisible : {e}")
+                return None
+        return payload
+
+    def _put(self, table: str, match_id: str, payload: bytes, max_entries: int):
+        if self.codec is not None:
+            payload = self.codec.compress(payload)
+
+        with self._lock:
+            exists = self._conn.execute(
+                f"SELECT 1 FROM {table} WHERE match_id = ?", (match_id,)
+            ).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} (match_id, payload, last_access) VALUES (?, ?, ?)",
+                (match_id, sqlite3.Binary(payload), time.time())
+            )
+            if not exists:
+                self._counts[table] += 1
+            self._evict(table, max_entries)
+            self._conn.commit()
+
+    def _evict(self, table: str, max_entries: int):
+        """Supprime les entrées les moins récemment utilisées au-delà de la limite"""
+        overflow = self._counts[table] - max_entries
+        if overflow <= 0:
+            return
+
+        self._conn.execute(
+            f"DELETE FROM {table} WHERE match_id IN "
+            f"(SELECT match_id FROM {table} ORDER BY last_access ASC LIMIT ?)",
+            (overflow,)
+        )
+        self._counts[table] -= overflow
+
+    def get_raw(self, match_id: str) -> Optional[bytes]:
+        """Retourne le payload JSON brut d'un match, ou None s'il n'est pas en cache"""
+        return self._get_raw(MATCHES_TABLE, match_id)
+
+    def get(self, match_id: str) -> Optional[Dict]:
+        """Retourne les détails d'un match décodés, ou None s'il n'est pas en cache"""
+        payload = self.get_raw(match_id)
+        if payload is None:
+            return None
+        return json.loads(payload)
+
+    def put(self, match_id: str, payload: bytes):
+        """Enregistre le payload JSON brut d'un match"""
+        self._put(MATCHES_TABLE, match_id, payload, self.max_entries)
+
+    def get_timeline_raw(self, match_id: str) -> Optional[bytes]:
+        """Retourne le payload JSON brut de la timeline d'un match, ou None"""
+        return self._get_raw(TIMELINES_TABLE, match_id)
+
+    def put_timeline(self, match_id: str, payload: bytes):
+        """Enregistre le payload JSON brut de la timeline d'un match"""
+        self._put(TIMELINES_TABLE, match_id, payload, self.max_timelines)
+
+    def iter_match_ids(self) -> Iterator[str]:
+        """IDs des matchs en cache (timelines exclues), sans modifier leur ordre LRU"""
+        with self._lock:
+            match_ids = [row[0] for row in self._conn.execute(f"SELECT match_id FROM {MATCHES_TABLE}")]
+        return iter(match_ids)
+
+    def iter_raw(self, skipped: List[str] = None) -> Iterator[Tuple[str, bytes]]:
+        """
+        (match ID, payload JSON brut) de chaque match en cache, sans modifier l'ordre LRU
+        Les entrées illisibles (compressées sans codec, corrompues) sont ignorées et,
+        si skipped est fourni, leurs IDs y sont ajoutés
+        """
+        for match_id in self.iter_match_ids():
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT payload FROM {MATCHES_TABLE} WHERE match_id = ?", (match_id,)
+                ).fetchone()
+            if row is None:
+                # Évincé entre-temps
+                continue
+            payload = self._decode(match_id, bytes(row[0]))
+            if payload is None:
+                if skipped is not None:
+                    skipped.append(match_id)
+                continue
+            yield match_id, payload
+
+    def __contains__(self, match_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM {MATCHES_TABLE} WHERE match_id = ?", (match_id,)
+            ).fetchone()
+            return row is not None
+
+    def __len__(self) -> int:
+        return self._counts[MATCHES_TABLE]
+
+    def stats(self) -> Dict:
+        """Statistiques du cache (hits, misses, taux de succès, taille)"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': self._counts[MATCHES_TABLE],
+            'max_entries': self.max_entries,
+            'timelines': self._counts[TIMELINES_TABLE],
+            'max_timelines': self.max_timelines,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups * 100) if lookups else 0.0
+        }
+
+    def clear(self):
+        """Vide entièrement le cache (matchs et timelines)"""
+        with self._lock:
+            for table in (MATCHES_TABLE, TIMELINES_TABLE):
+                self._conn.execute(f"DELETE FROM {table}")
+                self._counts[table] = 0
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
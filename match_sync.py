@@ -0,0 +1,131 @@
+"""
+Module de synchronisation incrémentale de l'historique de matchs
+Pour chaque joueur suivi (PUUID + file), on mémorise le dernier match connu
+afin de ne récupérer ensuite que les nouveaux matchs
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from rate_limiter import PRIORITY_BACKGROUND
+from riot_api import RiotAPI
+
+DEFAULT_SYNC_PATH = os.path.join('cache', 'sync_state.sqlite')
+
+# Une partie commencée avant la dernière synchro peut s'être terminée après :
+# on élargit la fenêtre startTime d'une durée de partie maximale
+SYNC_TIME_MARGIN = 2 * 3600
+
+# Profondeur maximale de la première synchronisation d'un joueur
+DEFAULT_INITIAL_LIMIT = 100
+
+
+class MatchHistorySync:
+    def __init__(self, api: RiotAPI, path: str = None, initial_limit: int = DEFAULT_INITIAL_LIMIT,
+                 priority: int = PRIORITY_BACKGROUND):
+        """
+        api: client Riot utilisé pour les IDs et les détails (cache de matchs inclus)
+        path: fichier SQLite des marqueurs de synchronisation
+        initial_limit: nombre de matchs récupérés lors de la première synchro d'un joueur
+        priority: classe de priorité des requêtes de synchronisation (voir rate_limiter)
+        """
+        self.api = api
+        self.path = path or os.getenv('COACH_LOL_SYNC_STATE', DEFAULT_SYNC_PATH)
+        self.initial_limit = initial_limit
+        self.priority = priority
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "puuid TEXT NOT NULL, queue INTEGER NOT NULL, newest_match_id TEXT, "
+            "last_sync REAL NOT NULL, PRIMARY KEY (puuid, queue))"
+        )
+        self._conn.commit()
+
+    def get_state(self, puuid: str, queue: int = None) -> Optional[Dict]:
+        """Retourne le marqueur de synchronisation d'un joueur, ou None s'il n'a jamais été synchronisé"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_match_id, last_sync FROM sync_state WHERE puuid = ? AND queue = ?",
+                (puuid, queue or 0)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {'newest_match_id': row[0], 'last_sync': row[1]}
+
+    def _save_state(self, puuid: str, queue: int, newest_match_id: str, last_sync: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (puuid, queue, newest_match_id, last_sync) VALUES (?, ?, ?, ?)",
+                (puuid, queue or 0, newest_match_id, last_sync)
+            )
+            self._conn.commit()
+
+    def reset(self, puuid: str, queue: int = None):
+        """Oublie le marqueur d'un joueur (la prochaine synchro repart de zéro)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM sync_state WHERE puuid = ? AND queue = ?", (puuid, queue or 0))
+            self._conn.commit()
+
+    def iter_new_match_ids(self, puuid: str, queue: int = None, failed: List[int] = None) -> Iterator[str]:
+        """
+        Produit les IDs des matchs joués depuis la dernière synchronisation, du plus récent au plus ancien
+        S'arrête dès que le dernier match connu est atteint
+        failed: si fourni, reçoit la position des pages d'IDs en échec (liste alors incomplète)
+        """
+        state = self.get_state(puuid, queue)
+
+        if state is None:
+            ids = self.api.iter_match_history(puuid, queue=queue, limit=self.initial_limit, failed=failed)
+        else:
+            start_time = int(state['last_sync'] - SYNC_TIME_MARGIN)
+            ids = self.api.iter_match_history(puuid, queue=queue, start_time=start_time, failed=failed)
+
+        for match_id in ids:
+            if state is not None and match_id == state['newest_match_id']:
+                return
+            yield match_id
+
+    def sync(self, puuid: str, queue: int = None,
+             on_progress: Callable[[int, int], None] = None) -> List[Dict]:
+        """
+        Récupère uniquement les nouveaux matchs d'un joueur et met à jour son marqueur
+        Retourne les détails des nouveaux matchs, du plus récent au plus ancien
+        Le marqueur n'avance que si la liste des IDs est complète (dernier match connu ou
+        fin de l'historique atteints) et que tous les matchs ont été récupérés : sinon, la
+        synchronisation suivante repart du même point
+        """
+        sync_started = time.time()
+        failed_pages = []
+        # Tâche de fond : cède la place aux requêtes interactives (pré-game)
+        with self.api.priority(self.priority):
+            new_ids = list(self.iter_new_match_ids(puuid, queue, failed_pages))
+            ordered = [None] * len(new_ids)
+            for index, _, match_detail in self.api.get_match_details_many(new_ids, on_progress=on_progress):
+                ordered[index] = match_detail
+        matches = [match for match in ordered if match]
+
+        if failed_pages:
+            print(f"Synchronisation incomplète pour {puuid[:12]}... : liste des matchs interrompue "
+                  f"(page à partir de {failed_pages[0]} en échec)")
+        elif len(matches) < len(new_ids):
+            print(f"Synchronisation incomplète pour {puuid[:12]}... : {len(new_ids) - len(matches)} match(s) en échec")
+        else:
+            state = self.get_state(puuid, queue)
+            newest = new_ids[0] if new_ids else (state['newest_match_id'] if state else None)
+            self._save_state(puuid, queue, newest, sync_started)
+
+        return matches
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
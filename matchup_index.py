@@ -0,0 +1,382 @@
+"""
+Module d'index des matchups de lane
+Chaque match ingéré ajoute, pour chaque rôle, les deux adversaires directs (même
+teamPosition) dans les deux sens : (champion, champion adverse, rôle) -> parties,
+victoires, écarts d'or et de CS en fin de partie et, si la timeline est fournie, à 15 min.
+Une entrée sans rôle agrège tous les rôles. Les champions sont identifiés par leur
+championId, fourni par match-v5 comme par spectator ; un nom saisi est converti en ID
+(noms vus dans les matchs ingérés, puis table de champion_names). L'index est tenu à jour
+à l'ingestion et sauvegardé en SQLite ; une recherche est un accès dict, sans requête à l'API
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from champion_names import CHAMPION_NAMES
+from match_decoder import _participant_row
+from parsed_match import parse_match
+from timeline import TimelineFrames
+
+DEFAULT_MATCHUP_PATH = os.path.join('cache', 'matchups.sqlite')
+
+# Minute des écarts de lane (timelines)
+LANE_MINUTE = 15
+
+# En dessous, les statistiques d'un matchup sont signalées comme peu fiables
+MATCHUP_MIN_GAMES = 5
+
+# Sauvegarde automatique après ce nombre de nouveaux matchs
+AUTOSAVE_AFTER = 200
+
+# Parties plus courtes ignorées (remakes)
+MIN_GAME_DURATION = 300
+
+MATCHUP_ROLES = ('TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY')
+
+# Version du schéma SQLite (2 : champions identifiés par championId)
+SCHEMA_VERSION = 2
+
+# Noms d'affichage dont le nom match-v5 diffère
+_ALIASES = {'wukong': 'monkeyking', 'nunuwillump': 'nunu', 'renataglasc': 'renata'}
+
+
+@lru_cache(maxsize=1024)
+def champion_name_key(name: str) -> str:
+    """Nom match-v5 ('DrMundo') ou nom affiché ('Dr. Mundo') -> 'drmundo'"""
+    key = re.sub(r'[^a-z0-9]', '', str(name).lower())
+    return _ALIASES.get(key, key)
+
+
+# Noms de la table (partielle) de champion_names -> championId
+_KNOWN_IDS = {champion_name_key(name): champion_id for champion_id, name in CHAMPION_NAMES.items()}
+
+
+class MatchupStats:
+    """Cumuls d'un matchup (sommes ; moyennes calculées par as_dict)"""
+    __slots__ = ('games', 'wins', 'gold_diff', 'cs_diff', 'lane_games', 'lane_gold_diff', 'lane_cs_diff')
+    FIELDS = __slots__
+
+    def __init__(self, games: int = 0, wins: int = 0, gold_diff: int = 0, cs_diff: int = 0,
+                 lane_games: int = 0, lane_gold_diff: int = 0, lane_cs_diff: int = 0):
+        self.games = games
+        self.wins = wins
+        self.gold_diff = gold_diff
+        self.cs_diff = cs_diff
+        self.lane_games = lane_games
+        self.lane_gold_diff = lane_gold_diff
+        self.lane_cs_diff = lane_cs_diff
+
+    def add_game(self, win: bool, gold_diff: int, cs_diff: int):
+        self.games += 1
+        self.wins += 1 if win else 0
+        self.gold_diff += gold_diff
+        self.cs_diff += cs_diff
+
+    def add_lane(self, gold_diff: int, cs_diff: int):
+        self.lane_games += 1
+        self.lane_gold_diff += gold_diff
+        self.lane_cs_diff += cs_diff
+
+    def merge(self, other: 'MatchupStats') -> 'MatchupStats':
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    def as_dict(self) -> Dict:
+        """
+        {'games', 'wins', 'winrate', 'gold_diff', 'cs_diff'} (écarts moyens en fin de partie)
+        et, si des timelines ont été ingérées, {'lane_games', 'lane_gold_diff', 'lane_cs_diff'}
+        """
+        result = {
+            'games': self.games,
+            'wins': self.wins,
+            'winrate': self.wins / self.games * 100 if self.games else 0,
+            'gold_diff': self.gold_diff / self.games if self.games else 0,
+            'cs_diff': self.cs_diff / self.games if self.games else 0,
+            'lane_games': self.lane_games,
+        }
+        if self.lane_games:
+            result['lane_gold_diff'] = self.lane_gold_diff / self.lane_games
+            result['lane_cs_diff'] = self.lane_cs_diff / self.lane_games
+        return result
+
+    def __repr__(self):
+        return f"MatchupStats(games={self.games}, wins={self.wins}, lane_games={self.lane_games})"
+
+
+def _lane_pairs(parsed) -> List[Tuple[str, object, object]]:
+    """(rôle, participant équipe 1, participant équipe 2) pour chaque rôle avec un joueur par équipe"""
+    if len(parsed.teams) != 2:
+        return []
+    first, second = (team.participants for team in parsed.teams.values())
+    pairs = []
+    for role in MATCHUP_ROLES:
+        left = [p for p in first if p.get('teamPosition') == role]
+        right = [p for p in second if p.get('teamPosition') == role]
+        if len(left) == 1 and len(right) == 1:
+            pairs.append((role, left[0], right[0]))
+    return pairs
+
+
+class MatchupIndex:
+    def __init__(self, path: str = None):
+        """
+        path: fichier SQLite de l'index (défaut : COACH_LOL_MATCHUPS)
+        """
+        self.path = path or os.getenv('COACH_LOL_MATCHUPS', DEFAULT_MATCHUP_PATH)
+        # (championId, championId adverse, rôle ou '') -> MatchupStats
+        self.matchups: Dict[Tuple[int, int, str], MatchupStats] = {}
+        # Nom (champion_name_key) -> championId, appris des matchs ingérés
+        self.champion_ids: Dict[str, int] = {}
+        # match ID -> True si les écarts de lane (timeline) ont été comptés
+        self._ingested: Dict[str, bool] = {}
+        # Apports non sauvegardés par match ID : (écarts de lane comptés, {clé: MatchupStats})
+        self._pending: Dict[str, Tuple[bool, Dict[Tuple[int, int, str], MatchupStats]]] = {}
+        self._new_names: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Index des versions précédentes (clés par nom) : reconstruit à partir des prochains matchs
+            self._conn.execute("DROP TABLE IF EXISTS matchups")
+            self._conn.execute("DROP TABLE IF EXISTS ingested")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS matchups ("
+            "champion INTEGER NOT NULL, enemy INTEGER NOT NULL, role TEXT NOT NULL, "
+            "games INTEGER NOT NULL, wins INTEGER NOT NULL, gold_diff INTEGER NOT NULL, cs_diff INTEGER NOT NULL, "
+            "lane_games INTEGER NOT NULL, lane_gold_diff INTEGER NOT NULL, lane_cs_diff INTEGER NOT NULL, "
+            "PRIMARY KEY (champion, enemy, role))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingested (match_id TEXT PRIMARY KEY, lane INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS champions (name TEXT PRIMARY KEY, champion_id INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+        for row in self._conn.execute("SELECT * FROM matchups"):
+            self.matchups[tuple(row[:3])] = MatchupStats(*row[3:])
+        self._ingested.update((match_id, bool(lane)) for match_id, lane
+                              in self._conn.execute("SELECT match_id, lane FROM ingested"))
+        self.champion_ids.update(self._conn.execute("SELECT name, champion_id FROM champions"))
+
+    def champion_id(self, champion) -> Optional[int]:
+        """championId d'un ID (int ou texte), d'un nom match-v5 ou d'un nom affiché ; None si inconnu"""
+        if isinstance(champion, int):
+            return champion
+        champion = str(champion).strip()
+        if champion.isdigit():
+            return int(champion)
+        key = champion_name_key(champion)
+        return self.champion_ids.get(key, _KNOWN_IDS.get(key))
+
+    def _stats(self, key: Tuple[int, int, str], delta: Dict) -> Tuple[MatchupStats, MatchupStats]:
+        """(cumul de l'index, apport du match en cours) pour une clé"""
+        stats = self.matchups.get(key)
+        if stats is None:
+            stats = self.matchups[key] = MatchupStats()
+        added = delta.get(key)
+        if added is None:
+            added = delta[key] = MatchupStats()
+        return stats, added
+
+    def add_match(self, match, timeline: TimelineFrames = None) -> bool:
+        """
+        Ajoute les duels de lane d'un match (dict match-v5 ou MatchRecord)
+        timeline: TimelineFrames du match pour les écarts à LANE_MINUTE minutes ; un match déjà
+        ingéré sans timeline peut être repassé avec pour n'ajouter que ces écarts
+        Retourne False si rien n'a été ajouté
+        """
+        if match is None:
+            return False
+        info = match.get('info', {})
+        match_id = match.get('metadata', {}).get('matchId')
+        if not match_id or info.get('gameDuration', 0) < MIN_GAME_DURATION:
+            return False
+
+        lane_frames = timeline is not None and timeline.minutes > LANE_MINUTE
+        parsed = parse_match(match)
+        with self._lock:
+            seen = self._ingested.get(match_id)
+            if seen is not None and (seen or not lane_frames):
+                return False
+            self._ingested[match_id] = bool(lane_frames)
+            # Un match repassé avec sa timeline complète l'apport encore non sauvegardé
+            delta = self._pending[match_id][1] if match_id in self._pending else {}
+            self._pending[match_id] = (bool(lane_frames), delta)
+
+            for role, left, right in _lane_pairs(parsed):
+                (_, _, left_name, _, left_win, _, _, _, left_cs, _, _, left_gold) = _participant_row(left)
+                (_, _, right_name, _, right_win, _, _, _, right_cs, _, _, right_gold) = _participant_row(right)
+                left_key, right_key = left.get('championId'), right.get('championId')
+                if left_key is None or right_key is None:
+                    continue
+                for name, champion_id in ((left_name, left_key), (right_name, right_key)):
+                    name = champion_name_key(name)
+                    if self.champion_ids.get(name) != champion_id:
+                        self.champion_ids[name] = self._new_names[name] = champion_id
+
+                lane_diff = None
+                if lane_frames:
+                    rows = [timeline.row(left.get('participantId')), timeline.row(right.get('participantId'))]
+                    if None not in rows:
+                        gold = timeline.gold[rows, LANE_MINUTE]
+                        cs = timeline.cs[rows, LANE_MINUTE]
+                        lane_diff = (int(gold[0] - gold[1]), int(cs[0] - cs[1]))
+
+                for champion, enemy, win, sign in ((left_key, right_key, left_win, 1),
+                                                   (right_key, left_key, right_win, -1)):
+                    for role_key in (role, ''):
+                        for stats in self._stats((champion, enemy, role_key), delta):
+                            if seen is None:
+                                stats.add_game(win, sign * (left_gold - right_gold), sign * (left_cs - right_cs))
+                            if lane_diff is not None:
+                                stats.add_lane(sign * lane_diff[0], sign * lane_diff[1])
+
+            autosave = len(self._pending) >= AUTOSAVE_AFTER
+        if autosave:
+            self.save()
+        return True
+
+    def add_matches(self, matches: Iterable, timelines: Dict[str, TimelineFrames] = None) -> int:
+        """Ingère plusieurs matchs puis sauvegarde ; timelines: TimelineFrames par match ID"""
+        timelines = timelines or {}
+        added = 0
+        for match in matches:
+            if match is None:
+                continue
+            if self.add_match(match, timelines.get(match.get('metadata', {}).get('matchId'))):
+                added += 1
+        self.save()
+        return added
+
+    def save(self):
+        """
+        Ajoute au fichier les apports depuis la dernière sauvegarde
+        Plusieurs index (sessions Streamlit, CLI) peuvent partager le fichier : les cumuls sont
+        additionnés dans une même transaction, sans compter deux fois un match (ou ses écarts
+        de lane) qu'un autre index a sauvegardé entre-temps
+        """
+        with self._lock:
+            if not self._pending and not self._new_names:
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                totals: Dict[Tuple[int, int, str], MatchupStats] = {}
+                for match_id, (lane, delta) in self._pending.items():
+                    row = self._conn.execute("SELECT lane FROM ingested WHERE match_id = ?", (match_id,)).fetchone()
+                    for key, added in delta.items():
+                        if row is not None:
+                            # Partie déjà comptée ailleurs : seuls des écarts de lane peuvent manquer
+                            added = MatchupStats(lane_games=added.lane_games, lane_gold_diff=added.lane_gold_diff,
+                                                 lane_cs_diff=added.lane_cs_diff) if not row[0] else MatchupStats()
+                        totals.setdefault(key, MatchupStats()).merge(added)
+
+                fields = MatchupStats.FIELDS
+                self._conn.executemany(
+                    f"INSERT INTO matchups (champion, enemy, role, {', '.join(fields)}) "
+                    f"VALUES (?, ?, ?{', ?' * len(fields)}) ON CONFLICT (champion, enemy, role) DO UPDATE SET "
+                    + ', '.join(f"{field} = {field} + excluded.{field}" for field in fields),
+                    [key + tuple(getattr(stats, field) for field in fields) for key, stats in totals.items()]
+                )
+                self._conn.executemany(
+                    "INSERT INTO ingested (match_id, lane) VALUES (?, ?) "
+                    "ON CONFLICT (match_id) DO UPDATE SET lane = max(lane, excluded.lane)",
+                    [(match_id, int(lane)) for match_id, (lane, _) in self._pending.items()]
+                )
+                self._conn.executemany("INSERT OR REPLACE INTO champions (name, champion_id) VALUES (?, ?)",
+                                       list(self._new_names.items()))
+
+                # Les cumuls relus incluent les apports des autres index
+                for key in totals:
+                    row = self._conn.execute(
+                        "SELECT * FROM matchups WHERE champion = ? AND enemy = ? AND role = ?", key
+                    ).fetchone()
+                    self.matchups[key] = MatchupStats(*row[3:])
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._pending.clear()
+            self._new_names.clear()
+
+    def get(self, champion, enemy, role: str = None) -> Optional[Dict]:
+        """
+        Statistiques de champion contre enemy (championId ou noms), dans un rôle ou tous rôles
+        confondus (role=None) ; None si le matchup n'a jamais été observé
+        """
+        stats = self.matchups.get((self.champion_id(champion), self.champion_id(enemy), role or ''))
+        if stats is None or stats.games == 0:
+            return None
+        return stats.as_dict()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'matches': len(self._ingested),
+                'matchups': sum(1 for key in self.matchups if key[2] == '')
+            }
+
+    def close(self):
+        self.save()
+        with self._lock:
+            self._conn.close()
+
+
+def format_matchup_line(champion: str, enemy: str, matchup: Dict) -> str:
+    """Résumé d'un matchup (rapports, prompts LLM)"""
+    line = (f"{champion} vs {enemy} : {matchup['games']} parties, {matchup['winrate']:.0f}% WR, "
+            f"{matchup['gold_diff']:+.0f} or / {matchup['cs_diff']:+.0f} CS en fin de partie")
+    if matchup.get('lane_games'):
+        line += (f", {matchup['lane_gold_diff']:+.0f} or / {matchup['lane_cs_diff']:+.0f} CS à {LANE_MINUTE} min "
+                 f"({matchup['lane_games']} timelines)")
+    return line
+
+
+def main():
+    from match_archive import MatchArchive
+    from match_decoder import decode_match
+
+    parser = argparse.ArgumentParser(description="Construit l'index des matchups depuis l'archive de matchs")
+    parser.add_argument('champion', nargs='?', help='champion à afficher après la construction')
+    parser.add_argument('enemy', nargs='?', help='champion adverse')
+    parser.add_argument('--role', default=None, help='rôle (TOP, JUNGLE, MIDDLE, BOTTOM, UTILITY)')
+    parser.add_argument('--archive', default=None, help='fichier de l\'archive (défaut : COACH_LOL_MATCH_ARCHIVE)')
+    parser.add_argument('--matchups', default=None, help='fichier de l\'index (défaut : COACH_LOL_MATCHUPS)')
+    args = parser.parse_args()
+
+    archive = MatchArchive(args.archive, auto_train_after=0)
+    index = MatchupIndex(args.matchups)
+    try:
+        match_ids = archive.iter_ids()
+        added = 0
+        for start in range(0, len(match_ids), 500):
+            payloads = archive.read_many(match_ids[start:start + 500])
+            added += index.add_matches(decode_match(payload) for payload in payloads.values())
+        stats = index.stats()
+        print(f"✓ {added} nouveaux matchs ingérés ({stats['matches']} au total, {stats['matchups']} matchups)")
+
+        if args.champion and args.enemy:
+            matchup = index.get(args.champion, args.enemy, args.role)
+            if matchup:
+                print(format_matchup_line(args.champion, args.enemy, matchup))
+            else:
+                print(f"Aucune partie {args.champion} vs {args.enemy}")
+    finally:
+        index.close()
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Module de métriques des requêtes Riot
+Compteurs et histogrammes de latence par endpoint et par hôte de routage,
+exportables en JSON ou au format texte Prometheus
+"""
+import json
+import threading
+from typing import Dict, List, Tuple
+
+# Bornes (secondes) de l'histogramme de latence
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = 'coach_lol_riot'
+
+
+class _EndpointMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+        self.status_codes: Dict[int, int] = {}
+        self.network_errors = 0
+        self.cache_hits: Dict[str, int] = {}
+        self.rate_limit_sleep = 0.0
+        self.backoff_sleep = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'bytes': self.bytes,
+            'status_codes': dict(self.status_codes),
+            'network_errors': self.network_errors,
+            'cache_hits': dict(self.cache_hits),
+            'rate_limit_sleep_seconds': round(self.rate_limit_sleep, 4),
+            'backoff_sleep_seconds': round(self.backoff_sleep, 4),
+            'latency': {
+                'buckets': dict(zip([str(b) for b in LATENCY_BUCKETS] + ['+Inf'], self.latency_buckets)),
+                'sum_seconds': round(self.latency_sum, 4),
+                'avg_seconds': round(self.latency_sum / self.calls, 4) if self.calls else 0.0
+            }
+        }
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[Tuple[str, str], _EndpointMetrics] = {}
+
+    def _get(self, endpoint: str, host: str) -> _EndpointMetrics:
+        metrics = self._metrics.get((endpoint, host))
+        if metrics is None:
+            metrics = self._metrics[(endpoint, host)] = _EndpointMetrics()
+        return metrics
+
+    def record_response(self, endpoint: str, host: str, status: int, size: int, latency: float):
+        """Enregistre une réponse HTTP reçue (y compris 429 et 5xx)"""
+        with self._lock:
+            metrics = self._get(endpoint, host)
+            metrics.calls += 1
+            metrics.bytes += size
+            metrics.status_codes[status] = metrics.status_codes.get(status, 0) + 1
+            metrics.latency_sum += latency
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    metrics.latency_buckets[i] += 1
+                    break
+            else:
+                metrics.latency_buckets[-1] += 1
+
+    def record_network_error(self, endpoint: str, host: str):
+        with self._lock:
+            self._get(endpoint, host).network_errors += 1
+
+    def record_cache_hit(self, endpoint: str, host: str, tier: str):
+        """tier: 'response_cache' (TTL) ou 'match_store'"""
+        with self._lock:
+            hits = self._get(endpoint, host).cache_hits
+            hits[tier] = hits.get(tier, 0) + 1
+
+    def record_rate_limit_sleep(self, endpoint: str, host: str, seconds: float):
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._get(endpoint, host).rate_limit_sleep += seconds
+
+    def record_backoff_sleep(self, endpoint: str, host: str, seconds: float):
+        with self._lock:
+            self._get(endpoint, host).backoff_sleep += seconds
+
+    def snapshot(self) -> Dict:
+        """Métriques par endpoint puis par hôte"""
+        with self._lock:
+            result: Dict[str, Dict] = {}
+            for (endpoint, host), metrics in sorted(self._metrics.items()):
+                result.setdefault(endpoint, {})[host] = metrics.as_dict()
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def to_json(self, headroom: List[Dict] = None, extra: Dict = None) -> str:
+        """Export JSON (métriques, marge de rate limit et compteurs additionnels)"""
+        report = {'endpoints': self.snapshot()}
+        if headroom is not None:
+            report['rate_limit_headroom'] = headroom
+        if extra:
+            report.update(extra)
+        return json.dumps(report, indent=2)
+
+    def to_prometheus(self, headroom: List[Dict] = None) -> str:
+        """Export au format texte Prometheus"""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+
+        def labels(**values) -> str:
+            return '{' + ','.join(f'{k}="{v}"' for k, v in values.items()) + '}'
+
+        with self._lock:
+            items = sorted(self._metrics.items())
+
+            metric('requests_total', 'counter', 'Réponses HTTP reçues par endpoint, hôte et statut')
+            for (endpoint, host), m in items:
+                for status, count in sorted(m.status_codes.items()):
+                    lines.append(f"{METRIC_PREFIX}_requests_total{labels(endpoint=endpoint, host=host, status=status)} {count}")
+
+            metric('response_bytes_total', 'counter', 'Octets reçus')
+            for (endpoint, host), m in items:
+                lines.append(f"{METRIC_PREFIX}_response_bytes_total{labels(endpoint=endpoint, host=host)} {m.bytes}")
+
+            metric('network_errors_total', 'counter', 'Timeouts et erreurs de connexion')
+            for (endpoint, host), m in items:
+                lines.append(f"{METRIC_PREFIX}_network_errors_total{labels(endpoint=endpoint, host=host)} {m.network_errors}")
+
+            metric('cache_hits_total', 'counter', 'Réponses servies par un cache local')
+            for (endpoint, host), m in items:
+                for tier, count in sorted(m.cache_hits.items()):
+                    lines.append(f"{METRIC_PREFIX}_cache_hits_total{labels(endpoint=endpoint, host=host, tier=tier)} {count}")
+
+            metric('rate_limit_sleep_seconds_total', 'counter', 'Temps passé à attendre le limiteur de débit')
+            for (endpoint, host), m in items:
+                lines.append(f"{METRIC_PREFIX}_rate_limit_sleep_seconds_total{labels(endpoint=endpoint, host=host)} {m.rate_limit_sleep:.4f}")
+
+            metric('backoff_sleep_seconds_total', 'counter', 'Temps passé en backoff après une erreur')
+            for (endpoint, host), m in items:
+                lines.append(f"{METRIC_PREFIX}_backoff_sleep_seconds_total{labels(endpoint=endpoint, host=host)} {m.backoff_sleep:.4f}")
+
+            metric('request_duration_seconds', 'histogram', 'Latence des requêtes HTTP')
+            for (endpoint, host), m in items:
+                cumulative = 0
+                for bound, count in zip(list(LATENCY_BUCKETS) + ['+Inf'], m.latency_buckets):
+                    cumulative += count
+                    lines.append(f"{METRIC_PREFIX}_request_duration_seconds_bucket{labels(endpoint=endpoint, host=host, le=bound)} {cumulative}")
+                lines.append(f"{METRIC_PREFIX}_request_duration_seconds_sum{labels(endpoint=endpoint, host=host)} {m.latency_sum:.4f}")
+                lines.append(f"{METRIC_PREFIX}_request_duration_seconds_count{labels(endpoint=endpoint, host=host)} {m.calls}")
+
+        if headroom:
+            metric('rate_limit_remaining', 'gauge', 'Requêtes encore disponibles dans la fenêtre')
+            for window in headroom:
+                lines.append(f"{METRIC_PREFIX}_rate_limit_remaining{labels(scope=window['scope'], host=window['host'], method=window['method'], window=window['seconds'])} {window['remaining']}")
+            metric('rate_limit_limit', 'gauge', 'Limite de la fenêtre (en-têtes X-*-Rate-Limit)')
+            for window in headroom:
+                lines.append(f"{METRIC_PREFIX}_rate_limit_limit{labels(scope=window['scope'], host=window['host'], method=window['method'], window=window['seconds'])} {window['limit']}")
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,563 @@
+"""
+Serveur local imitant l'API Riot Games pour les tests de charge et de latence
+Implémente les routes utilisées par riot_api.py avec des données synthétiques
+(mais au bon format), des rate limits applicatifs / par méthode avec les vrais
+en-têtes, et des réglages de latence et d'erreurs
+
+Utilisation :
+    python mock_riot_server.py --port 8765 --latency 0.05
+    RIOT_API_BASE_URL=http://127.0.0.1:8765 python coach_lol.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from champion_names import CHAMPION_NAMES
+
+DEFAULT_APP_LIMITS = "20:1,100:120"
+DEFAULT_METHOD_LIMITS = "500:10"
+DEFAULT_PLATFORM = 'EUW1'
+POSITIONS = ['TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY']
+TIERS = ['IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'EMERALD', 'DIAMOND', 'MASTER', 'GRANDMASTER', 'CHALLENGER']
+DIVISIONS = ['IV', 'III', 'II', 'I']
+# Nombre de matchs synthétiques dans l'historique de chaque joueur
+HISTORY_SIZE = 300
+
+# (méthode, motif de route) -- les noms de méthode sont ceux utilisés par RiotAPI
+ROUTES = [
+    ('account-v1.by-riot-id', re.compile(r'^/riot/account/v1/accounts/by-riot-id/([^/]+)/([^/]+)$')),
+    ('account-v1.active-shard', re.compile(r'^/riot/account/v1/active-shards/by-game/([^/]+)/by-puuid/([^/]+)$')),
+    ('summoner-v4.by-puuid', re.compile(r'^/lol/summoner/v4/summoners/by-puuid/([^/]+)$')),
+    ('match-v5.ids-by-puuid', re.compile(r'^/lol/match/v5/matches/by-puuid/([^/]+)/ids$')),
+    ('match-v5.match', re.compile(r'^/lol/match/v5/matches/([^/]+)$')),
+    ('match-v5.timeline', re.compile(r'^/lol/match/v5/matches/([^/]+)/timeline$')),
+    ('league-v4.entries-by-summoner', re.compile(r'^/lol/league/v4/entries/by-summoner/([^/]+)$')),
+    ('spectator-v5.active-game', re.compile(r'^/lol/spectator/v5/active-games/by-summoner/([^/]+)$')),
+    ('champion-mastery-v4.by-puuid', re.compile(r'^/lol/champion-mastery/v4/champion-masteries/by-puuid/([^/]+)$')),
+]
+
+
+def _seed(*parts) -> int:
+    """Graine stable (indépendante de PYTHONHASHSEED) pour générer des données reproductibles"""
+    return zlib.crc32('|'.join(str(p) for p in parts).encode('utf-8'))
+
+
+def _parse_limits(value: str) -> List[Tuple[int, int]]:
+    return [tuple(int(x) for x in part.split(':')) for part in value.split(',') if part]
+
+
+class _FixedWindowLimiter:
+    """Compteurs à fenêtres fixes, comme côté Riot"""
+
+    def __init__(self, limits: List[Tuple[int, int]]):
+        self.limits = limits
+        self.windows: Dict[int, List[float]] = {seconds: [0.0, 0] for _, seconds in limits}
+
+    def hit(self, now: float) -> Tuple[bool, float]:
+        """Compte une requête ; retourne (autorisée, secondes avant réouverture)"""
+        for _, seconds in self.limits:
+            window = self.windows[seconds]
+            if now - window[0] >= seconds:
+                window[0], window[1] = now, 0
+
+        for limit, seconds in self.limits:
+            window = self.windows[seconds]
+            if window[1] >= limit:
+                return False, window[0] + seconds - now
+
+        for _, seconds in self.limits:
+            self.windows[seconds][1] += 1
+        return True, 0.0
+
+    def header(self) -> str:
+        return ','.join(f"{limit}:{seconds}" for limit, seconds in self.limits)
+
+    def count_header(self) -> str:
+        return ','.join(f"{self.windows[seconds][1]}:{seconds}" for _, seconds in self.limits)
+
+
+class MockRiotState:
+    def __init__(self, app_limits: str = DEFAULT_APP_LIMITS, method_limits: str = DEFAULT_METHOD_LIMITS,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 active_game_rate: float = 1.0, seed: int = 0, platform: str = DEFAULT_PLATFORM):
+        """
+        app_limits / method_limits: limites au format Riot ("20:1,100:120")
+        latency / jitter: latence ajoutée à chaque réponse (secondes)
+        error_rate: probabilité de répondre 503
+        active_game_rate: probabilité qu'un joueur soit en partie (spectator)
+        platform: plateforme simulée (préfixe des match IDs, activeShard)
+        """
+        self.platform = platform.upper()
+        self.method_limits = method_limits
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.active_game_rate = active_game_rate
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._app_limiter = _FixedWindowLimiter(_parse_limits(app_limits))
+        self._method_limiters: Dict[str, _FixedWindowLimiter] = {}
+        self._match_owner: Dict[str, str] = {}
+        self.counters = {'requests': 0, 'rate_limited': 0, 'errors': 0, 'by_method': {}}
+
+    # --- Rate limits ---
+
+    def check_limits(self, method: str) -> Tuple[int, Dict[str, str]]:
+        """Applique les limites ; retourne (statut, en-têtes de rate limit)"""
+        with self._lock:
+            now = time.monotonic()
+            method_limiter = self._method_limiters.get(method)
+            if method_limiter is None:
+                method_limiter = self._method_limiters[method] = _FixedWindowLimiter(_parse_limits(self.method_limits))
+
+            self.counters['requests'] += 1
+            self.counters['by_method'][method] = self.counters['by_method'].get(method, 0) + 1
+
+            app_ok, app_wait = self._app_limiter.hit(now)
+            method_ok, method_wait = method_limiter.hit(now) if app_ok else (True, 0.0)
+
+            headers = {
+                'X-App-Rate-Limit': self._app_limiter.header(),
+                'X-App-Rate-Limit-Count': self._app_limiter.count_header(),
+                'X-Method-Rate-Limit': method_limiter.header(),
+                'X-Method-Rate-Limit-Count': method_limiter.count_header(),
+            }
+
+            if not app_ok or not method_ok:
+                self.counters['rate_limited'] += 1
+                headers['Retry-After'] = str(max(1, int(max(app_wait, method_wait) + 0.999)))
+                headers['X-Rate-Limit-Type'] = 'application' if not app_ok else 'method'
+                return 429, headers
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.counters['errors'] += 1
+                return 503, headers
+
+            return 200, headers
+
+    def delay(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    # --- Données synthétiques ---
+
+    @staticmethod
+    def puuid_for(game_name: str, tag_line: str) -> str:
+        return f"mock-{_seed(game_name.lower(), tag_line.lower()):08x}-{_seed(tag_line, game_name):08x}"
+
+    def account(self, game_name: str, tag_line: str) -> Dict:
+        return {'puuid': self.puuid_for(game_name, tag_line), 'gameName': game_name, 'tagLine': tag_line}
+
+    def active_shard(self, game: str, puuid: str) -> Dict:
+        return {'puuid': puuid, 'game': game, 'activeShard': self.platform.lower()}
+
+    def summoner(self, puuid: str) -> Dict:
+        rng = random.Random(_seed(self.seed, 'summoner', puuid))
+        return {
+            'id': f"sum-{puuid}",
+            'accountId': f"acc-{puuid}",
+            'puuid': puuid,
+            'profileIconId': rng.randint(1, 5000),
+            'revisionDate': int(time.time() * 1000),
+            'summonerLevel': rng.randint(30, 800)
+        }
+
+    def match_ids(self, puuid: str, start: int, count: int, queue: Optional[int],
+                  start_time: Optional[int], end_time: Optional[int]) -> List[str]:
+        base = 6_000_000_000 + (_seed(self.seed, 'history', puuid) % 1_000_000) * 1000
+        ids = []
+        for k in range(HISTORY_SIZE):
+            match_id = f"{self.platform}_{base + HISTORY_SIZE - k}"
+            game_start = self._game_start(match_id, k)
+            if start_time is not None and game_start < start_time:
+                break
+            if end_time is not None and game_start > end_time:
+                continue
+            ids.append(match_id)
+
+        page = ids[start:start + count]
+        with self._lock:
+            for match_id in page:
+                self._match_owner.setdefault(match_id, puuid)
+        return page
+
+    def _game_start(self, match_id: str, k: int) -> int:
+        """Les matchs d'un historique sont espacés d'environ 40 minutes, le plus récent il y a 1h"""
+        return int(time.time()) - 3600 - k * 2400 - (_seed(match_id) % 600)
+
+    def _participant(self, rng: random.Random, puuid: str, team_id: int, position: str,
+                     win: bool, duration: int) -> Dict:
+        champion_id = rng.choice(list(CHAMPION_NAMES))
+        minutes = duration / 60
+        is_support = position == 'UTILITY'
+        is_jungle = position == 'JUNGLE'
+        kills = rng.randint(0, 14)
+        deaths = rng.randint(0, 10)
+        assists = rng.randint(0, 20)
+        name = f"Joueur{_seed(puuid) % 10000}"
+        return {
+            'puuid': puuid,
+            'summonerId': f"sum-{puuid}",
+            'riotIdGameName': name,
+            'riotIdTagline': self.platform,
+            'summonerName': name,
+            'teamId': team_id,
+            'teamPosition': position,
+            'individualPosition': position,
+            'lane': 'BOTTOM' if position in ('BOTTOM', 'UTILITY') else position,
+            'role': 'SUPPORT' if is_support else 'SOLO',
+            'championId': champion_id,
+            'championName': re.sub(r'[^A-Za-z]', '', CHAMPION_NAMES[champion_id]),
+            'champLevel': rng.randint(11, 18),
+            'win': win,
+            'kills': kills,
+            'deaths': deaths,
+            'assists': assists,
+            'totalMinionsKilled': int(minutes * (rng.uniform(0.5, 2) if is_support or is_jungle else rng.uniform(5, 9))),
+            'neutralMinionsKilled': int(minutes * rng.uniform(4, 6)) if is_jungle else rng.randint(0, 8),
+            'visionScore': int(minutes * (rng.uniform(1.8, 3.2) if is_support else rng.uniform(0.5, 1.4))),
+            'wardsPlaced': rng.randint(3, 60),
+            'wardsKilled': rng.randint(0, 15),
+            'totalDamageDealtToChampions': int(minutes * rng.uniform(300, 1100)),
+            'totalDamageTaken': int(minutes * rng.uniform(400, 1200)),
+            'goldEarned': int(minutes * rng.uniform(300, 480)) + kills * 300,
+            'goldSpent': int(minutes * rng.uniform(280, 450)),
+            'item0': rng.randint(1000, 7000), 'item1': rng.randint(1000, 7000), 'item2': rng.randint(1000, 7000),
+            'item3': rng.randint(1000, 7000), 'item4': rng.randint(1000, 7000), 'item5': rng.randint(1000, 7000),
+            'item6': 3340,
+            'summoner1Id': 4, 'summoner2Id': 14 if position in ('TOP', 'MIDDLE') else 11 if is_jungle else 7,
+            'timePlayed': duration,
+        }
+
+    def match(self, match_id: str) -> Dict:
+        rng = random.Random(_seed(self.seed, 'match', match_id))
+        duration = rng.randint(15 * 60, 42 * 60)
+        # Position du match dans l'historique synthétique (voir match_ids)
+        k = HISTORY_SIZE - int(match_id.split('_')[1]) % 1000
+        created = self._game_start(match_id, k) * 1000
+        winning_team = rng.choice([100, 200])
+
+        with self._lock:
+            owner = self._match_owner.get(match_id)
+        puuids = [f"mock-{_seed(self.seed, match_id, i):08x}-{i:08x}" for i in range(10)]
+        if owner:
+            puuids[rng.randrange(10)] = owner
+
+        participants = []
+        for i, puuid in enumerate(puuids):
+            team_id = 100 if i < 5 else 200
+            participants.append(self._participant(rng, puuid, team_id, POSITIONS[i % 5],
+                                                  team_id == winning_team, duration))
+            participants[-1]['participantId'] = i + 1
+
+        return {
+            'metadata': {'dataVersion': '2', 'matchId': match_id, 'participants': puuids},
+            'info': {
+                'gameId': int(match_id.split('_')[1]),
+                'platformId': self.platform,
+                'gameCreation': created,
+                'gameStartTimestamp': created + 30000,
+                'gameEndTimestamp': created + 30000 + duration * 1000,
+                'gameDuration': duration,
+                'gameMode': 'CLASSIC',
+                'gameType': 'MATCHED_GAME',
+                'gameVersion': '14.20.1',
+                'mapId': 11,
+                'queueId': 420,
+                'participants': participants,
+                'teams': [
+                    {'teamId': team_id, 'win': team_id == winning_team, 'bans': [],
+                     'objectives': {'champion': {'first': False, 'kills': sum(
+                         p['kills'] for p in participants if p['teamId'] == team_id)}}}
+                    for team_id in (100, 200)
+                ]
+            }
+        }
+
+    def timeline(self, match_id: str) -> Dict:
+        """Timeline cohérente avec match() : or, XP et CS progressent jusqu'aux totaux de fin de partie"""
+        match = self.match(match_id)
+        info = match['info']
+        rng = random.Random(_seed(self.seed, 'timeline', match_id))
+        minutes = info['gameDuration'] // 60 + 1
+
+        curves = {}
+        for p in info['participants']:
+            final_xp = 1100 * p['champLevel']
+            curve = {}
+            for metric, final in (('totalGold', p['goldEarned'] - 500), ('xp', final_xp),
+                                  ('minionsKilled', p['totalMinionsKilled']),
+                                  ('jungleMinionsKilled', p['neutralMinionsKilled'])):
+                # Incréments aléatoires normalisés pour finir exactement au total
+                steps = [0.0] + [rng.uniform(0.5, 1.5) for _ in range(minutes)]
+                total = sum(steps)
+                running, values = 0.0, []
+                for step in steps:
+                    running += step
+                    values.append(round(final * running / total))
+                curve[metric] = values
+            curve['totalGold'] = [500 + gold for gold in curve['totalGold']]
+            curves[p['participantId']] = curve
+
+        frames = []
+        for minute in range(minutes + 1):
+            participant_frames = {}
+            for participant_id, curve in curves.items():
+                xp = curve['xp'][minute]
+                participant_frames[str(participant_id)] = {
+                    'participantId': participant_id,
+                    'totalGold': curve['totalGold'][minute],
+                    'currentGold': rng.randint(0, 1500),
+                    'goldPerSecond': 0,
+                    'xp': xp,
+                    'level': min(18, 1 + xp // 1100),
+                    'minionsKilled': curve['minionsKilled'][minute],
+                    'jungleMinionsKilled': curve['jungleMinionsKilled'][minute],
+                    'timeEnemySpentControlled': rng.randint(0, 20000),
+                    'position': {'x': rng.randint(0, 14800), 'y': rng.randint(0, 14800)},
+                    'championStats': {key: rng.randint(0, 500) for key in (
+                        'abilityHaste', 'abilityPower', 'armor', 'attackDamage', 'attackSpeed',
+                        'health', 'healthMax', 'magicResist', 'movementSpeed', 'power', 'powerMax')},
+                    'damageStats': {key: rng.randint(0, 20000) for key in (
+                        'magicDamageDone', 'magicDamageDoneToChampions', 'physicalDamageDone',
+                        'physicalDamageDoneToChampions', 'totalDamageDone', 'totalDamageDoneToChampions',
+                        'totalDamageTaken', 'trueDamageDone')}
+                }
+            events = [{'type': 'ITEM_PURCHASED', 'participantId': rng.randint(1, 10),
+                       'itemId': rng.randint(1000, 7000), 'timestamp': minute * 60000 + rng.randint(0, 59999)}
+                      for _ in range(rng.randint(2, 8))]
+            frames.append({'timestamp': minute * 60000, 'participantFrames': participant_frames, 'events': events})
+
+        return {
+            'metadata': {'dataVersion': '2', 'matchId': match_id, 'participants': match['metadata']['participants']},
+            'info': {
+                'frameInterval': 60000,
+                'gameId': info['gameId'],
+                'participants': [{'participantId': p['participantId'], 'puuid': p['puuid']}
+                                 for p in info['participants']],
+                'frames': frames
+            }
+        }
+
+    def league_entries(self, summoner_id: str) -> List[Dict]:
+        rng = random.Random(_seed(self.seed, 'league', summoner_id))
+        if rng.random() < 0.1:
+            return []
+        tier = rng.choice(TIERS)
+        wins, losses = rng.randint(10, 300), rng.randint(10, 300)
+        return [{
+            'leagueId': f"league-{tier.lower()}",
+            'summonerId': summoner_id,
+            'queueType': 'RANKED_SOLO_5x5',
+            'tier': tier,
+            'rank': 'I' if tier in ('MASTER', 'GRANDMASTER', 'CHALLENGER') else rng.choice(DIVISIONS),
+            'leaguePoints': rng.randint(0, 99),
+            'wins': wins,
+            'losses': losses,
+            'veteran': False, 'inactive': False, 'freshBlood': False, 'hotStreak': rng.random() < 0.1
+        }]
+
+    def active_game(self, puuid: str) -> Optional[Dict]:
+        with self._lock:
+            in_game = self._random.random() < self.active_game_rate
+        if not in_game:
+            return None
+
+        rng = random.Random(_seed(self.seed, 'spectator', puuid, int(time.time() // 1800)))
+        puuids = [puuid] + [f"mock-{rng.getrandbits(32):08x}-{i:08x}" for i in range(9)]
+        participants = []
+        for i, participant_puuid in enumerate(puuids):
+            champion_id = rng.choice(list(CHAMPION_NAMES))
+            participants.append({
+                'puuid': participant_puuid,
+                'teamId': 100 if i < 5 else 200,
+                'championId': champion_id,
+                'riotId': f"Joueur{_seed(participant_puuid) % 10000}#{self.platform}",
+                'spell1Id': 4, 'spell2Id': 14,
+                'profileIconId': rng.randint(1, 5000),
+                'bot': False
+            })
+        return {
+            'gameId': rng.getrandbits(32),
+            'mapId': 11,
+            'gameMode': 'CLASSIC',
+            'gameType': 'MATCHED',
+            'gameQueueConfigId': 420,
+            'gameStartTime': int(time.time() * 1000),
+            'gameLength': 0,
+            'platformId': self.platform,
+            'participants': participants,
+            'bannedChampions': []
+        }
+
+    def masteries(self, puuid: str, count: Optional[int]) -> List[Dict]:
+        rng = random.Random(_seed(self.seed, 'mastery', puuid))
+        champions = rng.sample(list(CHAMPION_NAMES), 20)
+        points = sorted((rng.randint(1000, 900000) for _ in champions), reverse=True)
+        entries = [{
+            'puuid': puuid,
+            'championId': champion_id,
+            'championLevel': min(7, 1 + champion_points // 25000),
+            'championPoints': champion_points,
+            'lastPlayTime': int(time.time() * 1000) - rng.randint(0, 10 ** 9)
+        } for champion_id, champion_points in zip(champions, points)]
+        return entries[:count] if count else entries
+
+
+class MockRiotHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: MockRiotState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        if parsed.path == '/__stats':
+            self._send_json(200, self.state.counters)
+            return
+
+        if not self.headers.get('X-Riot-Token'):
+            self._send_json(401, {'status': {'message': 'Unauthorized', 'status_code': 401}})
+            return
+
+        for method, pattern in ROUTES:
+            match = pattern.match(parsed.path)
+            if match:
+                break
+        else:
+            self._send_json(404, {'status': {'message': 'Not found', 'status_code': 404}})
+            return
+
+        status, headers = self.state.check_limits(method)
+        self.state.delay()
+        if status != 200:
+            self._send_json(status, {'status': {'message': 'Rate limit exceeded' if status == 429
+                                                else 'Service unavailable', 'status_code': status}}, headers)
+            return
+
+        args = [unquote(group) for group in match.groups()]
+        payload = self._dispatch(method, args, query)
+        if payload is None:
+            self._send_json(404, {'status': {'message': 'Data not found', 'status_code': 404}}, headers)
+        else:
+            self._send_json(200, payload, headers)
+
+    def _dispatch(self, method: str, args: List[str], query: Dict[str, str]):
+        state = self.state
+        if method == 'account-v1.by-riot-id':
+            return state.account(*args)
+        if method == 'account-v1.active-shard':
+            return state.active_shard(*args)
+        if method == 'summoner-v4.by-puuid':
+            return state.summoner(args[0])
+        if method == 'match-v5.ids-by-puuid':
+            return state.match_ids(
+                args[0], int(query.get('start', 0)), min(int(query.get('count', 20)), 100),
+                int(query['queue']) if 'queue' in query else None,
+                int(query['startTime']) if 'startTime' in query else None,
+                int(query['endTime']) if 'endTime' in query else None
+            )
+        if method == 'match-v5.match':
+            return state.match(args[0])
+        if method == 'match-v5.timeline':
+            return state.timeline(args[0])
+        if method == 'league-v4.entries-by-summoner':
+            return state.league_entries(args[0])
+        if method == 'spectator-v5.active-game':
+            return state.active_game(args[0])
+        if method == 'champion-mastery-v4.by-puuid':
+            return state.masteries(args[0], int(query['count']) if 'count' in query else None)
+        return None
+
+
+class MockRiotServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **state_options):
+        """
+        Serveur de test ; port=0 choisit un port libre
+        state_options: voir MockRiotState (limites, latence, erreurs)
+        """
+        self.state = MockRiotState(**state_options)
+        handler = type('BoundMockRiotHandler', (MockRiotHandler,), {'state': self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockRiotServer':
+        """Démarre le serveur dans un thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local imitant l'API Riot Games")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--app-limits', default=DEFAULT_APP_LIMITS, help='ex: "20:1,100:120"')
+    parser.add_argument('--method-limits', default=DEFAULT_METHOD_LIMITS, help='limites de chaque méthode')
+    parser.add_argument('--latency', type=float, default=0.0, help='latence fixe (secondes)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='latence aléatoire ajoutée (secondes)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='probabilité de réponse 503')
+    parser.add_argument('--active-game-rate', type=float, default=1.0, help='probabilité d\'être en partie')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--platform', default=DEFAULT_PLATFORM, help='plateforme simulée (ex: NA1, KR)')
+    args = parser.parse_args()
+
+    server = MockRiotServer(
+        args.host, args.port,
+        app_limits=args.app_limits, method_limits=args.method_limits,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        active_game_rate=args.active_game_rate, seed=args.seed, platform=args.platform
+    )
+    print(f"🧪 Serveur Riot de test démarré sur {server.base_url}")
+    print(f"   Utilisation : RIOT_API_BASE_URL={server.base_url} python coach_lol.py")
+    print(f"   Compteurs : {server.base_url}/__stats")
+    print("Appuyez sur Ctrl+C pour arrêter\n")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Serveur arrêté")
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
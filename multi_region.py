@@ -0,0 +1,252 @@
+"""
+Module client API Riot multi-régions
+Un RiotAPI par région, créé à la demande, avec cache de matchs, cache TTL, limiteur et
+métriques partagés. Chaque appel est routé vers la bonne plateforme et le bon hôte
+continental d'après la région du joueur (active shard) ou le préfixe du match ID
+Les limites de débit Riot sont indépendantes par hôte : les régions avancent en parallèle,
+chacune avec son propre pool de threads
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from match_store import MatchStore
+from metrics import RequestMetrics
+from riot_api import DEFAULT_FETCH_WORKERS, REGIONS, RiotAPI
+from ttl_cache import TTLCache
+
+# Plateforme (euw1, na1, ...) -> clé de région (EUW, NA, ...)
+PLATFORM_REGIONS = {platform: region for region, platform in REGIONS.items()}
+
+# Threads par région pour les tâches par joueur (map_players)
+DEFAULT_PLAYER_WORKERS = 2
+
+
+def region_for_platform(platform: str) -> Optional[str]:
+    """'euw1' ou 'EUW1' -> 'EUW' (None si la plateforme est inconnue)"""
+    return PLATFORM_REGIONS.get((platform or '').lower())
+
+
+def region_for_match(match_id: str) -> Optional[str]:
+    """'EUW1_6543210987' -> 'EUW' (le préfixe d'un match ID est sa plateforme)"""
+    return region_for_platform(match_id.split('_', 1)[0])
+
+
+class MultiRegionRiotAPI:
+    def __init__(self, api_key: str = None, regions: List[str] = None, default_region: str = 'EUW',
+                 base_urls: Dict[str, str] = None, **kwargs):
+        """
+        regions: régions autorisées (défaut : toutes celles de riot_api.REGIONS)
+        default_region: région des appels sans joueur (comptes, active shards)
+        base_urls: hôte de remplacement par région (serveurs de test)
+        kwargs: options communes des RiotAPI ; match_store, response_cache et metrics
+        sont créés une seule fois et partagés par toutes les régions
+        """
+        self.api_key = api_key
+        self.regions = list(regions or REGIONS)
+        self.default_region = default_region
+        self.base_urls = base_urls or {}
+
+        if kwargs.get('match_store') is None and kwargs.get('use_match_cache', True):
+            kwargs['match_store'] = MatchStore()
+        if kwargs.get('response_cache') is None and kwargs.get('use_response_cache', True):
+            kwargs['response_cache'] = TTLCache()
+        if kwargs.get('metrics') is None:
+            kwargs['metrics'] = RequestMetrics()
+        self._client_options = kwargs
+        self.metrics = kwargs['metrics']
+
+        self._clients: Dict[str, RiotAPI] = {}
+        self._puuid_regions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def client(self, region: str) -> RiotAPI:
+        """Client RiotAPI d'une région (créé au premier appel)"""
+        if region not in self.regions:
+            raise ValueError(f"Région non servie : {region} (régions : {', '.join(self.regions)})")
+
+        with self._lock:
+            api = self._clients.get(region)
+            if api is None:
+                api = self._clients[region] = RiotAPI(
+                    api_key=self.api_key, region=region, base_url=self.base_urls.get(region),
+                    **self._client_options
+                )
+            return api
+
+    # --- Routage ---
+
+    def remember(self, puuid: str, region: str):
+        """Enregistre la région d'un joueur (évite l'appel active shard)"""
+        with self._lock:
+            self._puuid_regions[puuid] = region
+
+    def region_of(self, puuid: str) -> Optional[str]:
+        """Région sur laquelle joue un compte (account-v1 active shard, mémorisée)"""
+        with self._lock:
+            region = self._puuid_regions.get(puuid)
+        if region is not None:
+            return region
+
+        shard = self._call(self.default_region, 'get_active_shard', puuid)
+        region = region_for_platform(shard['activeShard']) if shard else None
+        if region is None:
+            print(f"⚠️  Région introuvable pour {puuid[:12]}...")
+            return None
+
+        self.remember(puuid, region)
+        return region
+
+    @property
+    def current_priority(self) -> Optional[int]:
+        return getattr(self._local, 'priority', None)
+
+    @contextmanager
+    def priority(self, priority: int):
+        """Classe de priorité des requêtes du bloc, dans toutes les régions (voir RiotAPI.priority)"""
+        previous = self.current_priority
+        self._local.priority = priority
+        try:
+            yield self
+        finally:
+            self._local.priority = previous
+
+    def _call(self, region: str, method: str, *args, **kwargs):
+        """Appelle une méthode du client d'une région avec la priorité courante"""
+        api = self.client(region)
+        priority = self.current_priority
+        if priority is None:
+            return getattr(api, method)(*args, **kwargs)
+        with api.priority(priority):
+            return getattr(api, method)(*args, **kwargs)
+
+    def _call_for_puuid(self, puuid: str, method: str, *args, **kwargs):
+        region = self.region_of(puuid)
+        if region is None:
+            return None
+        return self._call(region, method, puuid, *args, **kwargs)
+
+    def _call_for_match(self, match_id: str, method: str, *args, **kwargs):
+        region = region_for_match(match_id)
+        if region is None or region not in self.regions:
+            print(f"⚠️  Région inconnue ou non servie pour le match {match_id}")
+            return None
+        return self._call(region, method, match_id, *args, **kwargs)
+
+    # --- Endpoints ---
+
+    def get_account_by_riot_id(self, game_name: str, tag_line: str) -> Optional[Dict]:
+        """Les comptes Riot sont globaux : interrogés via la région par défaut"""
+        return self._call(self.default_region, 'get_account_by_riot_id', game_name, tag_line)
+
+    def get_summoner_by_puuid(self, puuid: str) -> Optional[Dict]:
+        return self._call_for_puuid(puuid, 'get_summoner_by_puuid')
+
+    def get_match_history(self, puuid: str, count: int = 20, queue: int = None, start: int = 0,
+                          start_time: int = None, end_time: int = None) -> Optional[List[str]]:
+        return self._call_for_puuid(puuid, 'get_match_history', count, queue, start, start_time, end_time)
+
+    def get_match_details(self, match_id: str, compact: bool = False) -> Optional[Dict]:
+        return self._call_for_match(match_id, 'get_match_details', compact)
+
+    def get_match_timeline(self, match_id: str):
+        return self._call_for_match(match_id, 'get_match_timeline')
+
+    def get_league_entries(self, summoner_id: str, region: str) -> Optional[List[Dict]]:
+        """Les summoner IDs sont propres à une plateforme : la région est obligatoire"""
+        return self._call(region, 'get_league_entries', summoner_id)
+
+    def get_current_game(self, puuid: str) -> Optional[Dict]:
+        return self._call_for_puuid(puuid, 'get_current_game')
+
+    def get_champion_masteries(self, puuid: str, count: int = None) -> Optional[List[Dict]]:
+        return self._call_for_puuid(puuid, 'get_champion_masteries', count)
+
+    # --- Exécution parallèle par région ---
+
+    def _run_by_region(self, items: List, region_of: Callable, task: Callable, workers: int
+                       ) -> Iterator[Tuple[int, object, object]]:
+        """
+        Exécute task(client_de_la_région, item) avec un pool de threads par région
+        Produit (index, item, résultat) dans l'ordre d'arrivée (résultat None si région inconnue)
+        """
+        priority = self.current_priority
+        executors: Dict[str, ThreadPoolExecutor] = {}
+        futures = {}
+        unrouted = []
+
+        for index, item in enumerate(items):
+            region = region_of(item)
+            if region is None or region not in self.regions:
+                unrouted.append((index, item))
+                continue
+            executor = executors.get(region)
+            if executor is None:
+                executor = executors[region] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=f'riot-{region.lower()}'
+                )
+            futures[executor.submit(self._run_task, task, region, item, priority)] = (index, item)
+
+        try:
+            for index, item in unrouted:
+                print(f"⚠️  Région inconnue ou non servie : {item}")
+                yield index, item, None
+            for future in as_completed(futures):
+                index, item = futures[future]
+                yield index, item, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            for executor in executors.values():
+                executor.shutdown(wait=False)
+
+    def _run_task(self, task: Callable, region: str, item, priority: Optional[int]):
+        api = self.client(region)
+        if priority is None:
+            return task(api, item)
+        with api.priority(priority):
+            return task(api, item)
+
+    def get_match_details_many(self, match_ids: List[str], workers: int = DEFAULT_FETCH_WORKERS,
+                               on_progress: Callable[[int, int], None] = None, compact: bool = False
+                               ) -> Iterator[Tuple[int, str, Optional[Dict]]]:
+        """
+        Récupère des matchs de plusieurs régions en parallèle (workers threads par région)
+        Produit (index, match_id, détails) dans l'ordre d'arrivée, comme RiotAPI.get_match_details_many
+        """
+        total = len(match_ids)
+        results = self._run_by_region(
+            match_ids, region_for_match,
+            lambda api, match_id: api.get_match_details(match_id, compact), workers
+        )
+        for done, (index, match_id, detail) in enumerate(results, 1):
+            if on_progress:
+                on_progress(done, total)
+            yield index, match_id, detail
+
+    def map_players(self, func: Callable[[RiotAPI, str], object], puuids: Iterable[str],
+                    workers: int = DEFAULT_PLAYER_WORKERS) -> Iterator[Tuple[str, object]]:
+        """
+        Applique func(client_de_la_région, puuid) à chaque joueur, les régions en parallèle
+        ex: api.map_players(lambda api, puuid: MatchHistorySync(api).sync(puuid), puuids)
+        Produit (puuid, résultat) dans l'ordre d'arrivée
+        """
+        puuids = list(puuids)
+        # Résolution des régions (active shard) avant de répartir le travail
+        regions = {puuid: self.region_of(puuid) for puuid in puuids}
+        for _, puuid, result in self._run_by_region(puuids, regions.get, func, workers):
+            yield puuid, result
+
+    # --- Métriques / fermeture ---
+
+    def get_metrics(self) -> Dict:
+        """Métriques communes à toutes les régions (endpoints par hôte, marge par fenêtre)"""
+        return self.client(self.default_region).get_metrics()
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+        for api in clients:
+            api.close()
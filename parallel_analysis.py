@@ -0,0 +1,157 @@
+"""
+Module d'analyse parallèle (processus) des gros corpus de matchs
+L'analyse d'un historique est du Python pur et n'utilise qu'un cœur. Ici, les matchs sont
+répartis entre plusieurs processus ; chaque processus remplit des StatsAccumulator, qui
+sont ensuite fusionnés (merge) en un seul dictionnaire de statistiques par joueur
+Les processus ne reçoivent pas les dicts match-v5 imbriqués : soit des matchs « emballés »
+(tuples de valeurs simples, rapides à sérialiser), soit seulement des match IDs qu'ils
+lisent et décodent eux-mêmes dans l'archive (match_archive.py)
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from match_archive import MatchArchive
+from match_decoder import _participant_row, decode_match
+from stats_accumulator import StatsAccumulator
+
+# En dessous de ce nombre de matchs par processus, le lancement du pool coûte plus qu'il ne rapporte
+MIN_SHARD_SIZE = 500
+
+
+def pack_match(match) -> Tuple:
+    """
+    (match ID, gameCreation, gameDuration, lignes des participants) d'un match (dict ou MatchRecord)
+    Uniquement des types simples : bien plus rapide à envoyer à un processus que le dict complet
+    """
+    info = match.get('info', {})
+    return (
+        match.get('metadata', {}).get('matchId', ''),
+        info.get('gameCreation', 0),
+        info.get('gameDuration', 0),
+        tuple(_participant_row(p) for p in info.get('participants', ()))
+    )
+
+
+def _analyze_packed(packed: List[Tuple], puuids: List[str],
+                    scopes: Dict[str, Set[str]]) -> Dict[str, StatsAccumulator]:
+    """Accumulateurs partiels des joueurs suivis sur une tranche de matchs emballés"""
+    tracked = {puuid: StatsAccumulator(puuid) for puuid in puuids}
+    for match_id, game_creation, game_duration, rows in packed:
+        team_kills = None
+        for row in rows:
+            accumulator = tracked.get(row[0])
+            if accumulator is None:
+                continue
+            scope = scopes.get(row[0])
+            if scope is not None and match_id not in scope:
+                continue
+            if team_kills is None:
+                team_kills = {}
+                for other in rows:
+                    team_kills[other[1]] = team_kills.get(other[1], 0) + other[5]
+            accumulator.add_row(row, team_kills[row[1]], game_duration, (game_creation, match_id))
+    return tracked
+
+
+def _analyze_archive_shard(archive_path: str, match_ids: List[str], puuids: List[str],
+                           scopes: Dict[str, Set[str]]) -> Dict[str, StatsAccumulator]:
+    """Lit, décode et analyse une tranche de l'archive dans le processus courant"""
+    archive = MatchArchive(archive_path, auto_train_after=0)
+    try:
+        payloads = archive.read_many(match_ids)
+    finally:
+        archive.close()
+    return _analyze_packed([pack_match(decode_match(payload)) for payload in payloads.values()], puuids, scopes)
+
+
+def _split(items: List, workers: int) -> List[List]:
+    """Découpe items en au plus workers tranches de taille égale (au moins MIN_SHARD_SIZE)"""
+    count = max(1, min(workers, len(items) // MIN_SHARD_SIZE))
+    size = -(-len(items) // count) if items else 0
+    return [items[i:i + size] for i in range(0, len(items), size)] if items else []
+
+
+def _merge(partials: Iterable[Dict[str, StatsAccumulator]], puuids: List[str]) -> Dict[str, Dict]:
+    merged = {puuid: StatsAccumulator(puuid) for puuid in puuids}
+    for partial in partials:
+        for puuid, accumulator in partial.items():
+            merged[puuid].merge(accumulator)
+    return {puuid: accumulator.result() for puuid, accumulator in merged.items()}
+
+
+def _run(task, shards: List, puuids: List[str], scopes: Dict[str, Set[str]], workers: int,
+         *task_args) -> Dict[str, Dict]:
+    if len(shards) <= 1:
+        partials = [task(*task_args, shard, puuids, scopes) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+            partials = list(pool.map(task, *(repeat(arg) for arg in task_args), shards,
+                                     repeat(puuids), repeat(scopes)))
+    return _merge(partials, puuids)
+
+
+def _prepare(puuids: Iterable[str], workers: Optional[int], scopes: Optional[Dict[str, Iterable[str]]]):
+    puuids = list(puuids)
+    workers = workers or os.cpu_count() or 1
+    scopes = {puuid: set(ids) for puuid, ids in scopes.items()} if scopes else {}
+    return puuids, workers, scopes
+
+
+def analyze_parallel(matches: Iterable[Dict], puuids: Iterable[str], workers: int = None,
+                     scopes: Dict[str, Iterable[str]] = None) -> Dict[str, Dict]:
+    """
+    Statistiques de plusieurs joueurs sur des matchs en mémoire, réparties entre processus
+    workers: nombre de processus (défaut : nombre de cœurs)
+    scopes: match IDs à compter pour chaque joueur (voir DataAnalyzer.analyze_many)
+    Retourne {puuid: stats}, même format et mêmes valeurs que DataAnalyzer.analyze_many
+    Sous Windows / macOS, l'appel doit être protégé par if __name__ == '__main__'
+    """
+    puuids, workers, scopes = _prepare(puuids, workers, scopes)
+    packed = [pack_match(match) for match in matches if match is not None]
+    return _run(_analyze_packed, _split(packed, workers), puuids, scopes, workers)
+
+
+def analyze_archive_parallel(puuids: Iterable[str], match_ids: Iterable[str] = None, archive_path: str = None,
+                             workers: int = None, scopes: Dict[str, Iterable[str]] = None) -> Dict[str, Dict]:
+    """
+    Même analyse sur des matchs de l'archive compressée : chaque processus lit et décode
+    lui-même sa tranche, le processus principal n'envoie que des match IDs
+    match_ids: matchs à analyser (défaut : toute l'archive)
+    """
+    puuids, workers, scopes = _prepare(puuids, workers, scopes)
+    archive = MatchArchive(archive_path, auto_train_after=0)
+    try:
+        archive_path = archive.path
+        match_ids = list(match_ids) if match_ids is not None else list(archive.iter_ids())
+    finally:
+        archive.close()
+    return _run(_analyze_archive_shard, _split(match_ids, workers), puuids, scopes, workers, archive_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse parallèle des matchs archivés de plusieurs joueurs")
+    parser.add_argument('puuids', nargs='+', help='PUUID des joueurs à analyser')
+    parser.add_argument('--archive', default=None, help='fichier de l\'archive (défaut : COACH_LOL_MATCH_ARCHIVE)')
+    parser.add_argument('--workers', type=int, default=None, help='nombre de processus (défaut : nombre de cœurs)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = analyze_archive_parallel(args.puuids, archive_path=args.archive, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    for puuid, stats in results.items():
+        if not stats:
+            print(f"{puuid[:12]}... : aucune partie dans l'archive")
+            continue
+        print(f"{puuid[:12]}... : {stats['total_games']} parties, {stats['winrate']:.1f}% WR, "
+              f"KDA {stats['kda_avg']:.2f}, {stats['cs_per_min_avg']:.1f} CS/min, "
+              f"KP {stats['kill_participation']:.1f}%")
+    print(f"\n✓ Analyse terminée en {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Module d'indexation des participants d'un match
+Un ParsedMatch est construit une seule fois par match : index PUUID -> participant,
+équipes et totaux par équipe (kills, dégâts, or, vision). Les analyses d'un même match
+pour plusieurs joueurs (lobby, premades) ou plusieurs vues ne refont plus de recherche
+linéaire ni de somme sur les 10 participants
+"""
+from operator import attrgetter, itemgetter
+from typing import Dict, Optional, Tuple
+
+from match_decoder import MatchRecord, _Record
+
+
+_TOTAL_FIELDS = ('puuid', 'teamId', 'kills', 'totalDamageDealtToChampions', 'goldEarned', 'visionScore')
+_get_item_totals = itemgetter(*_TOTAL_FIELDS)
+_get_attr_totals = attrgetter(*_TOTAL_FIELDS)
+
+
+def _participant_totals(participants: Tuple) -> list:
+    """(puuid, teamId, kills, dégâts, or, vision) de chaque participant"""
+    if not participants:
+        return []
+    try:
+        # Chemin rapide : un seul appel C par participant (match-v5 complet, dict ou ParticipantRecord)
+        getter = _get_attr_totals if isinstance(participants[0], _Record) else _get_item_totals
+        return list(map(getter, participants))
+    except (KeyError, AttributeError):
+        # Champs absents (spectator-v5, payload partiel)
+        return [(p.get('puuid'), p.get('teamId'), p.get('kills', 0), p.get('totalDamageDealtToChampions', 0),
+                 p.get('goldEarned', 0), p.get('visionScore', 0)) for p in participants]
+
+
+class TeamTotals:
+    """Totaux d'une équipe sur le match"""
+    __slots__ = ('team_id', 'participants', 'kills', 'damage', 'gold', 'vision')
+
+    def __init__(self, team_id: int, participants: list, kills: int = 0, damage: int = 0, gold: int = 0,
+                 vision: int = 0):
+        self.team_id = team_id
+        self.participants = participants
+        self.kills = kills
+        self.damage = damage
+        self.gold = gold
+        self.vision = vision
+
+    def __repr__(self):
+        return (f"TeamTotals(team_id={self.team_id}, kills={self.kills}, damage={self.damage}, "
+                f"gold={self.gold}, vision={self.vision})")
+
+
+class ParsedMatch:
+    __slots__ = ('match_id', 'participants', 'by_puuid', 'teams')
+
+    def __init__(self, match_id: str, participants):
+        """
+        match_id: identifiant du match (ou de la partie en cours)
+        participants: participants match-v5 (dicts ou ParticipantRecord) ou spectator-v5
+        """
+        self.match_id = match_id
+        self.participants = tuple(participants)
+        self.by_puuid: Dict[str, object] = {}
+        self.teams: Dict[int, TeamTotals]
+
+        # Un seul passage sur les participants pour l'index et les totaux
+        # (sommes dans des listes locales : moins coûteux que des attributs)
+        by_puuid = self.by_puuid
+        sums: Dict[int, list] = {}
+        for p, (puuid, team_id, kills, damage, gold, vision) in zip(self.participants,
+                                                                    _participant_totals(self.participants)):
+            if puuid:
+                by_puuid[puuid] = p
+            team = sums.get(team_id)
+            if team is None:
+                team = sums[team_id] = [[], 0, 0, 0, 0]
+            team[0].append(p)
+            team[1] += kills
+            team[2] += damage
+            team[3] += gold
+            team[4] += vision
+        self.teams = {team_id: TeamTotals(team_id, *team) for team_id, team in sums.items()}
+
+    @classmethod
+    def from_active_game(cls, game_data: Dict) -> 'ParsedMatch':
+        """Index d'une partie en cours (spectator-v5 : participants au premier niveau)"""
+        return cls(str(game_data.get('gameId', '')), game_data.get('participants', []))
+
+    def participant(self, puuid: str):
+        return self.by_puuid.get(puuid)
+
+    def team(self, team_id: int) -> Optional[TeamTotals]:
+        return self.teams.get(team_id)
+
+    def team_of(self, puuid: str) -> Optional[TeamTotals]:
+        player = self.by_puuid.get(puuid)
+        return self.teams.get(player['teamId']) if player else None
+
+    def allies(self, puuid: str) -> Tuple:
+        """Participants de l'équipe du joueur (lui compris)"""
+        team = self.team_of(puuid)
+        return tuple(team.participants) if team else ()
+
+    def enemies(self, puuid: str) -> Tuple:
+        player = self.by_puuid.get(puuid)
+        if not player:
+            return ()
+        return tuple(p for team_id, team in self.teams.items() if team_id != player['teamId']
+                     for p in team.participants)
+
+    def lane_opponent(self, puuid: str):
+        """Adversaire direct (même teamPosition dans l'autre équipe), None sans rôle"""
+        player = self.by_puuid.get(puuid)
+        if not player or not player.get('teamPosition'):
+            return None
+        return next((p for p in self.enemies(puuid) if p.get('teamPosition') == player['teamPosition']), None)
+
+    def kill_participation(self, puuid: str) -> Optional[float]:
+        """(kills + assists) / kills de l'équipe en %, None si l'équipe n'a aucun kill"""
+        player = self.by_puuid.get(puuid)
+        if not player:
+            return None
+        team_kills = self.teams[player['teamId']].kills
+        if team_kills <= 0:
+            return None
+        return (player['kills'] + player['assists']) / team_kills * 100
+
+    def damage_share(self, puuid: str) -> Optional[float]:
+        """Part des dégâts aux champions de l'équipe en %"""
+        player = self.by_puuid.get(puuid)
+        if not player:
+            return None
+        team_damage = self.teams[player['teamId']].damage
+        if team_damage <= 0:
+            return None
+        return player.get('totalDamageDealtToChampions', 0) / team_damage * 100
+
+    def __repr__(self):
+        return f"ParsedMatch({self.match_id!r}, participants={len(self.participants)})"
+
+
+def parse_match(match) -> ParsedMatch:
+    """
+    Index d'un match (dict match-v5 ou MatchRecord)
+    Sur un MatchRecord, l'index est construit une seule fois et gardé sur l'enregistrement
+    (il disparaît avec lui). Un dict ne peut pas le porter ni être référencé faiblement :
+    son index est reconstruit à chaque appel, sans cache global qui garderait les
+    participants en mémoire ou confondrait deux dicts de même match ID
+    """
+    if isinstance(match, MatchRecord):
+        parsed = match._parsed
+        if parsed is None:
+            parsed = match._parsed = ParsedMatch(match.match_id, match.info.participants)
+        return parsed
+
+    return ParsedMatch(match.get('metadata', {}).get('matchId', ''), match.get('info', {}).get('participants', []))
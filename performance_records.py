@@ -0,0 +1,136 @@
+"""
+Module d'enregistrements compacts pour les statistiques de joueur
+Une partie (recent_performance) et les agrégats par champion étaient des dicts, et chaque
+champion portait son propre defaultdict de rôles. Ces classes à __slots__ prennent environ
+deux fois moins de mémoire. Elles restent des Mapping en lecture (record['games'],
+.items(), dict(record), comparaison avec un dict), donc les appelants existants fonctionnent
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterator, Tuple
+
+
+class GamePerformance(Mapping):
+    """Performance du joueur sur une partie (entrée de stats['recent_performance'])"""
+    __slots__ = ('champion', 'win', 'kills', 'deaths', 'assists', 'cs', 'cs_per_min', 'vision_score',
+                 'damage', 'gold')
+    KEYS = ('champion', 'win', 'kda', 'cs', 'cs_per_min', 'vision_score', 'damage', 'gold')
+
+    def __init__(self, champion: str, win: bool, kills: int, deaths: int, assists: int, cs: int,
+                 cs_per_min: float, vision_score: int, damage: int, gold: int):
+        self.champion = champion
+        self.win = win
+        self.kills = kills
+        self.deaths = deaths
+        self.assists = assists
+        self.cs = cs
+        self.cs_per_min = cs_per_min
+        self.vision_score = vision_score
+        self.damage = damage
+        self.gold = gold
+
+    @property
+    def kda(self) -> str:
+        """'K/D/A' (calculé à la demande plutôt que stocké)"""
+        return f"{self.kills}/{self.deaths}/{self.assists}"
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f"GamePerformance({dict(self)!r})"
+
+
+class RoleCounts(Mapping):
+    """Parties par rôle, dans l'ordre de première apparition (comme le defaultdict d'origine)"""
+    __slots__ = ('_roles', '_counts')
+
+    def __init__(self, counts: Dict[str, int] = None):
+        self._roles: Tuple[str, ...] = ()
+        self._counts = []
+        if counts:
+            for role, count in counts.items():
+                self.add(role, count)
+
+    def add(self, role: str, count: int = 1):
+        try:
+            self._counts[self._roles.index(role)] += count
+        except ValueError:
+            self._roles += (role,)
+            self._counts.append(count)
+
+    def __getitem__(self, role: str) -> int:
+        try:
+            return self._counts[self._roles.index(role)]
+        except ValueError:
+            raise KeyError(role) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._roles)
+
+    def __len__(self) -> int:
+        return len(self._roles)
+
+    def __repr__(self):
+        return f"RoleCounts({dict(self)!r})"
+
+
+class ChampionAggregate(Mapping):
+    """Cumul des parties sur un champion (entrée de stats['champions'])"""
+    __slots__ = ('games', 'wins', 'kills', 'deaths', 'assists', 'roles')
+    KEYS = __slots__
+    COUNTERS = ('games', 'wins', 'kills', 'deaths', 'assists')
+
+    def __init__(self, games: int = 0, wins: int = 0, kills: int = 0, deaths: int = 0, assists: int = 0,
+                 roles: Dict[str, int] = None):
+        self.games = games
+        self.wins = wins
+        self.kills = kills
+        self.deaths = deaths
+        self.assists = assists
+        self.roles = RoleCounts(roles)
+
+    def add_game(self, win: bool, kills: int, deaths: int, assists: int, role: str):
+        self.games += 1
+        self.wins += 1 if win else 0
+        self.kills += kills
+        self.deaths += deaths
+        self.assists += assists
+        self.roles.add(role)
+
+    def merge(self, other: 'ChampionAggregate') -> 'ChampionAggregate':
+        self.games += other.games
+        self.wins += other.wins
+        self.kills += other.kills
+        self.deaths += other.deaths
+        self.assists += other.assists
+        for role, count in other.roles.items():
+            self.roles.add(role, count)
+        return self
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: int):
+        # Compatibilité : champion['games'] += 1
+        if key not in self.COUNTERS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f"ChampionAggregate({dict(self)!r})"
@@ -0,0 +1,317 @@
+"""
+Module de limitation de débit pour l'API Riot Games
+Lit les en-têtes X-App-Rate-Limit / X-Method-Rate-Limit et espace les requêtes
+pour rester sous toutes les fenêtres, par hôte de routage et par méthode
+Les requêtes en attente sont servies par classe de priorité : une analyse pré-game
+passe devant le téléchargement d'un historique, qui passe devant une synchronisation
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Limites d'une clé de développement (utilisées tant qu'aucun en-tête n'a été reçu)
+DEFAULT_APP_LIMITS = [(20, 1), (100, 120)]
+
+# Classes de priorité (la plus petite valeur est servie en premier)
+PRIORITY_INTERACTIVE = 0   # analyse pré-game / partie en cours
+PRIORITY_HISTORY = 1       # historique demandé par l'utilisateur
+PRIORITY_BACKGROUND = 2    # synchronisation, archivage
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: 'interactive', PRIORITY_HISTORY: 'history', PRIORITY_BACKGROUND: 'background'}
+
+# Part de chaque fenêtre qu'une classe ne peut pas consommer : elle reste disponible
+# pour les classes supérieures. Les tâches de fond la laissent toujours libre (70 % du débit
+# au plus, soit 14/s et 70/2 min avec une clé de développement) : une analyse pré-game
+# lancée pendant une synchronisation ne trouve jamais la fenêtre de 2 min vide
+PRIORITY_RESERVE = {PRIORITY_INTERACTIVE: 0.0, PRIORITY_HISTORY: 0.1, PRIORITY_BACKGROUND: 0.3}
+
+# L'historique (classe par défaut) ne laisse sa réserve libre que pendant une activité
+# interactive sur l'hôte (requête en attente ou servie depuis moins de INTERACTIVE_GRACE s) :
+# seul, il dispose de tout le débit (20/s, 100/2 min), et les requêtes d'une analyse
+# pré-game en cours trouvent toujours de la place entre les siennes
+_INTERACTIVE_ONLY_RESERVE = {PRIORITY_HISTORY}
+INTERACTIVE_GRACE = 5.0
+
+# Attente maximale entre deux vérifications quand une requête prioritaire est servie avant
+_YIELD_TIMEOUT = 0.05
+
+# Marge ajoutée à chaque fenêtre (secondes) : Riot compte des fenêtres fixes à l'arrivée des
+# requêtes, et les en-têtes de compteurs n'arrivent qu'avec les réponses
+WINDOW_PADDING = 0.05
+
+
+def parse_rate_limit_header(value: Optional[str]) -> List[Tuple[int, int]]:
+    """
+    Parse un en-tête de rate limit Riot
+    "20:1,100:120" -> [(20, 1), (100, 120)] soit (requêtes, secondes)
+    """
+    if not value:
+        return []
+
+    limits = []
+    for part in value.split(','):
+        try:
+            count, seconds = part.strip().split(':')
+            limits.append((int(count), int(seconds)))
+        except ValueError:
+            continue
+    return limits
+
+
+class _Window:
+    """
+    Fenêtre glissante : au plus `limit` requêtes sur `seconds` secondes
+    Une requête compte dès qu'elle obtient son créneau (en vol), puis est datée de la
+    réception de sa réponse : le serveur l'a forcément comptée avant, donc elle ne sort
+    jamais de la fenêtre locale avant de sortir de la sienne
+    """
+
+    def __init__(self, limit: int, seconds: int):
+        self.limit = limit
+        self.seconds = seconds
+        self.timestamps = deque()
+        self.in_flight = 0
+
+    def _purge(self, now: float):
+        while self.timestamps and self.timestamps[0] <= now - self.seconds - WINDOW_PADDING:
+            self.timestamps.popleft()
+
+    @property
+    def used(self) -> int:
+        return len(self.timestamps) + self.in_flight
+
+    def wait_time(self, now: float, share: float = 1.0) -> float:
+        """share: part de la limite utilisable (voir PRIORITY_RESERVE)"""
+        self._purge(now)
+        limit = max(1, int(self.limit * share)) if share < 1.0 else self.limit
+        if self.used < limit:
+            return 0.0
+        # Créneaux à libérer ; s'il faut attendre des requêtes en vol, leur fin réveille les attentes
+        release = self.used - limit
+        if release >= len(self.timestamps):
+            return _YIELD_TIMEOUT
+        return self.timestamps[release] + self.seconds + WINDOW_PADDING - now
+
+    def record(self, now: float):
+        self.in_flight += 1
+
+    def complete(self, now: float):
+        if self.in_flight > 0:
+            self.in_flight -= 1
+        self.timestamps.append(now)
+
+    def sync(self, count: int, now: float):
+        """Aligne le compteur local sur celui renvoyé par le serveur"""
+        self._purge(now)
+        for _ in range(count - self.used):
+            self.timestamps.append(now)
+
+
+class _Bucket:
+    """Ensemble de fenêtres appliquées à un même périmètre (application ou méthode)"""
+
+    def __init__(self, limits: List[Tuple[int, int]] = None):
+        self.windows: Dict[int, _Window] = {}
+        self.blocked_until = 0.0
+        if limits:
+            self.set_limits(limits)
+
+    def set_limits(self, limits: List[Tuple[int, int]]):
+        windows = {}
+        for limit, seconds in limits:
+            window = self.windows.get(seconds) or _Window(limit, seconds)
+            window.limit = limit
+            windows[seconds] = window
+        self.windows = windows
+
+    def sync_counts(self, counts: List[Tuple[int, int]], now: float):
+        for count, seconds in counts:
+            window = self.windows.get(seconds)
+            if window:
+                window.sync(count, now)
+
+    def wait_time(self, now: float, share: float = 1.0) -> float:
+        wait = max(self.blocked_until - now, 0.0)
+        for window in self.windows.values():
+            wait = max(wait, window.wait_time(now, share))
+        return wait
+
+    def record(self, now: float):
+        for window in self.windows.values():
+            window.record(now)
+
+    def complete(self, now: float):
+        for window in self.windows.values():
+            window.complete(now)
+
+
+class RateLimiter:
+    def __init__(self, default_app_limits: List[Tuple[int, int]] = None):
+        """
+        Limiteur proactif multi-fenêtres
+        Un bucket applicatif par hôte (euw1, europe, ...) et un bucket par (hôte, méthode)
+        Par hôte, les requêtes en attente sont servies par priorité puis par ordre d'arrivée
+        """
+        self.default_app_limits = default_app_limits or DEFAULT_APP_LIMITS
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._app_buckets: Dict[str, _Bucket] = {}
+        self._method_buckets: Dict[Tuple[str, str], _Bucket] = {}
+        # Requêtes en attente par hôte : (priorité, numéro d'arrivée) -> méthode
+        self._waiters: Dict[str, Dict[Tuple[int, int], str]] = {}
+        # Dernière activité interactive par hôte (voir _INTERACTIVE_ONLY_RESERVE)
+        self._interactive_seen: Dict[str, float] = {}
+        self._sequence = itertools.count()
+
+    def _buckets(self, host: str, method: str) -> Tuple[_Bucket, _Bucket]:
+        app_bucket = self._app_buckets.get(host)
+        if app_bucket is None:
+            app_bucket = self._app_buckets[host] = _Bucket(self.default_app_limits)
+
+        method_bucket = self._method_buckets.get((host, method))
+        if method_bucket is None:
+            method_bucket = self._method_buckets[(host, method)] = _Bucket()
+
+        return app_bucket, method_bucket
+
+    def _reserve(self, host: str, priority: int, now: float) -> float:
+        reserve = PRIORITY_RESERVE.get(priority, 0.0)
+        if reserve and priority in _INTERACTIVE_ONLY_RESERVE:
+            interactive = (now - self._interactive_seen.get(host, float('-inf')) < INTERACTIVE_GRACE
+                           or any(other[0] == PRIORITY_INTERACTIVE for other in self._waiters.get(host, ())))
+            if not interactive:
+                return 0.0
+        return reserve
+
+    def _wait_time(self, host: str, method: str, priority: int, now: float) -> float:
+        app_bucket, method_bucket = self._buckets(host, method)
+        share = 1.0 - self._reserve(host, priority, now)
+        return max(app_bucket.wait_time(now, share), method_bucket.wait_time(now, share))
+
+    def acquire(self, host: str, method: str, priority: int = PRIORITY_HISTORY) -> float:
+        """
+        Bloque jusqu'à ce qu'une requête puisse partir sans dépasser aucune fenêtre
+        Une requête ne part pas tant qu'une requête plus prioritaire (ou plus ancienne de
+        même priorité) vers le même hôte pourrait partir à sa place
+        Le créneau compte comme en vol jusqu'à l'appel de complete(), obligatoire une fois
+        la requête envoyée (réponse reçue ou erreur réseau)
+        Retourne le temps passé à attendre (en secondes)
+        """
+        started = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            waiters = self._waiters.setdefault(host, {})
+            waiters[ticket] = method
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_time(host, method, ticket[0], now)
+                    if wait <= 0:
+                        # Une requête servie avant nous et prête à partir a la priorité
+                        ahead = any(other < ticket and self._wait_time(host, other_method, other[0], now) <= 0
+                                    for other, other_method in waiters.items())
+                        if not ahead:
+                            app_bucket, method_bucket = self._buckets(host, method)
+                            app_bucket.record(now)
+                            method_bucket.record(now)
+                            if priority == PRIORITY_INTERACTIVE:
+                                self._interactive_seen[host] = now
+                            return time.monotonic() - started
+                        wait = _YIELD_TIMEOUT
+
+                    self._cond.wait(wait)
+            finally:
+                del waiters[ticket]
+                self._cond.notify_all()
+
+    def complete(self, host: str, method: str):
+        """Fin d'une requête obtenue par acquire() : son créneau est daté de maintenant"""
+        with self._cond:
+            now = time.monotonic()
+            app_bucket, method_bucket = self._buckets(host, method)
+            app_bucket.complete(now)
+            method_bucket.complete(now)
+            self._cond.notify_all()
+
+    def waiting(self) -> Dict[str, int]:
+        """Nombre de requêtes en attente du limiteur, par classe de priorité"""
+        with self._lock:
+            counts = {name: 0 for name in PRIORITY_NAMES.values()}
+            for waiters in self._waiters.values():
+                for priority, _ in waiters:
+                    name = PRIORITY_NAMES.get(priority, str(priority))
+                    counts[name] = counts.get(name, 0) + 1
+            return counts
+
+    def update_from_headers(self, host: str, method: str, headers: Dict):
+        """Met à jour les limites et compteurs à partir des en-têtes de réponse"""
+        with self._lock:
+            now = time.monotonic()
+            app_bucket, method_bucket = self._buckets(host, method)
+
+            app_limits = parse_rate_limit_header(headers.get('X-App-Rate-Limit'))
+            if app_limits:
+                app_bucket.set_limits(app_limits)
+            app_bucket.sync_counts(parse_rate_limit_header(headers.get('X-App-Rate-Limit-Count')), now)
+
+            method_limits = parse_rate_limit_header(headers.get('X-Method-Rate-Limit'))
+            if method_limits:
+                method_bucket.set_limits(method_limits)
+            method_bucket.sync_counts(parse_rate_limit_header(headers.get('X-Method-Rate-Limit-Count')), now)
+            # Les limites ont pu augmenter : les requêtes en attente réévaluent leur délai
+            self._cond.notify_all()
+
+    def headroom(self) -> List[Dict]:
+        """
+        Marge restante dans chaque fenêtre connue (limites et compteurs issus des en-têtes)
+        Une entrée par fenêtre : scope ('application' ou 'method'), host, method, seconds, limit, used, remaining
+        """
+        with self._lock:
+            now = time.monotonic()
+            buckets = [('application', host, '', bucket) for host, bucket in self._app_buckets.items()]
+            buckets += [('method', host, method, bucket) for (host, method), bucket in self._method_buckets.items()]
+
+            result = []
+            for scope, host, method, bucket in sorted(buckets, key=lambda b: b[:3]):
+                for seconds, window in sorted(bucket.windows.items()):
+                    window._purge(now)
+                    used = window.used
+                    result.append({
+                        'scope': scope,
+                        'host': host,
+                        'method': method,
+                        'seconds': seconds,
+                        'limit': window.limit,
+                        'used': used,
+                        'remaining': max(window.limit - used, 0),
+                        'blocked_for': round(max(bucket.blocked_until - now, 0.0), 3)
+                    })
+            return result
+
+    def penalize(self, host: str, method: str, retry_after: float, limit_type: str = None):
+        """
+        Suspend les requêtes après un 429
+        limit_type: valeur de X-Rate-Limit-Type ('application', 'method' ou 'service')
+        """
+        with self._lock:
+            until = time.monotonic() + retry_after
+            app_bucket, method_bucket = self._buckets(host, method)
+
+            if limit_type == 'application':
+                app_bucket.blocked_until = max(app_bucket.blocked_until, until)
+            else:
+                method_bucket.blocked_until = max(method_bucket.blocked_until, until)
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter(api_key: str) -> RateLimiter:
+    """Retourne le limiteur commun à tous les clients utilisant la même clé API"""
+    with _shared_lock:
+        limiter = _shared_limiters.get(api_key)
+        if limiter is None:
+            limiter = _shared_limiters[api_key] = RateLimiter()
+        return limiter
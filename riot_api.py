@@ -4,7 +4,23 @@ Module pour interagir avec l'API Riot Games
 import requests
 import time
 import os
-from typing import Dict, List, Optional
+import json
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+from requests.adapters import HTTPAdapter
+
+from cassette import Cassette
+from match_decoder import decode_match, loads
+from match_store import MatchStore
+from metrics import RequestMetrics
+from rate_limiter import PRIORITY_HISTORY, RateLimiter, shared_rate_limiter
+from single_flight import SingleFlight, shared_single_flight
+from timeline import TimelineFrames, parse_timeline
+from ttl_cache import TTLCache
 
 # Constantes définies dans le module (indépendant de config.py)
 REGIONS = {
@@ -38,29 +54,265 @@ ROUTING = {
 API_BASE_URL = 'https://{region}.api.riotgames.com'
 CONTINENTAL_BASE_URL = 'https://{routing}.api.riotgames.com'
 
+# Nombre maximum de nouvelles tentatives après un 429
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Connexions HTTP : taille du pool par hôte, timeouts (connexion, lecture) en secondes
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Nouvelles tentatives sur erreurs 5xx / timeouts (backoff exponentiel avec jitter)
+MAX_ERROR_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# Nombre maximum d'IDs de matchs renvoyés par page (match-v5)
+MATCH_IDS_PAGE_SIZE = 100
+
+# Nombre de threads par défaut pour le téléchargement de matchs en lot
+DEFAULT_FETCH_WORKERS = 8
+
 class RiotAPI:
-    def __init__(self, api_key: str = None, region: str = 'EUW'):
+    def __init__(self, api_key: str = None, region: str = 'EUW',
+                 match_store: MatchStore = None, use_match_cache: bool = True,
+                 rate_limiter: RateLimiter = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: tuple = DEFAULT_TIMEOUT, max_retries: int = MAX_ERROR_RETRIES,
+                 single_flight: SingleFlight = None, response_cache: TTLCache = None,
+                 use_response_cache: bool = True, cassette: Cassette = None,
+                 base_url: str = None, metrics: RequestMetrics = None,
+                 priority: int = PRIORITY_HISTORY):
+        """
+        match_store: cache persistant des détails de matchs (créé par défaut)
+        use_match_cache: False pour toujours interroger l'API
+        rate_limiter: limiteur de débit (partagé par clé API par défaut)
+        pool_size: connexions keep-alive conservées par hôte
+        timeout: (timeout de connexion, timeout de lecture) en secondes
+        max_retries: nouvelles tentatives sur erreur 5xx ou timeout
+        single_flight: coalescence des requêtes identiques (partagée par défaut)
+        response_cache: cache TTL des endpoints non immuables (comptes, rangs, ...)
+        use_response_cache: False pour toujours interroger l'API
+        cassette: enregistrement / rejeu des réponses (défaut : variables COACH_LOL_CASSETTE*)
+        base_url: remplace les hôtes Riot (ex: serveur de test local), défaut : RIOT_API_BASE_URL
+        metrics: compteurs de requêtes (créés par défaut, voir get_metrics)
+        priority: classe de priorité par défaut auprès du limiteur (voir rate_limiter.PRIORITY_*)
+        """
         self.api_key = api_key or os.getenv('RIOT_API_KEY', '')
         self.region = REGIONS.get(region, REGIONS['EUW'])
         self.routing = ROUTING.get(region, 'europe')
+
+        # Tous les endpoints (plateforme et continentaux) pointent vers base_url s'il est défini
+        base_url = base_url or os.getenv('RIOT_API_BASE_URL')
+        if base_url:
+            self.platform_base_url = self.continental_base_url = base_url.rstrip('/')
+        else:
+            self.platform_base_url = API_BASE_URL.format(region=self.region)
+            self.continental_base_url = CONTINENTAL_BASE_URL.format(routing=self.routing)
+
         self.headers = {
             'X-Riot-Token': self.api_key
         }
 
-    def _make_request(self, url: str, params: Dict = None) -> Optional[Dict]:
-        """Effectue une requête à l'API avec gestion des erreurs"""
+        if match_store is None and use_match_cache:
+            match_store = MatchStore()
+        self.match_store = match_store
+        self.rate_limiter = rate_limiter or shared_rate_limiter(self.api_key)
+        self.single_flight = single_flight or shared_single_flight()
+
+        if response_cache is None and use_response_cache:
+            response_cache = TTLCache()
+        self.response_cache = response_cache
+        self.cassette = cassette or Cassette.from_env()
+        self.metrics = metrics or RequestMetrics()
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+        self.default_priority = priority
+        self._local = threading.local()
+
+    @property
+    def current_priority(self) -> int:
+        """Classe de priorité des requêtes envoyées par le thread courant"""
+        return getattr(self._local, 'priority', self.default_priority)
+
+    @contextmanager
+    def priority(self, priority: int):
+        """
+        Envoie les requêtes du bloc avec une autre classe de priorité (thread courant
+        et threads de get_match_details_many)
+            with api.priority(PRIORITY_INTERACTIVE):
+                api.get_current_game(puuid)
+        """
+        previous = getattr(self._local, 'priority', None)
+        self._local.priority = priority
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            yield self
+        finally:
+            if previous is None:
+                del self._local.priority
+            else:
+                self._local.priority = previous
+
+    def _get_session(self, host: str) -> requests.Session:
+        """Retourne la session HTTP (pool keep-alive) dédiée à un hôte"""
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update(self.headers)
+                session.headers['Accept-Encoding'] = 'gzip'
+                self._sessions[host] = session
+            return session
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Délai avant la tentative suivante (backoff exponentiel, jitter complet)"""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
 
-            # Gestion du rate limiting
-            if response.status_code == 429:
-                retry_after = int(response.headers.get('Retry-After', 1))
-                print(f"Rate limit atteint. Attente de {retry_after} secondes...")
-                time.sleep(retry_after)
-                return self._make_request(url, params)
+    def close(self):
+        """Ferme les connexions HTTP ouvertes"""
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
 
-            response.raise_for_status()
-            return response.json()
+    def _make_request(self, url: str, params: Dict = None, raw: bool = False,
+                      endpoint: str = None):
+        """
+        Effectue une requête à l'API avec gestion des erreurs
+        raw: True pour récupérer le corps brut (bytes) au lieu du JSON décodé
+        endpoint: nom de la méthode Riot (clé des limites par méthode)
+        Les appels simultanés vers la même URL (mêmes paramètres) partagent une seule requête
+        """
+        cache_key = url + ('?' + urlencode(sorted(params.items())) if params else '')
+        cacheable = self.response_cache is not None and self.response_cache.is_cacheable(endpoint)
+
+        payload = self.response_cache.get(endpoint, cache_key) if cacheable else None
+        if payload is not None:
+            self.metrics.record_cache_hit(endpoint, urlparse(url).netloc, 'response_cache')
+        else:
+            payload = self.single_flight.do(
+                (self.api_key, cache_key), lambda: self._fetch(url, params, endpoint)
+            )
+            if payload is not None and cacheable:
+                self.response_cache.put(endpoint, cache_key, payload)
+
+        if payload is None or raw:
+            return payload
+        # Chaque appelant reçoit sa propre copie décodée
+        return json.loads(payload)
+
+    def invalidate_cache(self, endpoint: str = None, contains: str = None) -> int:
+        """
+        Invalide le cache TTL des réponses
+        endpoint: limiter à un endpoint (ex: 'league-v4.entries-by-summoner')
+        contains: limiter aux URLs contenant cette chaîne (ex: un PUUID)
+        """
+        if self.response_cache is None:
+            return 0
+        return self.response_cache.invalidate(endpoint, contains)
+
+    def get_metrics(self) -> Dict:
+        """
+        Métriques par endpoint et par hôte (appels, octets, statuts, latence, caches,
+        attente du limiteur) et marge restante dans chaque fenêtre de rate limit
+        """
+        report = {
+            'endpoints': self.metrics.snapshot(),
+            'rate_limit_headroom': self.rate_limiter.headroom(),
+            'rate_limit_waiting': self.rate_limiter.waiting(),
+            'single_flight': self.single_flight.stats()
+        }
+        if self.match_store is not None:
+            report['match_store'] = self.match_store.stats()
+        if self.response_cache is not None:
+            report['response_cache'] = self.response_cache.stats()
+        return report
+
+    def export_metrics(self, fmt: str = 'json') -> str:
+        """Export des métriques : 'json' ou 'prometheus'"""
+        if fmt == 'prometheus':
+            return self.metrics.to_prometheus(self.rate_limiter.headroom())
+
+        report = self.get_metrics()
+        del report['endpoints']
+        headroom = report.pop('rate_limit_headroom')
+        return self.metrics.to_json(headroom, extra=report)
+
+    def _send(self, session: requests.Session, url: str, params: Dict = None):
+        """Envoie la requête HTTP, ou la rejoue / l'enregistre si une cassette est active"""
+        if self.cassette is None:
+            return session.get(url, params=params, timeout=self.timeout)
+
+        key = Cassette.make_key('riot', url, sorted((params or {}).items()))
+        if self.cassette.mode == 'replay':
+            return self.cassette.replay_http(key, url)
+
+        response = session.get(url, params=params, timeout=self.timeout)
+        self.cassette.record_http(key, response)
+        return response
+
+    def _fetch(self, url: str, params: Dict = None, endpoint: str = None) -> Optional[bytes]:
+        """Envoie la requête HTTP (limiteur, retries) et retourne le corps brut"""
+        host = urlparse(url).netloc
+        endpoint = endpoint or urlparse(url).path
+        session = self._get_session(host)
+        rate_limit_retries = 0
+        error_retries = 0
+
+        try:
+            while True:
+                waited = self.rate_limiter.acquire(host, endpoint, self.current_priority)
+                self.metrics.record_rate_limit_sleep(endpoint, host, waited)
+                started = time.perf_counter()
+                try:
+                    try:
+                        response = self._send(session, url, params)
+                    finally:
+                        # Le créneau est daté de la réponse (ou de l'échec) : le serveur l'a compté avant
+                        self.rate_limiter.complete(host, endpoint)
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                    self.metrics.record_network_error(endpoint, host)
+                    if error_retries >= self.max_retries:
+                        raise
+                    delay = self._backoff_delay(error_retries)
+                    error_retries += 1
+                    print(f"Erreur réseau ({e.__class__.__name__}). Nouvelle tentative dans {delay:.1f}s...")
+                    self.metrics.record_backoff_sleep(endpoint, host, delay)
+                    time.sleep(delay)
+                    continue
+
+                self.metrics.record_response(endpoint, host, response.status_code,
+                                             len(response.content), time.perf_counter() - started)
+                self.rate_limiter.update_from_headers(host, endpoint, response.headers)
+
+                # Gestion du rate limiting (ne devrait arriver qu'en cas de clé partagée)
+                if response.status_code == 429:
+                    if rate_limit_retries >= MAX_RATE_LIMIT_RETRIES:
+                        print(f"Rate limit toujours atteint après {MAX_RATE_LIMIT_RETRIES} tentatives : {url}")
+                        return None
+                    retry_after = int(response.headers.get('Retry-After', 1))
+                    self.rate_limiter.penalize(host, endpoint, retry_after,
+                                               response.headers.get('X-Rate-Limit-Type'))
+                    rate_limit_retries += 1
+                    print(f"Rate limit atteint. Attente de {retry_after} secondes...")
+                    continue
+
+                # Erreurs serveur transitoires
+                if response.status_code >= 500 and error_retries < self.max_retries:
+                    delay = self._backoff_delay(error_retries)
+                    error_retries += 1
+                    print(f"Erreur serveur {response.status_code}. Nouvelle tentative dans {delay:.1f}s...")
+                    self.metrics.record_backoff_sleep(endpoint, host, delay)
+                    time.sleep(delay)
+                    continue
+
+                response.raise_for_status()
+                return response.content
 
         except requests.exceptions.RequestException as e:
             print(f"Erreur lors de la requête : {e}")
@@ -73,8 +325,8 @@ class RiotAPI:
         """
         # Nouvelle API avec Riot ID
         if tag:
-            url = f"{CONTINENTAL_BASE_URL.format(routing=self.routing)}/riot/account/v1/accounts/by-riot-id/{summoner_name}/{tag}"
-            account = self._make_request(url)
+            url = f"{self.continental_base_url}/riot/account/v1/accounts/by-riot-id/{summoner_name}/{tag}"
+            account = self._make_request(url, endpoint='account-v1.by-riot-id')
 
             if account:
                 # Récupère les infos du summoner avec le PUUID
@@ -84,54 +336,172 @@ class RiotAPI:
 
     def get_summoner_by_puuid(self, puuid: str) -> Optional[Dict]:
         """Récupère les informations d'un invocateur par son PUUID"""
-        url = f"{API_BASE_URL.format(region=self.region)}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        return self._make_request(url)
+        url = f"{self.platform_base_url}/lol/summoner/v4/summoners/by-puuid/{puuid}"
+        return self._make_request(url, endpoint='summoner-v4.by-puuid')
 
     def get_account_by_riot_id(self, game_name: str, tag_line: str) -> Optional[Dict]:
         """Récupère le compte Riot par Riot ID (nom#tag)"""
-        url = f"{CONTINENTAL_BASE_URL.format(routing=self.routing)}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-        return self._make_request(url)
+        url = f"{self.continental_base_url}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+        return self._make_request(url, endpoint='account-v1.by-riot-id')
 
-    def get_match_history(self, puuid: str, count: int = 20, queue: int = None) -> Optional[List[str]]:
+    def get_active_shard(self, puuid: str, game: str = 'lol') -> Optional[Dict]:
         """
-        Récupère l'historique des matchs d'un joueur
+        Région (plateforme) sur laquelle joue un compte : {'puuid', 'game', 'activeShard': 'euw1'}
+        Répond depuis n'importe quel hôte continental
+        """
+        url = f"{self.continental_base_url}/riot/account/v1/active-shards/by-game/{game}/by-puuid/{puuid}"
+        return self._make_request(url, endpoint='account-v1.active-shard')
+
+    def get_match_history(self, puuid: str, count: int = 20, queue: int = None, start: int = 0,
+                          start_time: int = None, end_time: int = None) -> Optional[List[str]]:
+        """
+        Récupère l'historique des matchs d'un joueur (du plus récent au plus ancien)
         queue: 420 = Ranked Solo, 440 = Ranked Flex, 400 = Normal Draft, etc.
+        start: décalage dans l'historique (pagination), count: 100 maximum par appel
+        start_time / end_time: bornes en secondes epoch
         """
-        url = f"{CONTINENTAL_BASE_URL.format(routing=self.routing)}/lol/match/v5/matches/by-puuid/{puuid}/ids"
-        params = {'count': count}
+        url = f"{self.continental_base_url}/lol/match/v5/matches/by-puuid/{puuid}/ids"
+        params = {'count': min(count, MATCH_IDS_PAGE_SIZE)}
         if queue:
             params['queue'] = queue
+        if start:
+            params['start'] = start
+        if start_time is not None:
+            params['startTime'] = int(start_time)
+        if end_time is not None:
+            params['endTime'] = int(end_time)
+
+        return self._make_request(url, params, endpoint='match-v5.ids-by-puuid')
+
+    def iter_match_history(self, puuid: str, queue: int = None, start_time: int = None,
+                           end_time: int = None, limit: int = None, failed: List[int] = None) -> Iterator[str]:
+        """
+        Parcourt l'historique des matchs page par page, au-delà de 100 IDs
+        limit: nombre maximum d'IDs produits (tout l'historique par défaut)
+        failed: si fourni, reçoit la position de la page dont la requête a échoué : le
+        parcours s'y arrête sans avoir atteint la fin de l'historique
+        """
+        start = 0
+        while limit is None or start < limit:
+            count = MATCH_IDS_PAGE_SIZE if limit is None else min(MATCH_IDS_PAGE_SIZE, limit - start)
+            page = self.get_match_history(puuid, count=count, queue=queue, start=start,
+                                          start_time=start_time, end_time=end_time)
+            if page is None and failed is not None:
+                failed.append(start)
+            if not page:
+                return
+
+            for match_id in page:
+                yield match_id
+
+            if len(page) < count:
+                return
+            start += len(page)
+
+    def get_match_details(self, match_id: str, compact: bool = False) -> Optional[Dict]:
+        """
+        Récupère les détails d'un match spécifique
+        Un match terminé est immuable : le cache disque est consulté avant l'API
+        compact: True pour un MatchRecord ne gardant que les champs utilisés par l'analyse
+        """
+        payload = None
+        if self.match_store is not None:
+            payload = self.match_store.get_raw(match_id)
+            if payload is not None:
+                self.metrics.record_cache_hit('match-v5.match', urlparse(self.continental_base_url).netloc, 'match_store')
+
+        if payload is None:
+            url = f"{self.continental_base_url}/lol/match/v5/matches/{match_id}"
+            payload = self._make_request(url, raw=True, endpoint='match-v5.match')
+            if payload is None:
+                return None
 
-        return self._make_request(url, params)
+            if self.match_store is not None:
+                self.match_store.put(match_id, payload)
 
-    def get_match_details(self, match_id: str) -> Optional[Dict]:
-        """Récupère les détails d'un match spécifique"""
-        url = f"{CONTINENTAL_BASE_URL.format(routing=self.routing)}/lol/match/v5/matches/{match_id}"
-        return self._make_request(url)
+        return decode_match(payload) if compact else loads(payload)
+
+    def get_match_timeline(self, match_id: str) -> Optional[TimelineFrames]:
+        """
+        Récupère la timeline d'un match (frames minute par minute)
+        Retourne des TimelineFrames (or, XP, CS et niveau en tableaux NumPy) ; le payload
+        brut est gardé dans la table des timelines du cache des matchs
+        """
+        payload = None
+        if self.match_store is not None:
+            payload = self.match_store.get_timeline_raw(match_id)
+            if payload is not None:
+                self.metrics.record_cache_hit('match-v5.timeline', urlparse(self.continental_base_url).netloc, 'match_store')
+
+        if payload is None:
+            url = f"{self.continental_base_url}/lol/match/v5/matches/{match_id}/timeline"
+            payload = self._make_request(url, raw=True, endpoint='match-v5.timeline')
+            if payload is None:
+                return None
+
+            if self.match_store is not None:
+                self.match_store.put_timeline(match_id, payload)
+
+        return parse_timeline(payload)
+
+    def get_match_details_many(self, match_ids: List[str], workers: int = DEFAULT_FETCH_WORKERS,
+                               on_progress: Callable[[int, int], None] = None, compact: bool = False
+                               ) -> Iterator[Tuple[int, str, Optional[Dict]]]:
+        """
+        Récupère plusieurs matchs en parallèle sur un pool de threads
+        Produit des tuples (index, match_id, détails) dans l'ordre d'arrivée :
+        l'index permet de reconstruire l'ordre de match_ids
+        on_progress(terminés, total) est appelé après chaque match
+        compact: True pour des MatchRecord (voir get_match_details)
+        """
+        total = len(match_ids)
+        if total == 0:
+            return
+
+        # Les threads du pool héritent de la priorité de l'appelant
+        priority = self.current_priority
+
+        def fetch(match_id: str) -> Optional[Dict]:
+            with self.priority(priority):
+                return self.get_match_details(match_id, compact)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(workers, total)), thread_name_prefix='match-fetch')
+        futures = {
+            executor.submit(fetch, match_id): (index, match_id)
+            for index, match_id in enumerate(match_ids)
+        }
+
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                index, match_id = futures[future]
+                if on_progress:
+                    on_progress(done, total)
+                yield index, match_id, future.result()
+        finally:
+            # Arrêt anticipé du consommateur : on abandonne les matchs pas encore lancés
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def get_league_entries(self, summoner_id: str) -> Optional[List[Dict]]:
         """Récupère les entrées de classement d'un joueur"""
-        url = f"{API_BASE_URL.format(region=self.region)}/lol/league/v4/entries/by-summoner/{summoner_id}"
-        return self._make_request(url)
+        url = f"{self.platform_base_url}/lol/league/v4/entries/by-summoner/{summoner_id}"
+        return self._make_request(url, endpoint='league-v4.entries-by-summoner')
 
     def get_current_game(self, puuid: str) -> Optional[Dict]:
         """Récupère les informations de la partie en cours"""
-        # D'abord récupérer le summoner ID
-        summoner = self.get_summoner_by_puuid(puuid)
-        if not summoner:
-            return None
-
-        url = f"{API_BASE_URL.format(region=self.region)}/lol/spectator/v5/active-games/by-summoner/{puuid}"
-        return self._make_request(url)
+        # spectator-v5 est indexé par PUUID : pas besoin de récupérer le summoner
+        url = f"{self.platform_base_url}/lol/spectator/v5/active-games/by-summoner/{puuid}"
+        return self._make_request(url, endpoint='spectator-v5.active-game')
 
     def get_champion_masteries(self, puuid: str, count: int = None) -> Optional[List[Dict]]:
         """Récupère les maîtrises de champion d'un joueur"""
-        url = f"{API_BASE_URL.format(region=self.region)}/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}"
+        url = f"{self.platform_base_url}/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}"
         params = {}
         if count:
             params['count'] = count
 
-        return self._make_request(url, params)
+        return self._make_request(url, params, endpoint='champion-mastery-v4.by-puuid')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+"""
+Module de coalescence des requêtes identiques en vol
+Si plusieurs appelants demandent la même ressource au même moment,
+une seule requête part et tous partagent son résultat
+"""
+import threading
+from typing import Callable, Dict, Hashable
+
+
+class _Call:
+    """Requête en cours d'exécution, attendue par un ou plusieurs appelants"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable):
+        """
+        Exécute func() une seule fois pour tous les appels simultanés ayant la même clé
+        Les appelants en attente reçoivent le même résultat (ou la même exception)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Nombre de requêtes actuellement en cours"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict:
+        """Compteurs de requêtes exécutées et coalescées"""
+        total = self.executed + self.coalesced
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'coalesced_rate': (self.coalesced / total * 100) if total else 0.0
+        }
+
+
+_shared_single_flight = SingleFlight()
+
+
+def shared_single_flight() -> SingleFlight:
+    """Retourne l'instance commune à tous les clients du processus (sessions Streamlit, scans)"""
+    return _shared_single_flight
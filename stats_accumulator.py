@@ -0,0 +1,245 @@
+"""
+Module d'agrégation en flux des statistiques de match
+Les matchs sont consommés un par un (générateur, téléchargement en cours, ...) avec une
+mémoire constante : sommes courantes et variance de Welford pour les moyennes et les
+écarts-types, et seulement les N parties les plus récentes pour le détail par partie
+Deux accumulateurs se fusionnent (merge) de façon associative : threads, processus ou
+tranches de temps peuvent être agrégés séparément puis combinés
+"""
+import heapq
+import math
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from match_decoder import _participant_row
+from parsed_match import ParsedMatch, parse_match
+from performance_records import ChampionAggregate, GamePerformance
+
+# Nombre de parties gardées en détail (recent_performance, kills, deaths, assists)
+RECENT_PERFORMANCE_LIMIT = 20
+
+
+class RunningStat:
+    """Moyenne et variance en ligne (Welford), fusionnables (Chan et al.)"""
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStat') -> 'RunningStat':
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def total(self) -> float:
+        return self.mean * self.count
+
+    @property
+    def variance(self) -> float:
+        """Variance d'échantillon (0 avec moins de 2 valeurs)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def __repr__(self):
+        return f"RunningStat(count={self.count}, mean={self.mean:.3f}, std={self.std:.3f})"
+
+
+# Métriques suivies par partie jouée : nom -> RunningStat
+TRACKED_METRICS = ('kills', 'deaths', 'assists', 'cs_per_min', 'vision_score', 'damage', 'gold', 'kill_participation')
+
+
+class StatsAccumulator:
+    def __init__(self, player_puuid: str, recent_limit: int = RECENT_PERFORMANCE_LIMIT):
+        """
+        player_puuid: joueur analysé
+        recent_limit: nombre de parties récentes gardées en détail (les plus récentes par date)
+        """
+        self.player_puuid = player_puuid
+        self.recent_limit = recent_limit
+        self.total_games = 0
+        self.wins = 0
+        self.losses = 0
+        self.metrics: Dict[str, RunningStat] = {name: RunningStat() for name in TRACKED_METRICS}
+        self.champions: Dict[str, ChampionAggregate] = {}
+        self.roles: Dict[str, int] = defaultdict(int)
+        # Tas ((date de création, match ID), détail) des parties les plus récentes
+        self._recent: List = []
+
+    def add(self, match: Dict, parsed: ParsedMatch = None):
+        """
+        Ajoute un match (dict match-v5 ou MatchRecord)
+        parsed: index du match s'il est déjà construit (sinon parse_match)
+        """
+        if parsed is None:
+            parsed = parse_match(match)
+
+        player = parsed.participant(self.player_puuid)
+        if not player:
+            self.total_games += 1
+            return
+
+        # Tous les champs lus en un appel (voir match_decoder._participant_row)
+        row = _participant_row(player)
+        info = match.get('info', {})
+        self.add_row(row, parsed.teams[row[1]].kills, info['gameDuration'],
+                     (info.get('gameCreation', 0), parsed.match_id))
+
+    def add_row(self, row: tuple, team_kills: int, game_duration: int, key: tuple = (0, '')):
+        """
+        Ajoute une partie du joueur à partir de valeurs déjà extraites
+        row: ligne du joueur (match_decoder._participant_row)
+        key: (gameCreation, match ID), pour garder les parties les plus récentes
+        """
+        self.total_games += 1
+        (_, _, champion, role, win, kills, deaths, assists,
+         cs, vision, damage, gold) = row
+        if win:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+        metrics = self.metrics
+        metrics['kills'].add(kills)
+        metrics['deaths'].add(deaths)
+        metrics['assists'].add(assists)
+
+        if team_kills > 0:
+            metrics['kill_participation'].add((kills + assists) / team_kills * 100)
+
+        cs_per_min = cs / (game_duration / 60)
+        metrics['cs_per_min'].add(cs_per_min)
+        metrics['vision_score'].add(vision)
+        metrics['damage'].add(damage)
+        metrics['gold'].add(gold)
+
+        champ = self.champions.get(champion)
+        if champ is None:
+            champ = self.champions[champion] = ChampionAggregate()
+        champ.add_game(win, kills, deaths, assists, role)
+        self.roles[role] += 1
+
+        # Détail gardé en tuple (comparable) : le dict n'est construit que dans result()
+        self._push_recent((key, (champion, win, kills, deaths, assists, cs, cs_per_min, vision, damage, gold)))
+
+    def _push_recent(self, item):
+        # Tas min sur la date : la racine est la plus ancienne des parties gardées
+        if len(self._recent) < self.recent_limit:
+            heapq.heappush(self._recent, item)
+        elif item[0] > self._recent[0][0]:
+            heapq.heapreplace(self._recent, item)
+
+    def add_many(self, matches: Iterable[Dict], on_update: Callable[['StatsAccumulator'], None] = None
+                 ) -> 'StatsAccumulator':
+        """Consomme un itérable de matchs ; on_update(self) est appelé après chaque match"""
+        for match in matches:
+            if match is None:
+                continue
+            self.add(match)
+            if on_update:
+                on_update(self)
+        return self
+
+    def merge(self, other: 'StatsAccumulator') -> 'StatsAccumulator':
+        """Fusionne other dans self (même joueur) ; l'ordre des fusions n'a pas d'importance"""
+        if other.player_puuid != self.player_puuid:
+            raise ValueError("Impossible de fusionner les statistiques de deux joueurs différents")
+
+        self.total_games += other.total_games
+        self.wins += other.wins
+        self.losses += other.losses
+        for name, stat in other.metrics.items():
+            self.metrics[name].merge(stat)
+
+        for champion, other_champ in other.champions.items():
+            champ = self.champions.get(champion)
+            if champ is None:
+                champ = self.champions[champion] = ChampionAggregate()
+            champ.merge(other_champ)
+        for role, count in other.roles.items():
+            self.roles[role] += count
+
+        for item in other._recent:
+            self._push_recent(item)
+        return self
+
+    def __add__(self, other: 'StatsAccumulator') -> 'StatsAccumulator':
+        result = StatsAccumulator(self.player_puuid, max(self.recent_limit, other.recent_limit))
+        return result.merge(self).merge(other)
+
+    def result(self) -> Dict:
+        """
+        Statistiques au format de DataAnalyzer.analyze_match_history
+        kills / deaths / assists / recent_performance ne couvrent que les parties récentes
+        (du plus récent au plus ancien) ; 'spread' donne les écarts-types
+        """
+        if self.total_games == 0:
+            return {}
+
+        metrics = self.metrics
+        recent = sorted(self._recent, reverse=True)
+        # Copies : l'accumulateur peut continuer à recevoir des matchs
+        champions = defaultdict(ChampionAggregate)
+        for champion, champ in self.champions.items():
+            champions[champion] = ChampionAggregate().merge(champ)
+
+        stats = {
+            'total_games': self.total_games,
+            'wins': self.wins,
+            'losses': self.losses,
+            'kills': array('i', [detail[2] for _, detail in recent]),
+            'deaths': array('i', [detail[3] for _, detail in recent]),
+            'assists': array('i', [detail[4] for _, detail in recent]),
+            'champions': champions,
+            'roles': defaultdict(int, self.roles),
+            'recent_performance': [GamePerformance(*detail) for _, detail in recent],
+            'winrate': (self.wins / self.total_games) * 100,
+            'avg_kills': metrics['kills'].mean,
+            'avg_deaths': metrics['deaths'].mean,
+            'avg_assists': metrics['assists'].mean,
+            # Comme l'original : vision et CS/min moyennés sur tous les matchs reçus
+            'vision_score_avg': metrics['vision_score'].total / self.total_games,
+            'cs_per_min_avg': metrics['cs_per_min'].total / self.total_games,
+            'kill_participation': metrics['kill_participation'].mean,
+            'spread': {name: stat.std for name, stat in metrics.items()}
+        }
+        stats['kda_avg'] = (stats['avg_kills'] + stats['avg_assists']) / max(stats['avg_deaths'], 1)
+        return stats
+
+
+def analyze_match_stream(matches: Iterable[Dict], player_puuid: str,
+                         on_update: Callable[[StatsAccumulator], None] = None,
+                         recent_limit: int = RECENT_PERFORMANCE_LIMIT) -> Dict:
+    """Statistiques d'un joueur à partir d'un flux de matchs (mémoire constante)"""
+    accumulator = StatsAccumulator(player_puuid, recent_limit)
+    accumulator.add_many(matches, on_update)
+    return accumulator.result()
+
+
+def merge_accumulators(accumulators: Iterable[StatsAccumulator]) -> Optional[StatsAccumulator]:
+    """Fusionne une liste d'accumulateurs partiels (None si la liste est vide)"""
+    merged = None
+    for accumulator in accumulators:
+        merged = accumulator if merged is None else merged + accumulator
+    return merged
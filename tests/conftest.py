@@ -0,0 +1,39 @@
+"""
+Fixtures communes : serveur Riot simulé (mock_riot_server) et clients RiotAPI sans
+état sur disque (cache de matchs en mémoire, limiteur et cache de réponses propres au test)
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_store import MatchStore  # noqa: E402
+from mock_riot_server import MockRiotServer  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+from riot_api import RiotAPI  # noqa: E402
+from single_flight import SingleFlight  # noqa: E402
+
+
+@pytest.fixture
+def riot_server():
+    """Fabrique de serveurs simulés, arrêtés en fin de test : riot_server(app_limits='20:1', ...)"""
+    servers = []
+
+    def start(**options):
+        server = MockRiotServer(**options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def make_api(server, rate_limiter: RateLimiter = None, **options) -> RiotAPI:
+    """Client RiotAPI branché sur un serveur simulé, sans cache de réponses ni fichier"""
+    options.setdefault('match_store', MatchStore(':memory:'))
+    options.setdefault('use_response_cache', False)
+    return RiotAPI('test-key', base_url=server.base_url, rate_limiter=rate_limiter or RateLimiter(),
+                   single_flight=SingleFlight(), **options)
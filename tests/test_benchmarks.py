@@ -0,0 +1,112 @@
+"""Tests des sketches KLL et des benchmarks de population (benchmarks.py)"""
+import random
+import statistics
+from collections import Counter
+
+import pytest
+
+from benchmarks import BenchmarkIndex, KllSketch, game_metrics
+from mock_riot_server import MockRiotState
+from parsed_match import parse_match
+
+
+@pytest.fixture(scope='module')
+def history():
+    """(PUUID, 40 matchs synthétiques de son historique)"""
+    state = MockRiotState()
+    puuid = state.puuid_for('Me', 'EUW')
+    return puuid, [state.match(match_id) for match_id in state.match_ids(puuid, 0, 40, None, None, None)]
+
+
+def test_kll_percentiles_within_one_point():
+    rng = random.Random(1)
+    values = [rng.gauss(7, 1.5) for _ in range(50000)]
+    sketch = KllSketch()
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+        exact = ordered[int(q * len(ordered))]
+        assert sketch.percentile(exact) == pytest.approx(q * 100, abs=1.0)
+    assert len(sketch.to_bytes()) < 2048
+
+
+def test_kll_round_trip_and_merge():
+    left, right = KllSketch(), KllSketch()
+    for value in range(1000):
+        (left if value % 2 else right).add(float(value))
+
+    restored = KllSketch.from_bytes(left.to_bytes())
+    assert restored.n == left.n
+    assert restored.percentile(500.0) == pytest.approx(left.percentile(500.0))
+
+    merged = restored.merge(right)
+    assert merged.n == 1000
+    assert merged.quantile(0.5) == pytest.approx(500, abs=20)
+
+
+def test_benchmark_keeps_chosen_role_and_uses_per_game_percentiles(history):
+    puuid, matches = history
+    index = BenchmarkIndex(':memory:', min_samples=10)
+    index.add_matches(matches, exclude_puuids=[puuid])
+
+    roles = Counter(parse_match(match).participant(puuid)['teamPosition'] for match in matches)
+    role, games = roles.most_common(1)[0]
+    benchmark = index.benchmark_player(matches, puuid)
+    assert benchmark['role'] == role
+    assert benchmark['games'] == games
+
+    samples = []
+    for match in matches:
+        parsed = parse_match(match)
+        player = parsed.participant(puuid)
+        if player['teamPosition'] == role:
+            samples.append(game_metrics(parsed, player, match['info']['gameDuration'])['cs_per_min'])
+    _, sketch = index.sketch('cs_per_min', role)
+    assert benchmark['values']['cs_per_min'] == pytest.approx(statistics.median(samples))
+    assert benchmark['percentiles']['cs_per_min'] == pytest.approx(
+        statistics.median(sketch.percentile(sample) for sample in samples))
+
+
+def test_excluded_players_stay_out_of_population(history):
+    puuid, matches = history
+    included, excluded = BenchmarkIndex(':memory:'), BenchmarkIndex(':memory:')
+    included.add_matches(matches)
+    excluded.add_matches(matches, exclude_puuids=[puuid])
+
+    def samples(index):
+        return sum(sketch.n for (_, tier, metric), sketch in index.sketches.items()
+                   if tier == 'ALL' and metric == 'cs_per_min')
+
+    assert samples(included) - samples(excluded) == len(matches)
+
+
+def test_tier_fallback_is_reported_per_metric(history):
+    puuid, matches = history
+    index = BenchmarkIndex(':memory:', min_samples=5)
+    index.add_matches(matches, 'GOLD', exclude_puuids=[puuid])
+    role = index.benchmark_player(matches, puuid)['role']
+    del index.sketches[(role, 'GOLD', 'vision_score')]
+
+    benchmark = index.benchmark_player(matches, puuid, tier='GOLD')
+    assert benchmark['tier'] == 'GOLD'
+    assert benchmark['tiers']['vision_score'] == 'ALL'
+    assert benchmark['tiers']['cs_per_min'] == 'GOLD'
+
+
+def test_instances_sharing_a_file_lose_nothing(history, tmp_path):
+    _, matches = history
+    path = str(tmp_path / 'benchmarks.sqlite')
+    first, second = BenchmarkIndex(path), BenchmarkIndex(path)
+    first.add_matches(matches[:20])
+    second.add_matches(matches[20:])
+    # Déjà sauvegardés par la première instance : ignorés à la sauvegarde
+    second.add_matches(matches[:10])
+
+    reference = BenchmarkIndex(':memory:')
+    reference.add_matches(matches)
+    reopened = BenchmarkIndex(path)
+    assert reopened.stats()['matches'] == 40
+    assert {key: sketch.n for key, sketch in reopened.sketches.items()} == \
+        {key: sketch.n for key, sketch in reference.sketches.items()}
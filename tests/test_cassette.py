@@ -0,0 +1,74 @@
+"""Tests de l'enregistrement / rejeu des réponses (cassette.py) à travers RiotAPI"""
+import pytest
+
+from cassette import Cassette
+
+from conftest import make_api
+
+
+def session_calls(api, puuid):
+    """Quelques appels Riot typiques d'une analyse"""
+    summoner = api.get_summoner_by_puuid(puuid)
+    match_ids = api.get_match_history(puuid, count=5)
+    matches = [api.get_match_details(match_id) for match_id in match_ids]
+    return summoner, match_ids, matches
+
+
+def test_replay_returns_recorded_responses_without_network(riot_server, tmp_path):
+    path = str(tmp_path / 'riot.jsonl')
+    server = riot_server(app_limits='500:1')
+    puuid = server.state.puuid_for('Me', 'EUW')
+
+    recorder = Cassette(path, mode='record')
+    recorded = session_calls(make_api(server, cassette=recorder), puuid)
+    assert recorder.stats()['recorded'] == 7
+    sent = server.state.counters['requests']
+    server.stop()
+
+    replayer = Cassette(path, mode='replay')
+    assert session_calls(make_api(server, cassette=replayer), puuid) == recorded
+    assert replayer.stats()['replayed'] == 7
+    assert server.state.counters['requests'] == sent
+
+
+def test_missing_interaction_replays_as_404(riot_server, tmp_path, capsys):
+    server = riot_server()
+    cassette = Cassette(str(tmp_path / 'absent.jsonl'), mode='replay')
+    api = make_api(server, cassette=cassette)
+
+    assert api.get_match_details('EUW1_404') is None
+    assert cassette.stats()['missing'] == 1
+    assert server.state.counters['requests'] == 0
+    assert 'Cassette introuvable' in capsys.readouterr().out
+
+
+def test_sequence_replays_in_order_then_repeats_last(tmp_path):
+    path = str(tmp_path / 'llm.jsonl')
+    recorder = Cassette(path, mode='record')
+    key = Cassette.make_key('llm', 'prompt')
+    recorder.record_text(key, 'first')
+    recorder.record_text(key, 'second')
+
+    replayer = Cassette(path)
+    assert [replayer.replay_text(key) for _ in range(3)] == ['first', 'second', 'second']
+    assert replayer.replay_text(Cassette.make_key('llm', 'other')) is None
+    assert Cassette.make_key('llm', {'b': 1, 'a': 2}) == Cassette.make_key('llm', {'a': 2, 'b': 1})
+
+
+def test_injected_rate_limits_are_reproducible(tmp_path):
+    path = str(tmp_path / 'riot.jsonl')
+    key = Cassette.make_key('riot', 'url')
+
+    def statuses(seed):
+        cassette = Cassette(path, rate_limit_rate=0.5, retry_after=3, seed=seed)
+        return [cassette.replay_http(key, 'url').status_code for _ in range(20)]
+
+    assert statuses(7) == statuses(7)
+    assert set(statuses(7)) == {404, 429}
+    limited = Cassette(path, rate_limit_rate=1.0, retry_after=3).replay_http(key, 'url')
+    assert limited.headers['retry-after'] == '3'
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / 'riot.jsonl'), mode='live')
@@ -0,0 +1,86 @@
+"""Tests du cache persistant des matchs (match_store.py)"""
+import sqlite3
+import types
+
+import pytest
+
+import match_store
+from match_archive import CODEC_ZLIB, MatchCodec
+from match_store import MatchStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge manuelle pour last_access : chaque appel avance d'une seconde"""
+    now = [1000.0]
+
+    def tick():
+        now[0] += 1
+        return now[0]
+
+    monkeypatch.setattr(match_store, 'time', types.SimpleNamespace(time=tick))
+    return now
+
+
+def payload(match_id: str) -> bytes:
+    return ('{"metadata": {"matchId": "%s"}, "info": {}}' % match_id).encode('utf-8')
+
+
+def test_least_recently_used_match_is_evicted(tmp_path, clock):
+    store = MatchStore(str(tmp_path / 'matches.sqlite'), max_entries=3)
+    for match_id in ('EUW1_1', 'EUW1_2', 'EUW1_3'):
+        store.put(match_id, payload(match_id))
+    # Lecture : EUW1_1 redevient le plus récent, EUW1_2 part à sa place
+    assert store.get('EUW1_1')['metadata']['matchId'] == 'EUW1_1'
+    store.put('EUW1_4', payload('EUW1_4'))
+
+    assert len(store) == 3
+    assert 'EUW1_2' not in store
+    assert sorted(store.iter_match_ids()) == ['EUW1_1', 'EUW1_3', 'EUW1_4']
+    # Réécrire un match présent ne compte pas double
+    store.put('EUW1_4', payload('EUW1_4'))
+    assert len(MatchStore(store.path, max_entries=3)) == 3
+
+
+def test_timelines_have_their_own_limit(clock):
+    store = MatchStore(':memory:', max_entries=2, max_timelines=1)
+    store.put('EUW1_1', payload('EUW1_1'))
+    store.put_timeline('EUW1_1', b'{"frames": []}')
+    store.put_timeline('EUW1_2', b'{"frames": [1]}')
+
+    assert list(store.iter_match_ids()) == ['EUW1_1']
+    assert store.get_timeline_raw('EUW1_1') is None
+    assert store.get_timeline_raw('EUW1_2') == b'{"frames": [1]}'
+    assert (store.stats()['entries'], store.stats()['timelines']) == (1, 1)
+
+
+def test_legacy_timelines_move_to_their_table(tmp_path):
+    path = str(tmp_path / 'matches.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE matches (match_id TEXT PRIMARY KEY, payload BLOB NOT NULL, last_access REAL NOT NULL)")
+    conn.executemany("INSERT INTO matches VALUES (?, ?, ?)", [
+        ('EUW1_1', payload('EUW1_1'), 1.0), ('EUW1_1/timeline', b'{"frames": []}', 2.0),
+    ])
+    conn.commit()
+    conn.close()
+
+    store = MatchStore(path)
+    assert list(store.iter_match_ids()) == ['EUW1_1']
+    assert len(store) == 1
+    assert store.get_timeline_raw('EUW1_1') == b'{"frames": []}'
+
+
+def test_compressed_entries_without_codec_are_skipped(tmp_path, capsys):
+    path = str(tmp_path / 'matches.sqlite')
+    compressed = MatchStore(path, codec=MatchCodec(codec=CODEC_ZLIB))
+    compressed.put('EUW1_1', payload('EUW1_1'))
+    assert compressed.get_raw('EUW1_1') == payload('EUW1_1')
+    compressed.close()
+
+    plain = MatchStore(path)
+    plain.put('EUW1_2', payload('EUW1_2'))
+    skipped = []
+    assert [match_id for match_id, _ in plain.iter_raw(skipped)] == ['EUW1_2']
+    assert skipped == ['EUW1_1']
+    assert plain.get('EUW1_1') is None
+    assert 'aucun codec' in capsys.readouterr().out
@@ -0,0 +1,62 @@
+"""Tests de la synchronisation incrémentale (match_sync.py)"""
+from match_sync import MatchHistorySync
+
+from conftest import make_api
+
+
+def fail_pages(api, starts):
+    """Fait échouer (None, comme après une erreur réseau) les pages d'IDs commençant à ces positions"""
+    get_match_history = api.get_match_history
+
+    def patched(puuid, count=20, queue=None, start=0, **kwargs):
+        if start in starts:
+            return None
+        return get_match_history(puuid, count=count, queue=queue, start=start, **kwargs)
+
+    api.get_match_history = patched
+
+
+def test_first_sync_then_nothing_new(riot_server):
+    server = riot_server(app_limits='500:1')
+    api = make_api(server)
+    puuid = server.state.puuid_for('Me', 'EUW')
+    sync = MatchHistorySync(api, path=':memory:', initial_limit=30)
+
+    matches = sync.sync(puuid)
+    assert len(matches) == 30
+    state = sync.get_state(puuid)
+    assert state['newest_match_id'] == matches[0]['metadata']['matchId']
+
+    # Seul le match le plus récent est redemandé (fenêtre startTime), aucun détail
+    assert sync.sync(puuid) == []
+    assert sync.get_state(puuid)['newest_match_id'] == state['newest_match_id']
+    assert sync.get_state(puuid)['last_sync'] >= state['last_sync']
+
+
+def test_failed_page_does_not_advance_marker(riot_server):
+    server = riot_server(app_limits='500:1')
+    api = make_api(server)
+    puuid = server.state.puuid_for('Me', 'EUW')
+    sync = MatchHistorySync(api, path=':memory:', initial_limit=150)
+
+    fail_pages(api, {100})
+    assert len(sync.sync(puuid)) == 100
+    assert sync.get_state(puuid) is None
+
+    # Synchro suivante sans erreur : les 150 matchs, marqueur enregistré
+    del api.get_match_history
+    assert len(sync.sync(puuid)) == 150
+    assert sync.get_state(puuid) is not None
+
+
+def test_failed_incremental_sync_keeps_previous_window(riot_server):
+    server = riot_server(app_limits='500:1')
+    api = make_api(server)
+    puuid = server.state.puuid_for('Me', 'EUW')
+    sync = MatchHistorySync(api, path=':memory:', initial_limit=20)
+    sync.sync(puuid)
+    state = sync.get_state(puuid)
+
+    fail_pages(api, {0})
+    assert sync.sync(puuid) == []
+    assert sync.get_state(puuid) == state
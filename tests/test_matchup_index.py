@@ -0,0 +1,100 @@
+"""Tests de l'index des matchups de lane (matchup_index.py)"""
+import copy
+from collections import Counter
+
+import pytest
+
+from matchup_index import MatchupIndex
+from mock_riot_server import MockRiotState
+from timeline import parse_timeline
+
+from conftest import make_api
+
+
+@pytest.fixture(scope='module')
+def state():
+    return MockRiotState()
+
+
+@pytest.fixture(scope='module')
+def matches(state):
+    puuid = state.puuid_for('Me', 'EUW')
+    return [state.match(match_id) for match_id in state.match_ids(puuid, 0, 40, None, None, None)]
+
+
+def lane_counts(matches):
+    """Parties et victoires par (championId, championId adverse, rôle), par force brute"""
+    games, wins = Counter(), Counter()
+    for match in matches:
+        participants = match['info']['participants']
+        for player in participants:
+            for enemy in participants:
+                if player['teamId'] != enemy['teamId'] and player['teamPosition'] == enemy['teamPosition']:
+                    key = (player['championId'], enemy['championId'], player['teamPosition'])
+                    games[key] += 1
+                    wins[key] += player['win']
+    return games, wins
+
+
+def test_index_matches_brute_force(matches):
+    index = MatchupIndex(':memory:')
+    assert index.add_matches(matches) == len(matches)
+    assert index.add_matches(matches) == 0
+
+    games, wins = lane_counts(matches)
+    for (champion, enemy, role), count in games.items():
+        stats = index.get(champion, enemy, role)
+        assert (stats['games'], stats['wins']) == (count, wins[(champion, enemy, role)])
+        mirror = index.get(enemy, champion, role)
+        assert mirror['gold_diff'] == pytest.approx(-stats['gold_diff'])
+
+
+def test_champions_missing_from_name_table(matches, tmp_path):
+    match = copy.deepcopy(matches[0])
+    player, enemy = (next(p for p in match['info']['participants'] if p['teamId'] == team
+                          and p['teamPosition'] == 'TOP') for team in (100, 200))
+    player.update(championId=233, championName='Briar')
+    enemy.update(championId=901, championName='Smolder')
+
+    path = str(tmp_path / 'matchups.sqlite')
+    index = MatchupIndex(path)
+    index.add_match(match)
+    index.save()
+
+    # IDs de spectator, noms match-v5 ou saisis : même entrée
+    assert index.get(233, 901, 'TOP')['games'] == 1
+    assert index.get('Briar', 'smolder', 'TOP')['games'] == 1
+    assert MatchupIndex(path).get('Briar', 901)['games'] == 1
+
+
+def test_timeline_adds_lane_diffs_once(riot_server):
+    server = riot_server(app_limits='500:1')
+    api = make_api(server)
+    puuid = server.state.puuid_for('Me', 'EUW')
+    match_ids = api.get_match_history(puuid, count=3)
+    matches = [api.get_match_details(match_id) for match_id in match_ids]
+    timelines = {match_id: parse_timeline(server.state.timeline(match_id)) for match_id in match_ids}
+
+    index = MatchupIndex(':memory:')
+    index.add_matches(matches)
+    assert index.add_matches(matches, timelines) == 3
+    assert index.add_matches(matches, timelines) == 0
+    lane_games = sum(stats.lane_games for (_, _, role), stats in index.matchups.items() if role == '')
+    games = sum(stats.games for (_, _, role), stats in index.matchups.items() if role == '')
+    assert lane_games == games == 3 * 5 * 2
+
+
+def test_instances_sharing_a_file_lose_nothing(matches, tmp_path):
+    path = str(tmp_path / 'matchups.sqlite')
+    first, second = MatchupIndex(path), MatchupIndex(path)
+    first.add_matches(matches[:20])
+    second.add_matches(matches[20:])
+    # Déjà sauvegardés par la première instance : ignorés à la sauvegarde
+    second.add_matches(matches[:10])
+
+    reference = MatchupIndex(':memory:')
+    reference.add_matches(matches)
+    reopened = MatchupIndex(path)
+    assert reopened.stats() == reference.stats()
+    assert {key: stats.games for key, stats in reopened.matchups.items()} == \
+        {key: stats.games for key, stats in reference.matchups.items()}
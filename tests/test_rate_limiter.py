@@ -0,0 +1,103 @@
+"""Tests du limiteur de débit (rate_limiter.py) seul et à travers RiotAPI"""
+import contextlib
+import io
+import threading
+import time
+
+import pytest
+
+from benchmarks import BenchmarkIndex
+from live_game_coach import LiveGameCoach
+from matchup_index import MatchupIndex
+from rate_limiter import PRIORITY_HISTORY, WINDOW_PADDING, RateLimiter, _Window, parse_rate_limit_header
+
+from conftest import make_api
+
+
+def test_parse_rate_limit_header():
+    assert parse_rate_limit_header("20:1,100:120") == [(20, 1), (100, 120)]
+    assert parse_rate_limit_header("20:1,bad") == [(20, 1)]
+    assert parse_rate_limit_header(None) == []
+
+
+def test_window_counts_in_flight_requests_until_complete():
+    window = _Window(2, 1)
+    window.record(0.0)
+    window.record(0.0)
+    # Deux requêtes en vol : aucune place, même bien après leur départ
+    assert window.wait_time(5.0) > 0
+    window.complete(5.0)
+    # Créneau daté de la réponse : libéré une fenêtre (et la marge) plus tard
+    assert window.wait_time(5.5) == pytest.approx(0.5 + WINDOW_PADDING)
+    assert window.wait_time(6.0 + WINDOW_PADDING) == 0.0
+
+
+def test_reserve_leaves_room_for_higher_priorities():
+    window = _Window(10, 1)
+    for _ in range(7):
+        window.record(0.0)
+        window.complete(0.0)
+    assert window.wait_time(0.1, share=0.7) > 0
+    assert window.wait_time(0.1) == 0.0
+
+
+def test_headers_sync_local_counts():
+    limiter = RateLimiter([(20, 1)])
+    limiter.update_from_headers('host', 'method', {
+        'X-App-Rate-Limit': '20:1', 'X-App-Rate-Limit-Count': '15:1',
+    })
+    app = next(entry for entry in limiter.headroom() if entry['scope'] == 'application')
+    assert (app['limit'], app['used'], app['remaining']) == (20, 15, 5)
+
+
+def test_no_429_at_dev_key_limit(riot_server):
+    server = riot_server(app_limits='20:1', jitter=0.05)
+    api = make_api(server)
+    puuid = server.state.puuid_for('Me', 'EUW')
+    match_ids = api.get_match_history(puuid, count=70)
+
+    # Séquentiel puis en parallèle, au-delà de la limite par seconde
+    for match_id in match_ids[:25]:
+        assert api.get_match_details(match_id) is not None
+    fetched = list(api.get_match_details_many(match_ids[25:]))
+
+    assert all(detail is not None for _, _, detail in fetched)
+    assert server.state.counters['requests'] == 71
+    assert server.state.counters['rate_limited'] == 0
+
+
+def timed_pregame(server, limiter: RateLimiter) -> float:
+    api = make_api(server, limiter)
+    coach = LiveGameCoach(api, BenchmarkIndex(':memory:'), MatchupIndex(':memory:'))
+    puuid = server.state.puuid_for('Fg', 'EUW')
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = coach.check_for_active_game(puuid)
+        analysis = coach.analyze_pregame(game, puuid)
+    assert analysis['enemy_analysis']
+    return time.perf_counter() - started
+
+
+def test_pregame_keeps_its_pace_during_history_download(riot_server):
+    alone = timed_pregame(riot_server(app_limits='50:1,3000:120', latency=0.02), RateLimiter())
+
+    server = riot_server(app_limits='50:1,3000:120', latency=0.02)
+    limiter = RateLimiter()
+    history = make_api(server, limiter)
+    match_ids = history.get_match_history(server.state.puuid_for('Bg', 'EUW'), count=100)
+    match_ids += history.get_match_history(server.state.puuid_for('Bg', 'EUW'), count=100, start=100)
+
+    def download():
+        with history.priority(PRIORITY_HISTORY), contextlib.redirect_stdout(io.StringIO()):
+            list(history.get_match_details_many(match_ids))
+
+    thread = threading.Thread(target=download, daemon=True)
+    thread.start()
+    # Le téléchargement occupe déjà toute la fenêtre quand l'analyse démarre
+    time.sleep(1.0)
+    loaded = timed_pregame(server, limiter)
+    thread.join()
+
+    # Mesuré : ~1,2 x avec la réserve, ~1,6 x si l'historique peut occuper toute la fenêtre
+    assert loaded < alone * 1.4
+    assert server.state.counters['rate_limited'] == 0
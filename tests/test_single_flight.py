@@ -0,0 +1,91 @@
+"""Tests de la coalescence des requêtes identiques (single_flight.py)"""
+import threading
+import time
+
+from single_flight import SingleFlight
+
+from conftest import make_api
+
+
+def run_together(single_flight: SingleFlight, key, func, callers: int):
+    """Lance callers appels simultanés de do(key, func) ; retourne (résultats, exceptions)"""
+    release = threading.Event()
+    results, errors = [], []
+
+    def blocked():
+        release.wait(5)
+        return func()
+
+    def call():
+        try:
+            results.append(single_flight.do(key, blocked))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while single_flight.coalesced < callers - 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_simultaneous_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = []
+    results, errors = run_together(single_flight, 'key', lambda: calls.append(1) or {'value': 42}, 8)
+
+    assert calls == [1]
+    assert errors == []
+    assert results == [{'value': 42}] * 8
+    assert (single_flight.executed, single_flight.coalesced, single_flight.in_flight()) == (1, 7, 0)
+
+    # Une fois terminée, la clé est de nouveau exécutée
+    assert single_flight.do('key', lambda: 'again') == 'again'
+    assert single_flight.executed == 2
+
+
+def test_exception_reaches_every_waiter():
+    single_flight = SingleFlight()
+
+    def fail():
+        raise ValueError('boom')
+
+    results, errors = run_together(single_flight, 'key', fail, 4)
+    assert results == []
+    assert len(errors) == 4 and all(isinstance(e, ValueError) for e in errors)
+    assert single_flight.in_flight() == 0
+
+
+def test_distinct_keys_do_not_wait_for_each_other():
+    single_flight = SingleFlight()
+    assert [single_flight.do(key, lambda key=key: key * 2) for key in (1, 2, 3)] == [2, 4, 6]
+    assert single_flight.coalesced == 0
+
+
+def test_riot_api_sends_one_request_for_simultaneous_callers(riot_server):
+    callers = 6
+    server = riot_server(app_limits='500:1', latency=0.3)
+    api = make_api(server, use_match_cache=False, match_store=None)
+    match_id = api.get_match_history(server.state.puuid_for('Me', 'EUW'), count=1)[0]
+
+    results = [None] * callers
+
+    def fetch(i):
+        results[i] = api.get_match_details(match_id)
+
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.state.counters['by_method']['match-v5.match'] == 1
+    assert all(result == results[0] for result in results)
+    # Chaque appelant reçoit sa propre copie décodée
+    results[0]['info']['gameDuration'] = -1
+    assert results[1]['info']['gameDuration'] != -1
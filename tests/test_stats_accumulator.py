@@ -0,0 +1,65 @@
+"""Tests de l'agrégation en flux et de la fusion des accumulateurs (stats_accumulator.py)"""
+import random
+import statistics
+
+import pytest
+
+from mock_riot_server import MockRiotState
+from stats_accumulator import RunningStat, StatsAccumulator, analyze_match_stream, merge_accumulators
+
+
+@pytest.fixture(scope='module')
+def history():
+    """(PUUID, 60 matchs synthétiques de son historique)"""
+    state = MockRiotState()
+    puuid = state.puuid_for('Me', 'EUW')
+    return puuid, [state.match(match_id) for match_id in state.match_ids(puuid, 0, 60, None, None, None)]
+
+
+def comparable(result):
+    """Résultat de StatsAccumulator.result() en types simples (dicts, listes)"""
+    result = dict(result)
+    result['champions'] = {name: {key: dict(value) if key == 'roles' else value for key, value in champ.items()}
+                           for name, champ in result['champions'].items()}
+    result['roles'] = dict(result['roles'])
+    for name in ('kills', 'deaths', 'assists'):
+        result[name] = list(result[name])
+    return result
+
+
+def test_running_stat_merge_matches_single_pass():
+    rng = random.Random(3)
+    values = [rng.uniform(0, 20) for _ in range(500)]
+    parts = [RunningStat() for _ in range(3)]
+    for i, value in enumerate(values):
+        parts[i % 3].add(value)
+
+    merged = RunningStat().merge(parts[0]).merge(parts[1]).merge(parts[2]).merge(RunningStat())
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(statistics.mean(values))
+    assert merged.std == pytest.approx(statistics.stdev(values))
+
+
+def test_merged_slices_equal_one_pass(history):
+    puuid, matches = history
+    whole = analyze_match_stream(matches, puuid, recent_limit=10)
+
+    # Tranches dans le désordre : la fusion ne dépend pas de l'ordre
+    slices = [matches[40:], matches[:15], matches[15:40]]
+    accumulators = [StatsAccumulator(puuid, recent_limit=10).add_many(part) for part in slices]
+    merged = merge_accumulators(accumulators).result()
+
+    expected, actual = comparable(whole), comparable(merged)
+    # Compteurs et parties récentes identiques, moyennes et écarts-types aux arrondis près
+    for name in ('total_games', 'wins', 'losses', 'kills', 'deaths', 'assists', 'champions', 'roles',
+                 'recent_performance'):
+        assert actual.pop(name) == expected.pop(name), name
+    assert actual.pop('spread') == pytest.approx(expected.pop('spread'))
+    assert actual == pytest.approx(expected)
+
+
+def test_merge_refuses_another_player(history):
+    puuid, _ = history
+    with pytest.raises(ValueError):
+        StatsAccumulator(puuid).merge(StatsAccumulator('someone-else'))
+    assert merge_accumulators([]) is None
@@ -0,0 +1,70 @@
+"""Tests du cache à durée de vie des réponses Riot (ttl_cache.py)"""
+import types
+
+import pytest
+
+import ttl_cache
+from ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge manuelle : clock[0] = maintenant"""
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_entries_expire_after_their_endpoint_ttl(clock):
+    cache = TTLCache({'league-v4.entries-by-summoner': 300})
+    cache.put('league-v4.entries-by-summoner', 'summoner-1', b'[]')
+    cache.put('spectator-v5.active-game', 'puuid-1', b'{}')
+
+    assert not cache.is_cacheable('spectator-v5.active-game')
+    assert cache.get('spectator-v5.active-game', 'puuid-1') is None
+    clock[0] += 299
+    assert cache.get('league-v4.entries-by-summoner', 'summoner-1') == b'[]'
+    clock[0] += 1
+    assert cache.get('league-v4.entries-by-summoner', 'summoner-1') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_memory_tier_is_lru(clock):
+    cache = TTLCache(max_entries=2)
+    endpoint = 'summoner-v4.by-puuid'
+    cache.put(endpoint, 'a', b'a')
+    cache.put(endpoint, 'b', b'b')
+    cache.get(endpoint, 'a')
+    cache.put(endpoint, 'c', b'c')
+
+    assert cache.get(endpoint, 'b') is None
+    assert cache.get(endpoint, 'a') == b'a'
+    assert cache.stats()['entries'] == 2
+
+
+def test_disk_tier_survives_restart_until_expiry(tmp_path, clock):
+    path = str(tmp_path / 'responses.sqlite')
+    endpoint = 'match-v5.ids-by-puuid'
+    TTLCache(disk_path=path).put(endpoint, 'puuid-1', b'["EUW1_1"]')
+
+    reopened = TTLCache(disk_path=path)
+    assert reopened.get(endpoint, 'puuid-1') == b'["EUW1_1"]'
+    assert reopened.disk_hits == 1
+
+    clock[0] += 60
+    assert TTLCache(disk_path=path).get(endpoint, 'puuid-1') is None
+
+
+def test_invalidate_by_endpoint_and_key(tmp_path, clock):
+    path = str(tmp_path / 'responses.sqlite')
+    cache = TTLCache(disk_path=path)
+    cache.put('match-v5.ids-by-puuid', 'puuid-1?start=0', b'[]')
+    cache.put('match-v5.ids-by-puuid', 'puuid-2?start=0', b'[]')
+    cache.put('summoner-v4.by-puuid', 'puuid-1', b'{}')
+
+    assert cache.invalidate('match-v5.ids-by-puuid', contains='puuid-1') == 1
+    assert cache.get('match-v5.ids-by-puuid', 'puuid-1?start=0') is None
+    assert cache.get('match-v5.ids-by-puuid', 'puuid-2?start=0') == b'[]'
+    # Supprimé aussi du niveau disque
+    assert TTLCache(disk_path=path).get('match-v5.ids-by-puuid', 'puuid-1?start=0') is None
+    assert TTLCache(disk_path=path).get('summoner-v4.by-puuid', 'puuid-1') == b'{}'
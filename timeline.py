@@ -0,0 +1,101 @@
+"""
+Module de lecture des timelines de match (match-v5 /timeline)
+La timeline contient une frame par minute avec ~30 champs par participant et tous les
+événements de la partie ; l'analyse de la phase de lane n'a besoin que de l'or, de l'XP,
+des CS et du niveau. On les range en tableaux NumPy int32 (participants x minutes)
+sans garder les frames d'origine en mémoire
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from match_decoder import loads
+
+# Métriques extraites de chaque frame : nom -> fonction de lecture d'une participantFrame
+FRAME_METRICS = {
+    'gold': lambda frame: frame.get('totalGold', 0),
+    'xp': lambda frame: frame.get('xp', 0),
+    'cs': lambda frame: frame.get('minionsKilled', 0) + frame.get('jungleMinionsKilled', 0),
+    'level': lambda frame: frame.get('level', 1),
+}
+
+
+class TimelineFrames:
+    """Frames d'une timeline en colonnes : un tableau (participants x minutes) par métrique"""
+    __slots__ = ('match_id', 'participant_ids', 'puuids', 'frame_interval', 'gold', 'xp', 'cs', 'level')
+
+    def __init__(self, match_id: str, participant_ids: Tuple[int, ...], puuids: Tuple[str, ...],
+                 frame_interval: int, arrays: Dict[str, np.ndarray]):
+        self.match_id = match_id
+        self.participant_ids = participant_ids
+        self.puuids = puuids
+        self.frame_interval = frame_interval
+        self.gold = arrays['gold']
+        self.xp = arrays['xp']
+        self.cs = arrays['cs']
+        self.level = arrays['level']
+
+    @property
+    def minutes(self) -> int:
+        """Nombre de frames (la frame 0 correspond au début de la partie)"""
+        return self.gold.shape[1]
+
+    def row(self, participant_id: int) -> Optional[int]:
+        """Ligne des tableaux correspondant à un participantId (1 à 10)"""
+        try:
+            return self.participant_ids.index(participant_id)
+        except ValueError:
+            return None
+
+    def row_for_puuid(self, puuid: str) -> Optional[int]:
+        try:
+            return self.puuids.index(puuid)
+        except ValueError:
+            return None
+
+    def at(self, metric: str, minute: int) -> Optional[np.ndarray]:
+        """Valeurs de tous les participants à une minute donnée (None si la partie est plus courte)"""
+        if minute >= self.minutes:
+            return None
+        return getattr(self, metric)[:, minute]
+
+    def nbytes(self) -> int:
+        return self.gold.nbytes + self.xp.nbytes + self.cs.nbytes + self.level.nbytes
+
+    def __repr__(self):
+        return f"TimelineFrames({self.match_id!r}, participants={len(self.participant_ids)}, minutes={self.minutes})"
+
+
+def parse_timeline(timeline) -> TimelineFrames:
+    """
+    Aplatit une timeline (payload JSON brut ou dict déjà décodé) en TimelineFrames
+    Seules les participantFrames sont lues ; les événements sont ignorés
+    """
+    if isinstance(timeline, (bytes, bytearray, str)):
+        timeline = loads(timeline)
+
+    metadata = timeline.get('metadata', {})
+    info = timeline.get('info', {})
+    frames = info.get('frames', [])
+
+    # Correspondance participantId -> PUUID (info.participants, sinon l'ordre de metadata)
+    participants = info.get('participants')
+    if participants:
+        participant_ids = tuple(p['participantId'] for p in participants)
+        puuids = tuple(p.get('puuid', '') for p in participants)
+    else:
+        puuids = tuple(metadata.get('participants', ()))
+        participant_ids = tuple(range(1, len(puuids) + 1))
+
+    arrays = {metric: np.zeros((len(participant_ids), len(frames)), dtype=np.int32) for metric in FRAME_METRICS}
+    for column, frame in enumerate(frames):
+        participant_frames = frame.get('participantFrames', {})
+        for row, participant_id in enumerate(participant_ids):
+            participant_frame = participant_frames.get(str(participant_id))
+            if participant_frame is None:
+                continue
+            for metric, read in FRAME_METRICS.items():
+                arrays[metric][row, column] = read(participant_frame)
+
+    return TimelineFrames(metadata.get('matchId', ''), participant_ids, puuids,
+                          info.get('frameInterval', 60000), arrays)
@@ -0,0 +1,206 @@
+"""
+Module de tendances : moyennes glissantes et moyennes exponentielles (EWMA)
+Les moyennes sur tout l'historique masquent les séries (tilt) et les progrès. Un
+TrendTracker reçoit les parties dans l'ordre chronologique et met à jour, en O(1) par
+partie, les moyennes des 5 / 10 / 20 dernières parties, une EWMA et la série en cours
+pour le winrate, le KDA, les CS/min, la vision et la kill participation
+Le KDA d'une fenêtre est, comme le KDA moyen des rapports, un ratio de moyennes :
+(kills + assists moyens) / max(morts moyennes, 1), et non une moyenne des KDA par partie
+"""
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from match_decoder import _participant_row
+from parsed_match import parse_match
+
+# Fenêtres glissantes (nombre de parties)
+TREND_WINDOWS = (5, 10, 20)
+
+# Demi-vie de l'EWMA en parties : le poids d'une partie est divisé par 2 toutes les 5 parties
+EWMA_HALFLIFE = 5
+
+TREND_METRICS = ('winrate', 'kda', 'cs_per_min', 'vision', 'kill_participation')
+
+# Valeurs moyennées par partie ; le KDA en est dérivé (takedowns / max(deaths, 1))
+_TRACKED_VALUES = ('winrate', 'takedowns', 'deaths', 'cs_per_min', 'vision', 'kill_participation')
+
+# Libellé et format d'affichage de chaque métrique
+TREND_LABELS = {
+    'winrate': ('Winrate', '{:.0f}%'),
+    'kda': ('KDA', '{:.2f}'),
+    'cs_per_min': ('CS/min', '{:.1f}'),
+    'vision': ('Vision', '{:.1f}'),
+    'kill_participation': ('KP', '{:.0f}%'),
+}
+
+
+class RollingMean:
+    """Moyenne des size dernières valeurs (somme courante, O(1) par ajout)"""
+    __slots__ = ('size', 'values', 'total')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+
+    def add(self, value: float):
+        if len(self.values) == self.size:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / len(self.values) if self.values else None
+
+
+class Ewma:
+    """Moyenne exponentielle ; la première valeur sert d'initialisation"""
+    __slots__ = ('alpha', 'value', 'count')
+
+    def __init__(self, halflife: float = EWMA_HALFLIFE):
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.value: Optional[float] = None
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+
+
+class TrendTracker:
+    def __init__(self, windows: Tuple[int, ...] = TREND_WINDOWS, halflife: float = EWMA_HALFLIFE):
+        """
+        windows: tailles des fenêtres glissantes (en parties)
+        halflife: demi-vie de l'EWMA (en parties)
+        """
+        self.windows = tuple(sorted(windows))
+        self.halflife = halflife
+        self.games = 0
+        # Série en cours : +n victoires ou -n défaites consécutives
+        self.streak = 0
+        # (gameCreation, match ID) de la première et de la dernière partie reçues
+        self.first_key: Optional[Tuple[int, str]] = None
+        self.last_key: Optional[Tuple[int, str]] = None
+        self.rolling: Dict[str, Dict[int, RollingMean]] = {
+            metric: {size: RollingMean(size) for size in self.windows} for metric in _TRACKED_VALUES
+        }
+        self.ewma: Dict[str, Ewma] = {metric: Ewma(halflife) for metric in _TRACKED_VALUES}
+
+    def _add_value(self, metric: str, value: float):
+        for window in self.rolling[metric].values():
+            window.add(value)
+        self.ewma[metric].add(value)
+
+    def add_game(self, win: bool, kills: int, deaths: int, assists: int, cs_per_min: float, vision: int,
+                 kill_participation: Optional[float] = None, key: Tuple[int, str] = None) -> bool:
+        """
+        Ajoute la partie suivante (la plus récente) en O(1)
+        key: (gameCreation, match ID) ; une partie qui n'est pas plus récente que la dernière
+        reçue est ignorée (déjà comptée). Retourne False dans ce cas
+        """
+        if key is not None:
+            if self.last_key is not None and key <= self.last_key:
+                return False
+            if self.first_key is None:
+                self.first_key = key
+            self.last_key = key
+
+        self.games += 1
+        if win:
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+        else:
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+
+        self._add_value('winrate', 100.0 if win else 0.0)
+        self._add_value('takedowns', kills + assists)
+        self._add_value('deaths', deaths)
+        self._add_value('cs_per_min', cs_per_min)
+        self._add_value('vision', vision)
+        # Pas de KP pour une partie où l'équipe n'a fait aucun kill
+        if kill_participation is not None:
+            self._add_value('kill_participation', kill_participation)
+        return True
+
+    def add(self, match: Dict, player_puuid: str) -> bool:
+        """Ajoute un match (dict match-v5 ou MatchRecord) ; False si le joueur n'y figure pas ou déjà vu"""
+        parsed = parse_match(match)
+        player = parsed.participant(player_puuid)
+        if not player:
+            return False
+
+        (_, team_id, _, _, win, kills, deaths, assists, cs, vision, _, _) = _participant_row(player)
+        info = match.get('info', {})
+        team_kills = parsed.teams[team_id].kills
+        kill_participation = (kills + assists) / team_kills * 100 if team_kills > 0 else None
+        return self.add_game(win, kills, deaths, assists, cs / (info['gameDuration'] / 60), vision,
+                             kill_participation, (info.get('gameCreation', 0), parsed.match_id))
+
+    @staticmethod
+    def _metrics(means: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+        """Métriques affichées à partir des moyennes suivies (KDA = ratio des moyennes)"""
+        metrics = {metric: means.get(metric) for metric in TREND_METRICS}
+        if means['takedowns'] is not None:
+            metrics['kda'] = means['takedowns'] / max(means['deaths'], 1)
+        return metrics
+
+    def result(self) -> Dict:
+        """
+        {'games', 'streak', 'windows': {taille: {métrique: moyenne}}, 'ewma': {métrique: valeur},
+         'form': {métrique: fenêtre la plus courte - fenêtre la plus longue}}
+        Une fenêtre n'apparaît que si assez de parties ont été reçues pour la remplir
+        """
+        windows = {}
+        for size in self.windows:
+            if self.games < size:
+                continue
+            windows[size] = self._metrics({metric: self.rolling[metric][size].mean for metric in _TRACKED_VALUES})
+
+        form = {}
+        if len(windows) >= 2:
+            short, long = windows[min(windows)], windows[max(windows)]
+            form = {metric: short[metric] - long[metric] for metric in TREND_METRICS
+                    if short[metric] is not None and long[metric] is not None}
+
+        return {
+            'games': self.games,
+            'streak': self.streak,
+            'windows': windows,
+            'ewma': self._metrics({metric: self.ewma[metric].value for metric in _TRACKED_VALUES}),
+            'form': form
+        }
+
+
+def format_trend_lines(trends: Dict) -> List[str]:
+    """
+    Une ligne par métrique (rapports, prompts LLM), ex :
+    'KDA : 5 dern. 3.10 | 20 dern. 2.40 | EWMA 2.85 (+0.70)'
+    """
+    windows = trends.get('windows', {})
+    lines = []
+    for metric in TREND_METRICS:
+        label, fmt = TREND_LABELS[metric]
+        parts = [f"{size} dern. {fmt.format(values[metric])}" for size, values in windows.items()
+                 if values.get(metric) is not None and size in (min(windows), max(windows))]
+        ewma = trends.get('ewma', {}).get(metric)
+        if ewma is not None:
+            parts.append(f"EWMA {fmt.format(ewma)}")
+        if not parts:
+            continue
+        line = f"{label} : {' | '.join(parts)}"
+        delta = trends.get('form', {}).get(metric)
+        if delta is not None:
+            line += f" ({'+' if delta >= 0 else '-'}{fmt.format(abs(delta))})"
+        lines.append(line)
+
+    streak = trends.get('streak', 0)
+    if abs(streak) >= 2:
+        lines.append(f"Série en cours : {abs(streak)} {'victoires' if streak > 0 else 'défaites'} d'affilée")
+    return lines
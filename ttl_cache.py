@@ -0,0 +1,149 @@
+"""
+Module de cache à durée de vie (TTL) pour les endpoints Riot dont les données évoluent
+Un niveau mémoire LRU, et un niveau disque SQLite optionnel
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Durée de vie par endpoint, en secondes (les endpoints absents ne sont pas mis en cache)
+DEFAULT_TTLS = {
+    'account-v1.by-riot-id': 24 * 3600,
+    'account-v1.active-shard': 24 * 3600,
+    'summoner-v4.by-puuid': 3600,
+    'champion-mastery-v4.by-puuid': 3600,
+    'league-v4.entries-by-summoner': 300,
+    'match-v5.ids-by-puuid': 60,
+}
+
+DEFAULT_MAX_ENTRIES = 2048
+
+
+class TTLCache:
+    def __init__(self, ttls: Dict[str, float] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 disk_path: str = None):
+        """
+        ttls: durée de vie par endpoint (fusionnée avec DEFAULT_TTLS)
+        max_entries: taille maximum du niveau mémoire (éviction LRU)
+        disk_path: fichier SQLite du niveau disque (None = mémoire uniquement)
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, bytes]]" = OrderedDict()
+
+        self._disk = None
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "endpoint TEXT NOT NULL, key TEXT NOT NULL, payload BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, PRIMARY KEY (endpoint, key))"
+            )
+            self._disk.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._disk.commit()
+
+    def is_cacheable(self, endpoint: str) -> bool:
+        return self.ttls.get(endpoint, 0) > 0
+
+    def get(self, endpoint: str, key: str) -> Optional[bytes]:
+        """Retourne la réponse brute en cache si elle n'a pas expiré"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get((endpoint, key))
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._memory.move_to_end((endpoint, key))
+                    self.hits += 1
+                    return payload
+                del self._memory[(endpoint, key)]
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT payload, expires_at FROM responses WHERE endpoint = ? AND key = ?",
+                    (endpoint, key)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    payload = bytes(row[0])
+                    self._store_memory(endpoint, key, row[1], payload)
+                    self.disk_hits += 1
+                    return payload
+
+            self.misses += 1
+            return None
+
+    def put(self, endpoint: str, key: str, payload: bytes):
+        """Met en cache une réponse brute selon la durée de vie de son endpoint"""
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return
+
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store_memory(endpoint, key, expires_at, payload)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO responses (endpoint, key, payload, expires_at) VALUES (?, ?, ?, ?)",
+                    (endpoint, key, sqlite3.Binary(payload), expires_at)
+                )
+                self._disk.commit()
+
+    def _store_memory(self, endpoint: str, key: str, expires_at: float, payload: bytes):
+        self._memory[(endpoint, key)] = (expires_at, payload)
+        self._memory.move_to_end((endpoint, key))
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def invalidate(self, endpoint: str = None, contains: str = None) -> int:
+        """
+        Supprime des entrées du cache
+        endpoint: limiter à un endpoint (tous par défaut)
+        contains: limiter aux clés contenant cette chaîne (ex: un PUUID)
+        Retourne le nombre d'entrées supprimées du niveau mémoire
+        """
+        with self._lock:
+            removed = [
+                cache_key for cache_key in self._memory
+                if (endpoint is None or cache_key[0] == endpoint)
+                and (contains is None or contains in cache_key[1])
+            ]
+            for cache_key in removed:
+                del self._memory[cache_key]
+
+            if self._disk is not None:
+                query = "DELETE FROM responses WHERE 1 = 1"
+                args = []
+                if endpoint is not None:
+                    query += " AND endpoint = ?"
+                    args.append(endpoint)
+                if contains is not None:
+                    query += " AND instr(key, ?) > 0"
+                    args.append(contains)
+                self._disk.execute(query, args)
+                self._disk.commit()
+
+            return len(removed)
+
+    def stats(self) -> Dict:
+        """Statistiques du cache (hits mémoire/disque, misses, taille)"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._memory),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': ((self.hits + self.disk_hits) / lookups * 100) if lookups else 0.0
+        }